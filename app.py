@@ -1,13 +1,27 @@
 """Streamlit UI for the App Review Responder demo."""
 from __future__ import annotations
 
-from typing import List, Dict
+import hashlib
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, List, Dict, Tuple
 
 import streamlit as st
 
-from faq_loader import load_faq_entries
-from pipeline import AiriaPipeline, ReviewResult
+from faq_loader import DEFAULT_FAQ_PATH, load_faq_entries
+from pipeline import STAGES, AiriaPipeline, ReviewResult
 from retrieval import LLAMA_AVAILABLE
+from streaming_loader import iter_reviews
+
+# Reviews per pipeline batch, batches run at once, reviews shown per page,
+# and results shown live while a run is in progress.
+CHUNK_SIZE = 64
+MAX_WORKERS = 4
+PAGE_SIZE = 20
+LIVE_RESULTS = 200
 
 # Sample reviews for demo purposes
 SAMPLE_REVIEWS = [
@@ -45,6 +59,79 @@ SAMPLE_REVIEWS = [
     }
 ]
 
+
+def faq_digest() -> str:
+    """Content hash of the FAQ file; cached resources are rebuilt when it changes."""
+    return hashlib.sha256(DEFAULT_FAQ_PATH.read_bytes()).hexdigest()[:16]
+
+
+@st.cache_resource(show_spinner=False)
+def cached_faq_entries(digest: str) -> List[Dict[str, str]]:
+    """FAQ entries shared by every session; ``digest`` only keys the cache."""
+    return load_faq_entries()
+
+
+@st.cache_resource(show_spinner="Building the pipeline...")
+def cached_pipeline(enable_honeyhive: bool, digest: str) -> AiriaPipeline:
+    """One pipeline per (HoneyHive on/off, FAQ content), shared by every session and rerun."""
+    return AiriaPipeline(enable_honeyhive=enable_honeyhive)
+
+
+def load_uploaded_reviews(uploaded: Any) -> List[Dict[str, Any]]:
+    """Parse an uploaded JSON array or JSONL file of reviews."""
+    with tempfile.NamedTemporaryFile(suffix=Path(uploaded.name).suffix, delete=False) as handle:
+        handle.write(uploaded.getvalue())
+    try:
+        return list(iter_reviews(handle.name))
+    finally:
+        os.unlink(handle.name)
+
+
+def show_live_results(feed: Any, first: int, results: List[ReviewResult], shown: int) -> int:
+    """Append one line per result to ``feed`` until ``LIVE_RESULTS`` are shown; returns the new count."""
+    for idx, result in enumerate(results, start=first + 1):
+        if shown >= LIVE_RESULTS:
+            break
+        feed.markdown(f"**Response {idx}** — `{result.category}`: {result.response}")
+        shown += 1
+    return shown
+
+
+def run_concurrently(
+    pipeline: AiriaPipeline,
+    reviews: List[Dict[str, Any]],
+    progress: Any,
+    feed: Any,
+) -> Tuple[List[ReviewResult], Dict[str, float]]:
+    """Run ``reviews`` in batches on a thread pool, showing progress and results as batches finish.
+
+    Returns results in input order and the seconds spent per stage by this
+    run, summed across threads. Each batch times its stages into its own
+    dict, so runs from other sessions sharing the cached pipeline are not
+    counted.
+    """
+    chunks = [reviews[start:start + CHUNK_SIZE] for start in range(0, len(reviews), CHUNK_SIZE)]
+    chunk_results: List[List[ReviewResult]] = [[] for _ in chunks]
+    chunk_seconds: List[Dict[str, float]] = [{} for _ in chunks]
+    done = 0
+    shown = 0
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(pipeline.run_batch, chunk, CHUNK_SIZE, chunk_seconds[index]): index
+            for index, chunk in enumerate(chunks)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            chunk_results[index] = future.result()
+            done += len(chunk_results[index])
+            progress.progress(done / len(reviews), text=f"Processed {done} of {len(reviews)} reviews")
+            shown = show_live_results(feed, index * CHUNK_SIZE, chunk_results[index], shown)
+    if shown < done:
+        feed.caption(f"...and {done - shown} more; browse every result by page below.")
+    stage_seconds = {stage: sum(seconds.get(stage, 0.0) for seconds in chunk_seconds) for stage in STAGES}
+    return [result for results in chunk_results for result in results], stage_seconds
+
+
 st.set_page_config(page_title="App Review Responder", layout="wide")
 st.title("📱 App Review Responder")
 st.caption(
@@ -56,6 +143,8 @@ if "reviews" not in st.session_state:
     st.session_state["reviews"] = []
 if "results" not in st.session_state:
     st.session_state["results"] = []
+if "timings" not in st.session_state:
+    st.session_state["timings"] = {}
 
 with st.sidebar:
     st.header("Configuration")
@@ -66,12 +155,12 @@ with st.sidebar:
     st.markdown(
         "**LlamaIndex**: {}".format("✅ available" if LLAMA_AVAILABLE else "⚠️ using keyword fallback")
     )
+    digest = faq_digest()
     st.markdown(
-        "**FAQ Database**: {} entries loaded".format(len(load_faq_entries()))
+        "**FAQ Database**: {} entries loaded".format(len(cached_faq_entries(digest)))
     )
     
     # Check HoneyHive status
-    import os
     honeyhive_key = os.getenv("HONEYHIVE_API_KEY")
     if honeyhive_key:
         st.markdown("**HoneyHive**: ✅ API key configured")
@@ -84,19 +173,47 @@ with col_load:
     if st.button("Load Sample Reviews", key="load_reviews"):
         st.session_state["reviews"] = SAMPLE_REVIEWS.copy()
         st.session_state["results"] = []
+        st.session_state["timings"] = {}
         st.success(f"Loaded {len(st.session_state['reviews'])} sample reviews.")
+    uploaded = st.file_uploader("Or upload reviews (JSON array or JSONL)", type=["json", "jsonl"])
+    if uploaded is not None and st.button("Load Uploaded Reviews", key="load_uploaded"):
+        try:
+            st.session_state["reviews"] = load_uploaded_reviews(uploaded)
+        except ValueError as exc:
+            st.error(f"Could not load {uploaded.name}: {exc}")
+        else:
+            st.session_state["results"] = []
+            st.session_state["timings"] = {}
+            st.success(f"Loaded {len(st.session_state['reviews'])} reviews from {uploaded.name}.")
 
 with col_run:
     if st.button("Run Pipeline", key="run_pipeline", type="primary"):
         if not st.session_state.get("reviews"):
             st.warning("Please load sample reviews first!")
         else:
-            pipeline = AiriaPipeline(enable_honeyhive=run_honeyhive)
-            st.session_state["results"] = [pipeline.run(review) for review in st.session_state["reviews"]]
+            pipeline = cached_pipeline(run_honeyhive, digest)
+            started = time.perf_counter()
+            progress = st.progress(0.0, text="Running pipeline...")
+            feed = st.expander("Results as they arrive", expanded=True)
+            results, stage_seconds = run_concurrently(pipeline, st.session_state["reviews"], progress, feed)
+            st.session_state["results"] = results
+            st.session_state["timings"] = dict(stage_seconds, total=time.perf_counter() - started)
             st.success("Pipeline completed! Check the responses below.")
 
 reviews: List[Dict[str, str]] = st.session_state.get("reviews", [])
 results: List[ReviewResult] = st.session_state.get("results", [])
+timings: Dict[str, float] = st.session_state.get("timings", {})
+
+if timings:
+    st.caption("Stage timings (summed across worker threads) and wall-clock total")
+    for col, (name, seconds) in zip(st.columns(len(timings)), timings.items()):
+        col.metric(name.capitalize(), f"{seconds * 1000:.1f} ms")
+
+page_count = max(1, -(-len(reviews) // PAGE_SIZE))
+page = 1
+if page_count > 1:
+    page = int(st.number_input(f"Page (of {page_count}, {PAGE_SIZE} reviews each)", 1, page_count, 1))
+first = (page - 1) * PAGE_SIZE
 
 left, right = st.columns(2)
 
@@ -105,7 +222,7 @@ with left:
     if not reviews:
         st.info("Click 'Load Sample Reviews' to populate this column.")
     else:
-        for idx, review in enumerate(reviews, start=1):
+        for idx, review in enumerate(reviews[first:first + PAGE_SIZE], start=first + 1):
             st.markdown(f"**Review {idx}** — {review.get('author', 'Anonymous')} ({review.get('rating', 'N/A')}★)")
             st.write(f"*\"{review.get('text', '')}\"*")
             meta = {key: review[key] for key in ["id", "date", "store"] if key in review}
@@ -118,7 +235,7 @@ with right:
     if not results:
         st.info("Run the pipeline to generate responses.")
     else:
-        for idx, result in enumerate(results, start=1):
+        for idx, result in enumerate(results[first:first + PAGE_SIZE], start=first + 1):
             st.markdown(f"**Response {idx}** — classified as `{result.category}`")
             st.write(f"*\"{result.response}\"*")
             
@@ -1,32 +1,174 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-from pipeline import AiriaPipeline
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from honeyhive import span_exporter
+from job_queue import JobQueue, JobWorkers, QueueFull, open_job_queue
+from metrics import GaugeSample, LatencyHistogram, register_collector, render_prometheus
+from pipeline import AiriaPipeline, ReviewResult
+from tenants import TenantRegistry
 from dotenv import load_dotenv
 load_dotenv()
 
-app = FastAPI()
-pipeline = AiriaPipeline(enable_honeyhive=True)
+logger = logging.getLogger(__name__)
+
+# The pipeline (FAQ load, index build, embeddings) is built on a background
+# thread at startup instead of at import, so the server binds immediately;
+# /ready reports when it can serve. PIPELINE_WARMUP=0 builds it on the first
+# request instead.
+_pipeline: Optional[AiriaPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def _build_pipeline() -> AiriaPipeline:
+    # HONEYHIVE_BACKGROUND_SCORING=1 takes evaluation off the /respond path;
+    # responses then carry a null honeyhive_score, and each score is logged on
+    # the "pipeline" logger at INFO once computed. REVIEW_DEDUP=1 reuses the
+    # category and FAQ entry of earlier duplicate reviews.
+    pipeline = AiriaPipeline(
+        enable_honeyhive=True,
+        background_scoring=os.getenv("HONEYHIVE_BACKGROUND_SCORING") == "1",
+        dedup=os.getenv("REVIEW_DEDUP") == "1",
+    )
+    if os.getenv("FAQ_WATCH_INTERVAL"):
+        # Pick up edits to the FAQ file without a restart.
+        pipeline.retriever.start_watching(float(os.environ["FAQ_WATCH_INTERVAL"]))
+    return pipeline
+
+
+def get_pipeline() -> AiriaPipeline:
+    """Return the shared pipeline, building it on first use."""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = _build_pipeline()
+    return _pipeline
+
+
+def _warm_up() -> None:
+    try:
+        get_pipeline()
+    except Exception:
+        # Requests retry the build through get_pipeline and surface the error.
+        logger.exception("Pipeline warm-up failed")
+
+
+async def _ready_pipeline() -> AiriaPipeline:
+    if _pipeline is not None:
+        return _pipeline
+    # Building blocks on file and network I/O; keep it off the event loop.
+    return await run_in_threadpool(get_pipeline)
+
+
+# Reviews naming an app_id are answered from that app's FAQ file under
+# TENANT_FAQ_DIR (default data/faqs/<app_id>.json); tenants share the
+# default pipeline's evaluator, scoring worker, embedding model and
+# embedding cache and are evicted least-recently-used past
+# TENANT_MEMORY_BUDGET_MB.
+tenant_registry = TenantRegistry(
+    pipeline_factory=lambda retriever: get_pipeline().with_retriever(retriever),
+    base_retriever=lambda: get_pipeline().retriever,
+)
+
+
+async def _route(app_id: Optional[str]) -> Tuple[AiriaPipeline, Optional[LatencyHistogram]]:
+    """The pipeline serving ``app_id`` and its latency histogram (none for the default FAQ)."""
+    if app_id is None:
+        return await _ready_pipeline(), None
+    tenant = tenant_registry.cached(app_id)
+    if tenant is None:
+        try:
+            tenant = await run_in_threadpool(tenant_registry.get, app_id)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"Unknown app {app_id!r}")
+    return tenant.pipeline, tenant.latency
+
+
+# POST /jobs queues reviews for a pool of JOB_WORKERS threads that answer
+# them in micro-batches. JOB_QUEUE=sqlite keeps queued reviews across
+# restarts; past JOB_QUEUE_MAX_PENDING queued reviews, submissions get a 429.
+_job_queue: Optional[JobQueue] = None
+_job_workers: Optional[JobWorkers] = None
+_job_lock = threading.Lock()
+
+
+def _job_pipeline(app_id: Optional[str]) -> AiriaPipeline:
+    return get_pipeline() if app_id is None else tenant_registry.get(app_id).pipeline
+
+
+def get_job_queue() -> JobQueue:
+    """Return the shared job queue, opening it and starting its workers on first use."""
+    global _job_queue, _job_workers
+    if _job_queue is None:
+        with _job_lock:
+            if _job_queue is None:
+                queue = open_job_queue()
+                _job_workers = JobWorkers(
+                    queue, _job_pipeline, workers=int(os.getenv("JOB_WORKERS", "2")), batch_size=BATCH_SIZE
+                ).start()
+                _job_queue = queue
+    return _job_queue
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    if os.getenv("PIPELINE_WARMUP", "1") != "0":
+        threading.Thread(target=_warm_up, name="pipeline-warmup", daemon=True).start()
+    yield
+    if _job_workers is not None:
+        _job_workers.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+BATCH_SIZE = 64
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
 
 # Define request payload
 class Review(BaseModel):
     text: str
     author: str
     rating: int
+    id: Optional[str] = None
+    date: Optional[str] = None
+    store: Optional[str] = None
+    locale: Optional[str] = None
+    app_id: Optional[str] = None
 
-@app.post("/respond")
-def respond(review: Review):
-    # Use real pipeline with HoneyHive tracing
-    review_dict = {
-        "text": review.text,
-        "author": review.author,
-        "rating": review.rating,
-        "id": "api_request",
-        "date": "2025-09-19",
-        "store": "api"
-    }
-    
-    result = pipeline.run(review_dict)
-    
+    def to_review_dict(self) -> Dict[str, Any]:
+        """Pipeline review dict; unset metadata keeps the legacy placeholders."""
+        review = {
+            "text": self.text,
+            "author": self.author,
+            "rating": self.rating,
+            "id": self.id or "api_request",
+            "date": self.date or "2025-09-19",
+            "store": self.store or "api"
+        }
+        if self.locale:
+            review["locale"] = self.locale
+        return review
+
+
+class JobRequest(BaseModel):
+    reviews: List[Review]
+    app_id: Optional[str] = None
+
+
+def result_payload(result: ReviewResult) -> Dict[str, Any]:
+    """Shape a pipeline result into the JSON returned by the API."""
+    score = result.honeyhive_score
     return {
         "category": result.category,
         "faq_entry": {
@@ -35,11 +177,229 @@ def respond(review: Review):
         },
         "response": result.response,
         "honeyhive_score": {
-            "correctness": result.honeyhive_score.correctness if result.honeyhive_score else None,
-            "relevance": result.honeyhive_score.relevance if result.honeyhive_score else None,
-            "tone": result.honeyhive_score.tone if result.honeyhive_score else None,
-            "clarity": result.honeyhive_score.clarity if result.honeyhive_score else None,
-            "helpfulness": result.honeyhive_score.helpfulness if result.honeyhive_score else None,
-            "notes": result.honeyhive_score.notes if result.honeyhive_score else None
+            "correctness": score.correctness if score else None,
+            "relevance": score.relevance if score else None,
+            "tone": score.tone if score else None,
+            "clarity": score.clarity if score else None,
+            "helpfulness": score.helpfulness if score else None,
+            "notes": score.notes if score else None
         }
     }
+
+
+@app.post("/respond")
+async def respond(review: Review):
+    # Use real pipeline with HoneyHive tracing; awaiting retrieval keeps the
+    # event loop free while the embedding request is in flight.
+    pipeline, latency = await _route(review.app_id)
+    started_ns = time.perf_counter_ns()
+    result = await pipeline.arun(review.to_review_dict())
+    if latency is not None:
+        latency.observe_ns(time.perf_counter_ns() - started_ns)
+
+    return result_payload(result)
+
+
+def _ndjson_line(payload: Dict[str, Any]) -> bytes:
+    return (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+async def _ndjson_reviews(request: Request) -> AsyncIterator[Any]:
+    """Yield a Review, or an error dict, per NDJSON line as the body arrives."""
+    pending = b""
+    line_number = 0
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield _parse_review_line(line, line_number)
+    if pending.strip():
+        yield _parse_review_line(pending, line_number + 1)
+
+
+def _parse_review_line(line: bytes, line_number: int) -> Any:
+    try:
+        return Review(**json.loads(line))
+    except (ValueError, TypeError, ValidationError) as exc:
+        return {"line": line_number, "error": str(exc)}
+
+
+async def _list_reviews(reviews: List[Review]) -> AsyncIterator[Any]:
+    for review in reviews:
+        yield review
+
+
+async def _stream_results(reviews: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    """Run reviews through the pipeline in batches, streaming one NDJSON line per result.
+
+    A batch holds reviews of one app; a review for another app flushes it.
+    Reviews for an unknown app get an ``{"id", "error"}`` record.
+    """
+    batch: List[Dict[str, Any]] = []
+    app_id: Optional[str] = None
+
+    async def flush() -> AsyncIterator[bytes]:
+        try:
+            pipeline, latency = await _route(app_id)
+        except HTTPException as exc:
+            for review in batch:
+                yield _ndjson_line({"id": review.get("id"), "error": exc.detail})
+            return
+        started_ns = time.perf_counter_ns()
+        results = await run_in_threadpool(pipeline.run_batch, list(batch), BATCH_SIZE)
+        if latency is not None and results:
+            # One observation per review, at the batch's mean latency.
+            per_review_ns = (time.perf_counter_ns() - started_ns) // len(results)
+            for _ in results:
+                latency.observe_ns(per_review_ns)
+        for result in results:
+            yield _ndjson_line({"id": result.review.get("id"), **result_payload(result)})
+
+    async for item in reviews:
+        if isinstance(item, dict) or (batch and item.app_id != app_id):
+            # Flush first so the error line keeps its place in input order.
+            if batch:
+                async for line in flush():
+                    yield line
+                batch = []
+            if isinstance(item, dict):
+                yield _ndjson_line(item)
+                continue
+        app_id = item.app_id
+        batch.append(item.to_review_dict())
+        if len(batch) >= BATCH_SIZE:
+            async for line in flush():
+                yield line
+            batch = []
+    if batch:
+        async for line in flush():
+            yield line
+
+
+@app.post("/respond/batch")
+async def respond_batch(request: Request):
+    """Respond to many reviews over one connection.
+
+    Accepts a JSON array of reviews or an NDJSON body (``Content-Type:
+    application/x-ndjson``) and streams one NDJSON result per review, in
+    input order, as each batch completes. Invalid NDJSON lines produce an
+    ``{"line", "error"}`` record instead of aborting the stream.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith(NDJSON_MEDIA_TYPE):
+        reviews = _ndjson_reviews(request)
+    else:
+        try:
+            body = await request.json()
+            if not isinstance(body, list):
+                raise ValueError("expected a JSON array of reviews")
+            reviews = _list_reviews([Review(**item) for item in body])
+        except (ValueError, TypeError, ValidationError) as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+    return StreamingResponse(_stream_results(reviews), media_type=NDJSON_MEDIA_TYPE)
+
+
+@app.post("/jobs", status_code=202)
+def submit_job(job: JobRequest):
+    """Queue reviews for background processing; poll ``GET /jobs/{job_id}`` for results.
+
+    Returns 429 with a ``Retry-After`` header while the queue is full.
+    """
+    if job.app_id is not None:
+        try:
+            tenant_registry.faq_path(job.app_id)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"Unknown app {job.app_id!r}")
+    try:
+        job_id = get_job_queue().submit([review.to_review_dict() for review in job.reviews], job.app_id)
+    except QueueFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": str(exc.retry_after)})
+    except ValueError as exc:
+        raise HTTPException(status_code=413 if job.reviews else 422, detail=str(exc))
+    return {"job_id": job_id, "status": "queued", "total": len(job.reviews)}
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    """Status of a queued job with its results so far, in input order (``null`` while pending)."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id!r}")
+    job["results"] = [
+        None if data is None else {"id": data["review"].get("id"), **result_payload(ReviewResult.from_dict(data))}
+        for data in job["results"]
+    ]
+    return job
+
+
+def _pipeline_gauges() -> Iterator[GaugeSample]:
+    """Cache and exporter state read at scrape time."""
+    pipeline = _pipeline
+    yield ("pipeline_ready", "1 once the pipeline has been built and can serve requests.", {}, int(pipeline is not None))
+    jobs = _job_queue
+    if jobs is not None:
+        yield ("job_queue_pending", "Queued reviews not yet answered.", {}, jobs.pending)
+        yield ("job_queue_capacity", "Queued reviews beyond which job submissions get a 429.", {}, jobs.max_pending)
+        yield ("job_drain_rate", "Reviews answered per second by the job workers, recently.", {}, jobs.drain_rate())
+    if pipeline is None:
+        return
+    retriever = pipeline.retriever
+    yield ("retriever_info", "Configured and active retriever backend.",
+           {"configured": retriever.requested_backend, "active": retriever.backend}, 1)
+    snapshot = retriever.snapshot
+    yield ("faq_version", "Version of the FAQ snapshot being served; bumps on every reload.", {}, snapshot.version)
+    yield ("faq_entries", "Live FAQ entries in the served snapshot.", {}, len(snapshot.entries) - snapshot.deleted)
+    if retriever.query_cache is not None:
+        stats = retriever.query_cache.stats()
+        yield ("query_cache_entries", "Entries held in the retriever query cache.", {}, stats["size"])
+        yield ("query_cache_hit_ratio", "Hit ratio of the retriever query cache.", {}, stats["hit_ratio"])
+    cache = retriever.embedding_cache
+    if cache is not None:
+        lookups = cache.hits + cache.misses
+        yield ("embedding_cache_hit_ratio", "Hit ratio of the FAQ embedding cache.", {},
+               cache.hits / lookups if lookups else 0.0)
+    if pipeline.dedup is not None:
+        stats = pipeline.dedup.stats()
+        yield ("dedup_ratio", "Share of reviews matched to an earlier duplicate.", {}, stats["dedup_ratio"])
+        yield ("dedup_seconds_saved", "Estimated classify and retrieve time saved by dedup, net of its own cost.", {},
+               stats["seconds_saved"])
+    worker = pipeline.scoring_worker
+    if worker is not None:
+        yield ("scoring_queue_depth", "Responses waiting for background scoring.", {}, worker.pending)
+    exporter = span_exporter()
+    if exporter is not None:
+        yield ("spans_exported", "Spans delivered by the trace exporter.", {}, exporter.exported)
+        yield ("spans_dropped", "Spans dropped because the export queue was full.", {}, exporter.dropped)
+    stats = tenant_registry.stats()
+    yield ("tenants_loaded", "Per-app FAQ retrievers currently loaded.", {}, stats["loaded"])
+    for tenant in stats["tenants"]:
+        labels = {"app_id": tenant["app_id"]}
+        yield ("tenant_memory_bytes", "Estimated memory held by an app's FAQ retriever.", labels, tenant["bytes"])
+        yield ("tenant_faq_entries", "Live FAQ entries loaded for an app.", labels, tenant["faq_entries"])
+
+
+register_collector(_pipeline_gauges)
+
+
+@app.get("/ready")
+def ready():
+    """Readiness probe: 503 until the warm-up (or first request) has built the pipeline."""
+    if _pipeline is None:
+        return JSONResponse({"ready": False}, status_code=503)
+    return {"ready": True, "backend": _pipeline.retriever.backend}
+
+
+@app.get("/tenants")
+def tenants():
+    """Loaded per-app retrievers with their estimated memory and response latency."""
+    return tenant_registry.stats()
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint: stage latency histograms, counters and cache gauges."""
+    return PlainTextResponse(render_prometheus(), media_type=PROMETHEUS_MEDIA_TYPE)
@@ -0,0 +1 @@
+"""Offline benchmarks for the App Review Responder pipeline."""
@@ -0,0 +1,88 @@
+"""Load test the async ``/respond`` endpoint against the previous sync version.
+
+Starts a local stub embedding server, points the OpenAI embedding client at
+it, and drives ``backend.app`` in-process through httpx's ASGI transport.
+The sync baseline is the former ``def respond`` handler, which FastAPI runs
+in its worker threadpool. Requires fastapi, httpx and LlamaIndex::
+
+    python -m benchmarks.backend_load --requests 2000 --concurrency 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import List
+
+from benchmarks.stub_embedding_server import StubEmbeddingServer
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def drive(client, path: str, requests: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(index: int) -> None:
+        payload = {"text": f"The app crashes when I upload photo number {index}", "author": "bench", "rating": 2}
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(path, json=payload)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    elapsed = time.perf_counter() - start
+    print(
+        f"{path:<14} {requests / elapsed:8.1f} req/s  "
+        f"p50 {percentile(latencies, 0.50) * 1000:7.1f} ms  "
+        f"p99 {percentile(latencies, 0.99) * 1000:7.1f} ms"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    import httpx
+
+    stub = StubEmbeddingServer(("127.0.0.1", 0), latency=args.latency_ms / 1000).start()
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["OPENAI_API_BASE"] = stub.base_url
+    os.environ["FAQ_RETRIEVER_BACKEND"] = "llamaindex"
+    os.environ["FAQ_EMBEDDING_CACHE_DIR"] = tempfile.mkdtemp()
+
+    import backend
+
+    # ASGITransport skips lifespan events, so build the pipeline up front.
+    pipeline = backend.get_pipeline()
+
+    @backend.app.post("/respond_sync")
+    def respond_sync(review: backend.Review):
+        review_dict = {"text": review.text, "author": review.author, "rating": review.rating}
+        return backend.result_payload(pipeline.run(review_dict))
+
+    transport = httpx.ASGITransport(app=backend.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        print(f"{args.requests} requests, concurrency {args.concurrency}, stub latency {args.latency_ms:.0f} ms")
+        for path in ("/respond_sync", "/respond"):
+            # Unique texts keep the query cache from hiding embedding calls.
+            pipeline.retriever.invalidate_cache()
+            before = stub.requests
+            await drive(client, path, args.requests, args.concurrency)
+            print(f"{'':<14} {stub.requests - before} embedding requests")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Micro-benchmark keyword matching strategies on long reviews.
+
+Checks that classification is unchanged on ``data/scraped_reviews.json`` and
+on synthetic reviews, then times the original per-keyword classifier against
+``KeywordMatcher`` in both strategies, for the shipped keyword table and for
+a large synthetic table::
+
+    python -m benchmarks.classifier --reviews 2000 --length 4000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from benchmarks.synthetic import synthetic_reviews
+from keyword_matcher import KeywordMatcher
+from pipeline import CATEGORY_KEYWORDS, DEFAULT_CATEGORY, _classify_text
+from streaming_loader import iter_reviews
+
+SCRAPED_REVIEWS = Path(__file__).resolve().parent.parent / "data" / "scraped_reviews.json"
+
+
+def substring_classify(review_text: str) -> str:
+    """``classify_review`` as it was before the shared matcher."""
+    lowered = review_text.lower()
+    best_category = DEFAULT_CATEGORY
+    best_score = 0
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        score = sum(1 for keyword in keywords if keyword in lowered)
+        if score > best_score:
+            best_score = score
+            best_category = category
+    return best_category
+
+
+def rate(texts: List[str], func: Callable[[str], object]) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        func(text)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reviews", type=int, default=2_000)
+    parser.add_argument("--length", type=int, default=4_000, help="Approximate characters per long review")
+    parser.add_argument("--large-table", type=int, default=400, help="Keywords in the synthetic large table")
+    args = parser.parse_args()
+
+    scraped = [review["text"] for review in iter_reviews(SCRAPED_REVIEWS)]
+    synthetic = [review["text"] for review in synthetic_reviews(args.reviews)]
+    mismatches = sum(
+        1 for text in scraped + synthetic if substring_classify(text) != _classify_text(text)
+    )
+    print(f"Classification mismatches on {len(scraped)} scraped + {len(synthetic)} synthetic reviews: {mismatches}")
+
+    long_reviews = []
+    for text in synthetic:
+        repeated = (text + " ") * (args.length // (len(text) + 1) + 1)
+        long_reviews.append(repeated[:args.length].lower())
+
+    rng = random.Random(3)
+    shipped = [keyword for keywords in CATEGORY_KEYWORDS.values() for keyword in keywords]
+    large = shipped + [
+        "".join(rng.choice("abcdefghilmnoprstuwy") for _ in range(rng.randint(3, 9)))
+        for _ in range(args.large_table - len(shipped))
+    ]
+    for label, keywords in (("shipped table", shipped), ("large table", large)):
+        scan = KeywordMatcher(keywords, strategy="scan")
+        regex = KeywordMatcher(keywords, strategy="regex")
+        assert all(scan.find(text) == regex.find(text) for text in long_reviews[:200])
+        print(f"{label} ({len(scan.keywords)} keywords, {args.length} chars per review):")
+        print(f"  per-keyword scans {rate(long_reviews, lambda t: [k for k in keywords if k in t]):10,.0f} reviews/sec")
+        print(f"  matcher 'scan'    {rate(long_reviews, scan.find):10,.0f} reviews/sec")
+        print(f"  matcher 'regex'   {rate(long_reviews, regex.find):10,.0f} reviews/sec")
+        print(f"  auto strategy:    {KeywordMatcher(keywords).strategy}")
+
+
+if __name__ == "__main__":
+    main()
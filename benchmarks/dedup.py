@@ -0,0 +1,98 @@
+"""Measure the dedup stage on a feed with repeated and lightly edited reviews.
+
+Builds a synthetic feed where a share of reviews repeat an earlier one
+verbatim, with different casing/punctuation, or with a small edit, then runs
+the batch pipeline with and without dedup and reports the dedup ratio,
+backend retrievals avoided and throughput. On embedding backends every
+backend retrieval is an embedding request for the review text. Run from the
+repository root::
+
+    python -m benchmarks.dedup --reviews 20000 --duplicates 0.4
+    python -m benchmarks.dedup --backend numpy
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections import deque
+from typing import Dict, List
+
+from benchmarks.pipeline_suite import StubEmbedder
+from benchmarks.synthetic import iter_review_shapes
+from pipeline import AiriaPipeline
+from retrieval import RETRIEVALS, FAQRetriever
+
+
+def _variant(text: str, rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.4:
+        return text
+    if kind < 0.7:
+        return text.upper() if rng.random() < 0.5 else f"  {text}!!"
+    words = text.split()
+    if len(words) > 8:
+        words[rng.randrange(len(words))] = rng.choice(["really", "so", "very", "app"])
+    return " ".join(words)
+
+
+def feed_with_duplicates(count: int, duplicate_share: float, seed: int = 5) -> List[Dict[str, str]]:
+    """``count`` reviews of which about ``duplicate_share`` repeat or edit an earlier one."""
+    rng = random.Random(seed)
+    originals = iter_review_shapes(count, seed=seed)
+    feed: List[Dict[str, str]] = []
+    for idx in range(count):
+        if feed and rng.random() < duplicate_share:
+            source = rng.choice(feed)
+            feed.append(dict(source, id=f"dup-{idx}", author=f"user{idx}", text=_variant(source["text"], rng)))
+        else:
+            feed.append(next(originals))
+    return feed
+
+
+def _retrievals() -> float:
+    """FAQ lookups that reached a retrieval backend rather than the query cache."""
+    return sum(value for labels, value in RETRIEVALS.samples() if labels["path"] != "cache")
+
+
+def _run(reviews: List[Dict[str, str]], dedup: bool, batch_size: int, backend: str) -> Dict[str, float]:
+    pipeline = AiriaPipeline(enable_honeyhive=True, dedup=dedup)
+    if backend == "numpy":
+        pipeline.retriever = FAQRetriever(backend="numpy", embed_model=StubEmbedder(), use_embedding_cache=False)
+    retrievals = _retrievals()
+    start = time.perf_counter()
+    deque(pipeline.iter_results(reviews, batch_size=batch_size), maxlen=0)
+    elapsed = time.perf_counter() - start
+    stats = pipeline.dedup.stats() if pipeline.dedup is not None else {}
+    return {
+        "seconds": elapsed,
+        "retrievals": _retrievals() - retrievals,
+        "classify_retrieve_seconds": pipeline.stage_seconds["classify"] + pipeline.stage_seconds["retrieve"],
+        **stats,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reviews", type=int, default=20_000)
+    parser.add_argument("--duplicates", type=float, default=0.4, help="Share of reviews that repeat an earlier one")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--backend", choices=["keyword", "numpy"], default="keyword",
+                        help="numpy uses an offline stub embedder")
+    args = parser.parse_args()
+
+    reviews = feed_with_duplicates(args.reviews, args.duplicates)
+    baseline = _run(reviews, dedup=False, batch_size=args.batch_size, backend=args.backend)
+    deduped = _run(reviews, dedup=True, batch_size=args.batch_size, backend=args.backend)
+
+    count = len(reviews)
+    print(f"reviews: {count} (~{args.duplicates:.0%} repeated or edited), {args.backend} backend")
+    print(f"dedup ratio:          {deduped['dedup_ratio']:.1%} ({deduped['exact_hits']} exact, {deduped['near_hits']} near)")
+    print(f"backend retrievals:   {baseline['retrievals']:.0f} -> {deduped['retrievals']:.0f}")
+    print(f"classify+retrieve:    {baseline['classify_retrieve_seconds']:.3f}s -> {deduped['classify_retrieve_seconds']:.3f}s"
+          f" (estimated saving {deduped['seconds_saved']:.3f}s)")
+    print(f"throughput:           {count / baseline['seconds']:,.0f} -> {count / deduped['seconds']:,.0f} reviews/s")
+
+
+if __name__ == "__main__":
+    main()
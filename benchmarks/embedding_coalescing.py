@@ -0,0 +1,106 @@
+"""Query embedding throughput and latency with and without request coalescing.
+
+Starts the local stub embedding server and has ``--concurrency`` threads
+each embed ``--calls`` queries one at a time, either with one request per
+query (what LlamaIndex's ``OpenAIEmbedding`` does per retrieval) or through
+a :class:`~embedding_client.CoalescingEmbedder`. A share of the queries
+(``--duplicates``) repeat earlier ones. Run from the repository root::
+
+    python -m benchmarks.embedding_coalescing --concurrency 1,10,100 --latency-ms 50
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import threading
+import time
+from typing import Callable, List
+
+from benchmarks.backend_load import percentile
+from benchmarks.stub_embedding_server import StubEmbeddingServer
+from embedding_client import CoalescingEmbedder, OpenAIEmbeddingClient
+
+
+def drive(embed: Callable[[str], List[float]], queries: List[List[str]]) -> List[float]:
+    """Run one thread per query list; returns per-call latencies."""
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def caller(own: List[str]) -> None:
+        mine = []
+        for query in own:
+            start = time.perf_counter()
+            embed(query)
+            mine.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=caller, args=(own,)) for own in queries]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", default="1,10,100", help="Comma-separated numbers of concurrent callers")
+    parser.add_argument("--calls", type=int, default=20, help="Sequential queries per caller")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Stub server delay per request")
+    parser.add_argument("--duplicates", type=float, default=0.2, help="Share of queries repeating an earlier one")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--max-concurrency", type=int, default=4, help="Coalesced requests in flight")
+    args = parser.parse_args()
+
+    stub = StubEmbeddingServer(("127.0.0.1", 0), latency=args.latency_ms / 1000).start()
+    rng = random.Random(5)
+    print(f"stub latency {args.latency_ms:.0f} ms, {args.calls} calls per caller, {args.duplicates:.0%} duplicates")
+
+    for concurrency in (int(value) for value in args.concurrency.split(",")):
+        seen: List[str] = []
+        queries = []
+        for caller in range(concurrency):
+            own = []
+            for call in range(args.calls):
+                if seen and rng.random() < args.duplicates:
+                    own.append(rng.choice(seen))
+                else:
+                    own.append(f"caller {caller} query {call}: the app crashes when I open settings")
+                    seen.append(own[-1])
+            queries.append(own)
+        calls = concurrency * args.calls
+
+        direct = OpenAIEmbeddingClient(api_key="stub", api_base=stub.base_url, pool_size=concurrency)
+        coalescer = CoalescingEmbedder(
+            OpenAIEmbeddingClient(api_key="stub", api_base=stub.base_url, pool_size=args.max_concurrency),
+            max_batch_size=args.max_batch,
+            max_wait=args.max_wait_ms / 1000,
+            max_concurrency=args.max_concurrency,
+        )
+        sample = queries[0][0]
+        assert direct.embed([sample])[0] == coalescer.embed([sample])[0], "coalesced vector differs"
+
+        for name, embed in (
+            ("per-call", lambda query: direct.embed([query])[0]),
+            ("coalesced", lambda query: coalescer.embed([query])[0]),
+        ):
+            requests_before = stub.requests
+            start = time.perf_counter()
+            latencies = drive(embed, queries)
+            elapsed = time.perf_counter() - start
+            print(
+                f"  {concurrency:>4} callers  {name:<10} {calls / elapsed:8,.0f} calls/s  "
+                f"p50 {percentile(latencies, 0.50) * 1000:7.1f} ms  p99 {percentile(latencies, 0.99) * 1000:7.1f} ms  "
+                f"{stub.requests - requests_before:6} requests"
+            )
+        stats = coalescer.stats()
+        print(f"{'':>20}coalesced mean batch {stats['mean_batch_size']:.1f}, {stats['deduplicated']} duplicate texts not sent")
+        coalescer.close()
+        direct.close()
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
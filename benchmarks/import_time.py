@@ -0,0 +1,110 @@
+"""Measure cold import time of the entry points with ``python -X importtime``.
+
+Each entry point is imported in a fresh interpreter ``--repeat`` times and
+the median cumulative import time is reported with the modules that cost
+the most on their own. Entry points whose dependencies are missing (FastAPI
+for ``backend``, Streamlit for ``app``) are skipped. Run from the
+repository root::
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --save-baseline benchmarks/import_baseline.json
+    python -m benchmarks.import_time --baseline benchmarks/import_baseline.json --threshold 0.3
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.pipeline_suite import compare
+
+ENTRY_POINTS = ("pipeline", "retrieval", "honeyhive", "result_store", "backend", "app")
+DEFAULT_THRESHOLD = 0.3
+
+
+def _import_times(module: str) -> Optional[List[Tuple[str, int, int]]]:
+    """``(module, self_us, cumulative_us)`` rows for one cold import, or ``None`` if it failed."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        return None
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def bench_entry_point(module: str, repeat: int, top: int) -> Optional[Tuple[Dict[str, float], List[Tuple[str, int]]]]:
+    """Median import metrics for ``module`` plus its ``top`` costliest modules (by self time)."""
+    runs = []
+    for _ in range(repeat):
+        rows = _import_times(module)
+        if rows is None:
+            return None
+        runs.append(rows)
+    totals = [next(cumulative for name, _, cumulative in rows if name == module) for rows in runs]
+    median_run = runs[totals.index(sorted(totals)[len(totals) // 2])]
+    costliest = sorted(((name, self_us) for name, self_us, _ in median_run), key=lambda item: -item[1])[:top]
+    metrics = {
+        "import_ms": statistics.median(totals) / 1000,
+        "modules": float(len(median_run)),
+    }
+    return metrics, costliest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", default=",".join(ENTRY_POINTS), help="Comma-separated entry points to import")
+    parser.add_argument("--repeat", type=int, default=5, help="Cold imports per entry point; the median is reported")
+    parser.add_argument("--top", type=int, default=5, help="Costliest modules listed per entry point")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown, e.g. 0.25 for 25%%")
+    parser.add_argument("--save-baseline", help="Write these results as a new baseline JSON")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    for module in args.modules.split(","):
+        measured = bench_entry_point(module, args.repeat, args.top)
+        if measured is None:
+            print(f"import/{module}: import failed (missing dependency?); skipped")
+            continue
+        metrics, costliest = measured
+        results[f"import/{module}"] = metrics
+        print(f"import/{module}: {metrics['import_ms']:.1f} ms, {metrics['modules']:.0f} modules")
+        for name, self_us in costliest:
+            print(f"  {name:<40} {self_us / 1000:8.1f} ms")
+
+    if args.save_baseline:
+        payload = {
+            "machine": {"python": platform.python_version(), "platform": platform.platform()},
+            "results": results,
+        }
+        with open(args.save_baseline, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(f"baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare(results, baseline, args.threshold, args.threshold)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Burst load on the ingestion job queue: throughput, job latency and backpressure.
+
+``--producers`` threads submit ``--jobs`` jobs of ``--job-size`` synthetic
+reviews as fast as the queue admits them; a rejected submit sleeps for its
+Retry-After (capped at ``--max-backoff``) and tries again. Reported per
+queue backend: reviews per second end to end, submit-to-done latency per
+job, 429s and the deepest the queue got, next to running every review
+through ``run_batch`` directly. Run from the repository root::
+
+    python -m benchmarks.job_queue --jobs 400 --job-size 50 --max-pending 5000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+from benchmarks.backend_load import percentile
+from benchmarks.synthetic import synthetic_reviews
+from job_queue import JobQueue, JobWorkers, MemoryJobQueue, QueueFull, SQLiteJobQueue
+from pipeline import AiriaPipeline
+
+
+def burst(queue: JobQueue, pipeline: AiriaPipeline, reviews: List[Dict[str, str]], args: argparse.Namespace) -> None:
+    workers = JobWorkers(queue, lambda app_id: pipeline, workers=args.workers, batch_size=args.batch_size).start()
+    submitted: Dict[str, float] = {}
+    rejected = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def produce(offsets: range) -> None:
+        nonlocal rejected, peak
+        for offset in offsets:
+            job = reviews[offset * args.job_size:(offset + 1) * args.job_size]
+            while True:
+                try:
+                    started = time.perf_counter()
+                    job_id = queue.submit(job)
+                    break
+                except QueueFull as exc:
+                    with lock:
+                        rejected += 1
+                    time.sleep(min(exc.retry_after, args.max_backoff))
+            with lock:
+                submitted[job_id] = started
+                peak = max(peak, queue.pending)
+
+    start = time.perf_counter()
+    producers = [
+        threading.Thread(target=produce, args=(range(index, args.jobs, args.producers),))
+        for index in range(args.producers)
+    ]
+    for producer in producers:
+        producer.start()
+    latencies: List[float] = []
+    finished = set()
+    while len(finished) < args.jobs:
+        with lock:
+            outstanding = [job_id for job_id in submitted if job_id not in finished]
+        for job_id in outstanding:
+            job = queue.get(job_id)
+            if job is not None and job["status"] in ("done", "failed"):
+                finished.add(job_id)
+                latencies.append(time.perf_counter() - submitted[job_id])
+        time.sleep(0.002)
+    elapsed = time.perf_counter() - start
+    for producer in producers:
+        producer.join()
+    workers.stop()
+    print(
+        f"{type(queue).__name__:<16} {len(reviews) / elapsed:8,.0f} reviews/s  "
+        f"job p50 {percentile(latencies, 0.50) * 1000:7.1f} ms  p95 {percentile(latencies, 0.95) * 1000:7.1f} ms  "
+        f"429s {rejected:5}  peak depth {peak}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=400)
+    parser.add_argument("--job-size", type=int, default=50)
+    parser.add_argument("--producers", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--max-pending", type=int, default=5000, help="Queue capacity in reviews")
+    parser.add_argument("--max-backoff", type=float, default=0.05, help="Cap on the Retry-After sleep, in seconds")
+    parser.add_argument("--queues", default="memory,sqlite", help="Comma-separated queue backends")
+    args = parser.parse_args()
+
+    pipeline = AiriaPipeline(enable_honeyhive=False)
+    reviews = synthetic_reviews(args.jobs * args.job_size)
+    print(f"{args.jobs} jobs x {args.job_size} reviews, {args.producers} producers, {args.workers} workers")
+
+    start = time.perf_counter()
+    pipeline.run_batch(reviews, args.batch_size)
+    print(f"{'run_batch':<16} {len(reviews) / (time.perf_counter() - start):8,.0f} reviews/s")
+
+    for kind in args.queues.split(","):
+        if kind == "sqlite":
+            queue: JobQueue = SQLiteJobQueue(os.path.join(tempfile.mkdtemp(), "jobs.sqlite3"), args.max_pending)
+        else:
+            queue = MemoryJobQueue(args.max_pending)
+        burst(queue, pipeline, reviews, args)
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
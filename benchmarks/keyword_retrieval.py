@@ -0,0 +1,73 @@
+"""Compare the inverted keyword index with the original linear FAQ scan.
+
+Run from the repository root::
+
+    python -m benchmarks.keyword_retrieval --entries 10000 --queries 200
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.synthetic import synthetic_faq_entries, synthetic_reviews
+from keyword_index import KEYWORD_TOKENS, KeywordIndex
+from pipeline import classify_review
+
+
+def linear_scan(entries: List[Dict[str, str]], query: str, category: Optional[str]) -> Dict[str, str]:
+    """The keyword fallback exactly as ``FAQRetriever.retrieve`` used to run it."""
+    lowered_query = query.lower()
+    best_score = -1
+    best_entry = entries[0]
+    for entry in entries:
+        score = 0
+        if category and entry.get("category") == category:
+            score += 5
+        title = entry.get("title", "").lower()
+        body = entry.get("body", "").lower()
+        for token in KEYWORD_TOKENS:
+            if token in lowered_query and token in (title + body):
+                score += 2
+        if any(word in lowered_query for word in title.split()):
+            score += 1
+        if any(word in lowered_query for word in body.split()):
+            score += 0.5
+        if score > best_score:
+            best_score = score
+            best_entry = entry
+    return best_entry
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    entries = synthetic_faq_entries(args.entries)
+    queries = [(review["text"], classify_review(review["text"])) for review in synthetic_reviews(args.queries)]
+
+    start = time.perf_counter()
+    index = KeywordIndex(entries)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = [linear_scan(entries, text, category) for text, category in queries]
+    linear_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [index.best(text, category) for text, category in queries]
+    index_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for left, right in zip(expected, actual) if left is not right)
+    print(f"FAQ entries:      {args.entries}")
+    print(f"Index build:      {build_seconds * 1000:.1f} ms")
+    print(f"Linear scan:      {len(queries) / linear_seconds:,.1f} queries/sec")
+    print(f"Inverted index:   {len(queries) / index_seconds:,.1f} queries/sec")
+    print(f"Speedup:          {linear_seconds / index_seconds:.1f}x")
+    print(f"Mismatches:       {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Time every pipeline stage at several scales and flag regressions against a baseline.
+
+Runs offline: the keyword backend needs nothing, and the NumPy backend (when
+numpy is installed) uses a deterministic stub embedder instead of a remote
+model. Run from the repository root::
+
+    python -m benchmarks.pipeline_suite --scales small,medium
+    python -m benchmarks.pipeline_suite --scales small --save-baseline benchmarks/baseline.json
+    python -m benchmarks.pipeline_suite --baseline benchmarks/baseline.json --threshold 0.3
+
+With ``--baseline`` the process exits with status 1 if any metric got worse
+than its threshold allows.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from benchmarks.stub_embedding_server import stub_vector
+from benchmarks.synthetic import iter_review_shapes, synthetic_faq_entries
+from pipeline import AiriaPipeline, classify_review, generate_response
+from retrieval import FAQRetriever
+from vector_index import NUMPY_AVAILABLE
+
+# name: (FAQ entries, reviews)
+SCALES: Dict[str, Tuple[int, int]] = {
+    "small": (10, 1_000),
+    "medium": (1_000, 10_000),
+    "large": (100_000, 100_000),
+    "huge": (1_000, 1_000_000),
+}
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MEMORY_THRESHOLD = 0.25
+# Tail latencies are noisier than means, so saved baselines allow more slack.
+P95_THRESHOLD = 0.5
+
+
+class StubEmbedder:
+    """Deterministic offline embedder; the same text always maps to the same vector."""
+
+    def __init__(self, dim: int = 128) -> None:
+        self.dim = dim
+        self.model_name = f"stub-{dim}"
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        return [stub_vector(text, self.dim) for text in texts]
+
+
+def _latencies(func: Callable[[Any], Any], items: Sequence[Any]) -> List[int]:
+    durations = []
+    for item in items:
+        start = time.perf_counter_ns()
+        func(item)
+        durations.append(time.perf_counter_ns() - start)
+    return durations
+
+
+def _summarize(prefix: str, durations: List[int]) -> Dict[str, float]:
+    ordered = sorted(durations)
+    return {
+        f"{prefix}_p50_us": ordered[len(ordered) // 2] / 1e3,
+        f"{prefix}_p95_us": ordered[int(0.95 * (len(ordered) - 1))] / 1e3,
+    }
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def bench_scale(faq_count: int, review_count: int, backend: str, stage_sample: int, query_cache: bool) -> Dict[str, float]:
+    """Benchmark one FAQ size / review count / backend combination."""
+    entries = synthetic_faq_entries(faq_count)
+    embed_model = StubEmbedder() if backend == "numpy" else None
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    retriever = FAQRetriever(
+        entries,
+        backend=backend,
+        embed_model=embed_model,
+        use_embedding_cache=False,
+        query_cache_size=10_000 if query_cache else 0,
+    )
+    build_seconds = time.perf_counter() - start
+    _, index_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    pipeline = AiriaPipeline(enable_honeyhive=True)
+    pipeline.retriever = retriever
+
+    sample = list(islice(iter_review_shapes(review_count), stage_sample))
+    texts = [review["text"] for review in sample]
+    categories = [classify_review(text) for text in texts]
+    faq_hits = [retriever.retrieve(text, category) for text, category in zip(texts, categories)]
+    responses = [generate_response(review, category, entry) for review, category, entry in zip(sample, categories, faq_hits)]
+
+    metrics: Dict[str, float] = {"build_seconds": build_seconds, "index_peak_mb": index_peak / (1024 * 1024)}
+    metrics.update(_summarize("classify", _latencies(classify_review, texts)))
+    metrics.update(_summarize("retrieve", _latencies(lambda args: retriever.retrieve(*args), list(zip(texts, categories)))))
+    metrics.update(_summarize("generate", _latencies(lambda args: generate_response(*args), list(zip(sample, categories, faq_hits)))))
+    metrics.update(_summarize("score", _latencies(lambda args: pipeline.honeyhive.score(*args), list(zip(texts, responses, faq_hits)))))
+    metrics.update(_summarize("run", _latencies(pipeline.run, sample)))
+
+    start = time.perf_counter()
+    deque(pipeline.iter_results(iter_review_shapes(review_count)), maxlen=0)
+    metrics["batch_reviews_per_second"] = review_count / (time.perf_counter() - start)
+    metrics["max_rss_mb"] = _max_rss_mb()
+    return metrics
+
+
+def _higher_is_better(metric: str) -> bool:
+    return metric.endswith("_per_second")
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Any],
+    threshold: float,
+    memory_threshold: float,
+) -> List[str]:
+    """Return a description of every metric that regressed past its threshold.
+
+    Per-metric thresholds in the baseline's ``thresholds`` mapping override
+    the defaults; memory metrics (``*_mb``) use ``memory_threshold``.
+    """
+    overrides: Dict[str, float] = baseline.get("thresholds", {})
+    regressions = []
+    for key, metrics in results.items():
+        base_metrics = baseline.get("results", {}).get(key)
+        if base_metrics is None:
+            continue
+        for metric, value in metrics.items():
+            base_value = base_metrics.get(metric)
+            if not base_value:
+                continue
+            default = memory_threshold if metric.endswith("_mb") else threshold
+            allowed = overrides.get(metric, default)
+            if _higher_is_better(metric):
+                regressed = value < base_value * (1 - allowed)
+            else:
+                regressed = value > base_value * (1 + allowed)
+            if regressed:
+                change = (value - base_value) / base_value
+                regressions.append(f"{key} {metric}: {base_value:.3f} -> {value:.3f} ({change:+.0%}, allowed {allowed:.0%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="small,medium", help=f"Comma-separated subset of {', '.join(SCALES)}")
+    parser.add_argument("--backends", default="keyword,numpy", help="Comma-separated retriever backends")
+    parser.add_argument("--stage-sample", type=int, default=2_000, help="Reviews timed call by call per stage")
+    parser.add_argument("--query-cache", action="store_true", help="Keep the retriever query cache enabled")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown, e.g. 0.25 for 25%%")
+    parser.add_argument("--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD)
+    parser.add_argument("--save-baseline", help="Write these results as a new baseline JSON")
+    args = parser.parse_args()
+
+    backends = [backend for backend in args.backends.split(",") if backend]
+    if "numpy" in backends and not NUMPY_AVAILABLE:
+        print("numpy not installed; skipping the numpy backend")
+        backends.remove("numpy")
+
+    results: Dict[str, Dict[str, float]] = {}
+    for scale in args.scales.split(","):
+        faq_count, review_count = SCALES[scale]
+        for backend in backends:
+            key = f"{scale}/{backend}"
+            metrics = bench_scale(faq_count, review_count, backend, args.stage_sample, args.query_cache)
+            results[key] = metrics
+            print(f"{key} ({faq_count} FAQ entries, {review_count} reviews)")
+            for metric, value in metrics.items():
+                print(f"  {metric:<26} {value:12.3f}")
+
+    if args.save_baseline:
+        payload = {
+            "machine": {"python": platform.python_version(), "platform": platform.platform()},
+            "thresholds": {
+                metric: P95_THRESHOLD
+                for metrics in results.values()
+                for metric in metrics
+                if metric.endswith("_p95_us")
+            },
+            "results": results,
+        }
+        with open(args.save_baseline, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(f"baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare(results, baseline, args.threshold, args.memory_threshold)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
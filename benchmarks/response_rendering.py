@@ -0,0 +1,87 @@
+"""Compare precompiled response templates with the original f-string renderer.
+
+Run from the repository root::
+
+    python -m benchmarks.response_rendering --reviews 50000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict
+
+from benchmarks.synthetic import iter_review_shapes, synthetic_faq_entries
+from pipeline import RESPONSE_TEMPLATES, classify_reviews
+
+
+def legacy_render(review: Dict[str, str], category: str, faq_entry: Dict[str, str]) -> str:
+    """``generate_response`` exactly as it was before templates were precompiled."""
+    author = review.get("author") or "there"
+    rating = review.get("rating")
+    review_text = review.get("text", "")
+    base_intro = {
+        "bug": "I'm sorry you're running into trouble",
+        "feature request": "Thank you for the thoughtful idea",
+        "praise": "We're thrilled you're enjoying the app",
+        "complaint": "Thanks for sharing your experience",
+    }.get(category, "Thanks for reaching out")
+
+    rating_snippet = f" and for leaving a {rating}-star rating" if rating else ""
+    faq_answer = faq_entry.get("body", "")
+    category_line = {
+        "bug": "Our engineers are actively looking into issues like the one you described.",
+        "feature request": "I've shared your request with the product team so it can influence the roadmap.",
+        "praise": "Feedback like yours keeps us motivated to keep building.",
+        "complaint": "We're keeping a close eye on similar reports so we can improve right away.",
+    }.get(category, "We're on it.")
+
+    response = (
+        f"Hi {author}, {base_intro}{rating_snippet}. "
+        f"I read your note (\"{review_text}\") and want you to know we're listening. "
+        f"{faq_answer} {category_line}"
+        " If you have more details to share, just reply to this review or contact support and we'll jump in."
+        " Thanks again for helping us build a better app!"
+    )
+    return response.strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reviews", type=int, default=50_000)
+    args = parser.parse_args()
+
+    reviews = list(iter_review_shapes(args.reviews))
+    # Edge cases the templates must reproduce: no author, zero/absent rating, unknown category.
+    reviews[:4] = [
+        {"text": "no author", "rating": 0},
+        {"author": "", "text": "blank author", "rating": None},
+        {"author": "kim", "rating": 4.5},
+        {"author": "lee", "text": "other", "rating": 3, "store": "api"},
+    ]
+    faq = synthetic_faq_entries(64)
+    entries = [faq[idx % len(faq)] for idx in range(len(reviews))]
+    categories = classify_reviews([review.get("text", "") for review in reviews])
+    categories[3] = "uncategorised"
+
+    start = time.perf_counter()
+    expected = [legacy_render(review, category, entry) for review, category, entry in zip(reviews, categories, entries)]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [RESPONSE_TEMPLATES.render(review, category, entry) for review, category, entry in zip(reviews, categories, entries)]
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = RESPONSE_TEMPLATES.render_batch(reviews, categories, entries)
+    batch_seconds = time.perf_counter() - start
+
+    assert single == expected and batch == expected, "template output differs from the original renderer"
+    count = len(reviews)
+    print(f"reviews: {count}")
+    print(f"f-string renderer:  {count / legacy_seconds:12,.0f} renders/s")
+    print(f"template render:    {count / single_seconds:12,.0f} renders/s")
+    print(f"template batch:     {count / batch_seconds:12,.0f} renders/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Memory held per result: dict-backed results vs slotted results vs ``ResultColumns``.
+
+Runs ``--distinct`` synthetic reviews through the pipeline, then rebuilds
+``--results`` results from their ``to_dict`` JSON, as a batch job reading
+its JSONL output back would, with a fresh review per result. The baseline
+is the former ``ReviewResult`` (a plain dataclass holding its own copy of
+the FAQ entry). Memory is measured with ``tracemalloc`` and scaled to one
+million results. Run from the repository root::
+
+    python -m benchmarks.result_memory --results 200000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.synthetic import synthetic_reviews
+from pipeline import AiriaPipeline, ReviewResult
+from result_columns import ResultColumns
+
+
+@dataclass
+class _LegacyScore:
+    correctness: float
+    relevance: float
+    tone: float
+    clarity: float
+    helpfulness: float
+    notes: str
+
+
+@dataclass
+class _LegacyResult:
+    review: Dict[str, str]
+    category: str
+    faq_entry: Dict[str, str]
+    response: str
+    honeyhive_score: Optional[_LegacyScore] = None
+
+
+def _legacy(data: Dict[str, Any], faq_by_id: Dict[Any, Dict[str, str]]) -> _LegacyResult:
+    score = data.get("honeyhive_score")
+    return _LegacyResult(
+        review=data["review"],
+        category=data["category"],
+        faq_entry=data["faq_entry"],
+        response=data["response"],
+        honeyhive_score=_LegacyScore(**score) if score is not None else None,
+    )
+
+
+def _slotted(data: Dict[str, Any], faq_by_id: Dict[Any, Dict[str, str]]) -> ReviewResult:
+    return ReviewResult.from_dict(data, faq_by_id)
+
+
+def measure(build: Callable[[], Any]) -> float:
+    """Bytes still allocated by what ``build`` returns."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return after - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--results", type=int, default=200_000)
+    parser.add_argument("--distinct", type=int, default=2_000, help="Distinct reviews run through the pipeline")
+    args = parser.parse_args()
+
+    pipeline = AiriaPipeline(enable_honeyhive=True)
+    lines = [json.dumps(result.to_dict(), ensure_ascii=False) for result in pipeline.run_batch(synthetic_reviews(args.distinct))]
+    faq_by_id = pipeline._faq_by_id()
+    scale = 1_000_000 / args.results
+    print(f"{args.results:,} results from {args.distinct:,} distinct reviews; figures scaled to 1M results")
+
+    def rows(convert: Callable[[Dict[str, Any], Dict[Any, Dict[str, str]]], Any]) -> List[Any]:
+        return [convert(json.loads(lines[index % len(lines)]), faq_by_id) for index in range(args.results)]
+
+    def columns() -> ResultColumns:
+        container = ResultColumns()
+        for index in range(args.results):
+            container.append(ReviewResult.from_dict(json.loads(lines[index % len(lines)]), faq_by_id))
+        return container
+
+    baseline = None
+    for name, build in (
+        ("dict-backed", lambda: rows(_legacy)),
+        ("slotted", lambda: rows(_slotted)),
+        ("ResultColumns", columns),
+    ):
+        start = time.perf_counter()
+        held = measure(build)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or held
+        print(
+            f"  {name:<14} {held * scale / 2**20:9,.0f} MB per 1M  {held / args.results:7,.0f} B/result  "
+            f"{baseline / held:5.1f}x smaller  (built in {elapsed:.1f}s under tracemalloc)"
+        )
+
+
+if __name__ == "__main__":
+    main()
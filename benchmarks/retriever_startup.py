@@ -0,0 +1,90 @@
+"""Measure FAQRetriever startup with a cold and a warm embedding cache.
+
+The stub embedding models count calls and sleep per request to stand in for
+network latency, so the run is fully offline. The NumPy backend always
+runs; the LlamaIndex backend is skipped when LlamaIndex is not installed::
+
+    python -m benchmarks.retriever_startup --entries 2000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import zlib
+from typing import Any, Callable, Dict, List
+
+from benchmarks.synthetic import synthetic_faq_entries
+from retrieval import LLAMA_AVAILABLE, FAQRetriever
+
+
+class CountingEmbedder:
+    """Deterministic embedder with an ``embed`` method that records how many texts it embedded."""
+
+    model_name = "counting"
+
+    def __init__(self, dim: int, latency: float) -> None:
+        self.dim = dim
+        self.latency = latency
+        self.calls = 0
+        self.texts = 0
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        self.texts += len(texts)
+        time.sleep(self.latency)
+        seeds = [zlib.crc32(text.encode("utf-8")) for text in texts]
+        return [[((seed * (position + 1)) % 1000) / 1000 for position in range(self.dim)] for seed in seeds]
+
+
+def counting_llama_embedding(dim: int, latency: float) -> Any:
+    """A LlamaIndex ``MockEmbedding`` that records how many texts it embedded."""
+    from llama_index.core import MockEmbedding
+
+    class CountingEmbedding(MockEmbedding):
+        calls: int = 0
+        texts: int = 0
+        latency: float = 0.0
+
+        def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+            self.calls += 1
+            self.texts += len(texts)
+            time.sleep(self.latency)
+            return super()._get_text_embeddings(texts)
+
+    return CountingEmbedding(embed_dim=dim, latency=latency)
+
+
+def run(backend: str, make_embedder: Callable[[], Any], entries: List[Dict[str, str]]) -> None:
+    print(f"{backend} backend")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        edited = [dict(entry) for entry in entries]
+        edited[0]["body"] += " Updated."
+        for label, faq_entries in (("cold", entries), ("warm", entries), ("1 edit", edited)):
+            embed_model = make_embedder()
+            start = time.perf_counter()
+            FAQRetriever(faq_entries, embed_model=embed_model, embedding_cache_dir=cache_dir, backend=backend)
+            elapsed = time.perf_counter() - start
+            print(
+                f"  {label:>6} start: {elapsed * 1000:8.1f} ms, "
+                f"{embed_model.calls} embedding requests, {embed_model.texts} texts embedded"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=2_000)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Simulated latency per embedding request")
+    args = parser.parse_args()
+
+    entries = synthetic_faq_entries(args.entries)
+    latency = args.latency_ms / 1000
+    run("numpy", lambda: CountingEmbedder(256, latency), entries)
+    if LLAMA_AVAILABLE:
+        run("llamaindex", lambda: counting_llama_embedding(256, latency), entries)
+    else:
+        print("LlamaIndex is not installed; skipping the llamaindex backend")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Compare per-response HoneyHive scoring with the columnar ``score_batch`` path.
+
+Checks that batch scores equal ``score`` on every row, then reports
+responses scored per second for each path. Run from the repository root::
+
+    python -m benchmarks.scoring --reviews 20000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.synthetic import iter_review_shapes, synthetic_faq_entries
+from honeyhive import HoneyHiveEvaluator
+from pipeline import classify_reviews, generate_responses
+from vector_index import NUMPY_AVAILABLE
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reviews", type=int, default=20_000)
+    args = parser.parse_args()
+
+    reviews = list(iter_review_shapes(args.reviews))
+    texts = [review["text"] for review in reviews]
+    faq = synthetic_faq_entries(64) + [{}, {"title": "", "body": "crash"}]
+    entries = [faq[idx % len(faq)] for idx in range(len(reviews))]
+    responses = generate_responses(reviews, classify_reviews(texts), entries)
+    evaluator = HoneyHiveEvaluator()
+
+    start = time.perf_counter()
+    expected = [evaluator.score(text, response, entry) for text, response, entry in zip(texts, responses, entries)]
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = evaluator.score_batch(texts, responses, entries)
+    batch_seconds = time.perf_counter() - start
+
+    assert batch.scores() == expected, "score_batch differs from score"
+    count = len(reviews)
+    print(f"reviews: {count} (numpy {'on' if NUMPY_AVAILABLE else 'off'})")
+    print(f"score:        {count / scalar_seconds:12,.0f} responses/s")
+    print(f"score_batch:  {count / batch_seconds:12,.0f} responses/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Peak memory of streaming a review dump vs loading it whole with ``json.load``.
+
+Writes a synthetic dump of about ``--size-mb`` megabytes as a JSON array,
+as JSONL and as gzip'd JSONL to a temporary directory, then reads each one
+in a fresh interpreter, either through :func:`streaming_loader.iter_reviews`
+or the former whole-file load (``json.load``, or ``json.loads`` per line
+for JSONL), and reports the child's peak RSS (``ru_maxrss``). Run from the
+repository root::
+
+    python -m benchmarks.streaming_memory --size-mb 1024
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+from benchmarks.synthetic import iter_review_shapes
+
+FORMATS = ("reviews.json", "reviews.jsonl", "reviews.jsonl.gz")
+
+
+def write_dumps(directory: Path, size_mb: int) -> int:
+    """Write the same reviews in every format, stopping at about ``size_mb`` MB; returns the count."""
+    target = size_mb * 2**20
+    written = 0
+    count = 0
+    with (directory / "reviews.json").open("w", encoding="utf-8") as array_file, (
+        directory / "reviews.jsonl"
+    ).open("w", encoding="utf-8") as lines_file:
+        array_file.write("[\n")
+        for review in iter_review_shapes(sys.maxsize):
+            line = json.dumps(review, ensure_ascii=False)
+            array_file.write(",\n" if count else "")
+            array_file.write(line)
+            lines_file.write(line)
+            lines_file.write("\n")
+            written += len(line) + 2
+            count += 1
+            if written >= target:
+                break
+        array_file.write("\n]\n")
+    with (directory / "reviews.jsonl").open("rb") as source, gzip.open(
+        directory / "reviews.jsonl.gz", "wb", compresslevel=1
+    ) as compressed:
+        shutil.copyfileobj(source, compressed, 1 << 20)
+    return count
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def read_in_child(mode: str, path: Path) -> None:
+    if mode == "stream":
+        from streaming_loader import iter_reviews
+
+        count = sum(1 for _ in iter_reviews(path))
+    else:
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt", encoding="utf-8") as handle:
+            if ".jsonl" in path.suffixes:
+                reviews = [json.loads(line) for line in handle if line.strip()]
+            else:
+                reviews = json.load(handle)
+        count = len(reviews)
+    print(count, peak_rss_bytes())
+
+
+def measure(mode: str, path: Path) -> Optional[Tuple[int, int, float]]:
+    """Run one reader in a fresh interpreter; returns (records, peak RSS bytes, seconds).
+
+    ``None`` when the child fails, typically killed for running out of memory.
+    """
+    start = time.perf_counter()
+    child = subprocess.run(
+        [sys.executable, "-m", "benchmarks.streaming_memory", "--child", mode, str(path)],
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if child.returncode != 0:
+        return None
+    count, peak = map(int, child.stdout.split())
+    return count, peak, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=1024, help="Approximate size of the uncompressed dump")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        read_in_child(args.child[0], Path(args.child[1]))
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        directory = Path(temp_dir)
+        start = time.perf_counter()
+        count = write_dumps(directory, args.size_mb)
+        print(f"{count:,} reviews written in {time.perf_counter() - start:.1f}s")
+        for name in FORMATS:
+            path = directory / name
+            print(f"{name} ({os.path.getsize(path) / 2**20:,.0f} MB on disk)")
+            for mode, label in (("load", "json.load"), ("stream", "iter_reviews")):
+                measured = measure(mode, path)
+                if measured is None:
+                    print(f"  {label:<13} failed (out of memory?)")
+                    continue
+                records, peak, elapsed = measured
+                if records != count:
+                    raise SystemExit(f"{label} read {records} reviews from {name}, expected {count}")
+                print(f"  {label:<13} peak RSS {peak / 2**20:9,.1f} MB  {elapsed:6.1f}s")
+
+
+if __name__ == "__main__":
+    main()
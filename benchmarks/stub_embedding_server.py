@@ -0,0 +1,139 @@
+"""Local stand-in for the OpenAI embeddings endpoint.
+
+Serves ``POST /v1/embeddings`` with deterministic vectors derived from a hash
+of each input text, after an artificial per-request delay. Honours
+``encoding_format`` ("float" or "base64") like the real API, and can be told
+to fail the next requests with a given status to exercise client retries.
+Run standalone::
+
+    python -m benchmarks.stub_embedding_server --port 8099 --latency-ms 80
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+
+
+def stub_vector(text: str, dim: int) -> List[float]:
+    """Deterministic pseudo-random unit-scale vector for ``text``."""
+    values: List[float] = []
+    counter = 0
+    while len(values) < dim:
+        digest = hashlib.sha256(f"{counter}:{text}".encode("utf-8")).digest()
+        values.extend((byte - 127.5) / 127.5 for byte in digest)
+        counter += 1
+    return values[:dim]
+
+
+class StubEmbeddingServer(ThreadingHTTPServer):
+    """Threaded HTTP server that counts requests and embedded texts."""
+
+    daemon_threads = True
+    # Room for many clients connecting at once (the default backlog is 5).
+    request_queue_size = 256
+
+    def __init__(self, address: Tuple[str, int], dim: int = 256, latency: float = 0.05) -> None:
+        super().__init__(address, _Handler)
+        self.dim = dim
+        self.latency = latency
+        self.requests = 0
+        self.texts = 0
+        self._failures: List[Tuple[int, Optional[str]]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubEmbeddingServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def fail_next(self, status: int, count: int = 1, retry_after: Optional[str] = None) -> None:
+        """Answer the next ``count`` requests with ``status`` (and a ``Retry-After`` header, if given)."""
+        with self._lock:
+            self._failures.extend([(status, retry_after)] * count)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StubEmbeddingServer
+    # Keep-alive, like the real API, so pooled client connections are reused.
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle's
+    # algorithm and delayed ACKs add ~40 ms to every kept-alive response.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002 - signature from base class
+        return
+
+    def do_POST(self) -> None:
+        if not self.path.rstrip("/").endswith("/embeddings"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        inputs = body.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        with self.server._lock:
+            self.server.requests += 1
+            failure = self.server._failures.pop(0) if self.server._failures else None
+            if failure is None:
+                self.server.texts += len(inputs)
+        time.sleep(self.server.latency)
+        if failure is not None:
+            status, retry_after = failure
+            payload = json.dumps({"error": {"message": f"stub failure {status}"}}).encode("utf-8")
+            self.send_response(status)
+            if retry_after is not None:
+                self.send_header("Retry-After", retry_after)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        data = []
+        for index, text in enumerate(inputs):
+            vector = stub_vector(str(text), self.server.dim)
+            if body.get("encoding_format") == "base64":
+                embedding = base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode("ascii")
+            else:
+                embedding = vector
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+        payload = json.dumps(
+            {
+                "object": "list",
+                "data": data,
+                "model": body.get("model", "stub"),
+                "usage": {"prompt_tokens": 0, "total_tokens": 0},
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    server = StubEmbeddingServer((args.host, args.port), dim=args.dim, latency=args.latency_ms / 1000)
+    print(f"Stub embedding server listening on {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Deterministic synthetic FAQ bases and reviews for benchmarks."""
+from __future__ import annotations
+
+import random
+from typing import Dict, Iterator, List
+
+CATEGORIES = ["bug", "complaint", "feature request", "praise"]
+
+VOCABULARY = [
+    "crash", "bug", "slow", "lag", "feature", "request", "love", "thanks",
+    "billing", "charge", "login", "password", "mode", "dark", "upload",
+    "photo", "sync", "account", "subscription", "refund", "update", "screen",
+    "battery", "notification", "widget", "export", "backup", "premium",
+    "camera", "offline", "search", "profile", "settings", "language",
+]
+
+REVIEW_TEMPLATES = [
+    "App keeps crashing when I try to {a}. Really frustrated!",
+    "Love this app! Would be great to have a {a} {b} feature though.",
+    "Billing is confusing and I got charged twice for {a}. Please fix this!",
+    "Great app overall but it's a bit slow when I {a} on my older phone.",
+    "The {a} screen freezes and I can't {b} anymore.",
+    "Could you add {a} support? I wish the {b} worked offline.",
+    "Thank you for the amazing {a}, my favorite app.",
+]
+
+# Shapes seen in data/scraped_reviews.json besides the plain English complaint:
+# one-word reviews, code-mixed or non-English text, and multi-paragraph rants.
+SHORT_REVIEWS = ["ok", "good", "bad app", "nice", "👍", "worst", "love it", "meh", "5 stars", "fix pls"]
+
+MULTILINGUAL_REVIEWS = [
+    "Very nice app u r my everything ajkal {a} very important hai",
+    "La aplicación se cierra cuando intento usar {a}. Muy frustrante.",
+    "O aplicativo é ótimo mas o {a} está muito lento.",
+    "Die App stürzt beim {a} ständig ab, bitte beheben!",
+    "{a}を使うとアプリが落ちます。修正してください。",
+    "L'application est géniale mais il manque le mode {a}.",
+]
+
+# Share of each review shape produced by ``iter_review_shapes``.
+SHAPE_WEIGHTS = {"template": 0.6, "short": 0.15, "multilingual": 0.15, "long": 0.1}
+
+
+def synthetic_faq_entries(count: int, seed: int = 7) -> List[Dict[str, str]]:
+    """Build ``count`` FAQ entries with a realistic spread of topic words."""
+    rng = random.Random(seed)
+    entries = []
+    for idx in range(count):
+        topic = rng.sample(VOCABULARY, 3)
+        filler = " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(12, 30)))
+        entries.append(
+            {
+                "id": f"faq_{idx}",
+                "category": rng.choice(CATEGORIES),
+                "title": f"{topic[0].title()} {topic[1]} issue {idx}",
+                "body": f"Thanks for reporting the {topic[2]} problem. {filler}.",
+            }
+        )
+    return entries
+
+
+def synthetic_reviews(count: int, seed: int = 11) -> List[Dict[str, str]]:
+    """Build ``count`` review dicts shaped like ``data/scraped_reviews.json``."""
+    rng = random.Random(seed)
+    reviews = []
+    for idx in range(count):
+        template = rng.choice(REVIEW_TEMPLATES)
+        reviews.append(
+            {
+                "id": str(10_000_000 + idx),
+                "author": f"user{idx}",
+                "rating": rng.randint(1, 5),
+                "text": template.format(a=rng.choice(VOCABULARY), b=rng.choice(VOCABULARY)),
+                "date": "2025-09-16",
+                "store": rng.choice(["apple", "google"]),
+            }
+        )
+    return reviews
+
+
+def iter_review_shapes(count: int, seed: int = 13) -> Iterator[Dict[str, str]]:
+    """Lazily yield ``count`` reviews mixing the shapes in ``SHAPE_WEIGHTS``.
+
+    A generator so that million-review runs never hold the input in memory.
+    """
+    rng = random.Random(seed)
+    shapes = list(SHAPE_WEIGHTS)
+    weights = list(SHAPE_WEIGHTS.values())
+    for idx in range(count):
+        shape = rng.choices(shapes, weights)[0]
+        if shape == "short":
+            text = rng.choice(SHORT_REVIEWS)
+        elif shape == "multilingual":
+            text = rng.choice(MULTILINGUAL_REVIEWS).format(a=rng.choice(VOCABULARY))
+        elif shape == "long":
+            sentences = [
+                rng.choice(REVIEW_TEMPLATES).format(a=rng.choice(VOCABULARY), b=rng.choice(VOCABULARY))
+                for _ in range(rng.randint(8, 20))
+            ]
+            text = " ".join(sentences)
+        else:
+            text = rng.choice(REVIEW_TEMPLATES).format(a=rng.choice(VOCABULARY), b=rng.choice(VOCABULARY))
+        yield {
+            "id": str(20_000_000 + idx),
+            "author": f"user{idx}",
+            "rating": rng.randint(1, 5),
+            "text": text,
+            "date": "2025-09-16",
+            "store": rng.choice(["apple", "google"]),
+        }
+
+
+__all__ = ["synthetic_faq_entries", "synthetic_reviews", "iter_review_shapes", "SHAPE_WEIGHTS"]
@@ -0,0 +1,74 @@
+"""Compare unfiltered, category-filtered and reranked ``retrieve_top_k``.
+
+Builds a synthetic FAQ base spread over ``--categories`` categories and
+queries it with noisy copies of its own entries, each tagged with its
+source entry's category. Reports queries per second, how often the source
+entry is in the top k, and the share of results from the query's category.
+Run from the repository root::
+
+    python -m benchmarks.top_k --entries 20000 --categories 8
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Dict, List, Tuple
+
+from benchmarks.synthetic import synthetic_faq_entries
+from retrieval import FAQRetriever
+from vector_index import NUMPY_AVAILABLE
+
+MODES = (("unfiltered", False, False), ("filtered", True, False), ("filtered+rerank", True, True))
+
+
+def _queries(entries: List[Dict[str, str]], count: int, seed: int = 3) -> List[Tuple[str, str, str]]:
+    """``(query, category, source id)`` triples: a title plus a few words of its body."""
+    rng = random.Random(seed)
+    queries = []
+    for entry in rng.sample(entries, min(count, len(entries))):
+        words = entry["body"].split()
+        queries.append((f"{entry['title']} {' '.join(rng.sample(words, min(6, len(words))))}", entry["category"], entry["id"]))
+    return queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=20_000)
+    parser.add_argument("--categories", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--backends", default="keyword,numpy", help="Comma-separated retriever backends")
+    args = parser.parse_args()
+
+    entries = synthetic_faq_entries(args.entries)
+    for idx, entry in enumerate(entries):
+        entry["category"] = f"topic-{idx % args.categories}"
+    queries = _queries(entries, args.queries)
+    print(f"{args.entries} FAQ entries in {args.categories} categories, {len(queries)} queries, k={args.k}")
+
+    for backend in args.backends.split(","):
+        if backend == "numpy" and not NUMPY_AVAILABLE:
+            print("numpy not installed; skipping the numpy backend")
+            continue
+        retriever = FAQRetriever(faq_entries=entries, backend=backend, use_embedding_cache=False, query_cache_size=0)
+        start = time.perf_counter()
+        retriever.category_partitions()
+        print(f"{backend}: partitions built in {time.perf_counter() - start:.2f}s")
+        for name, filtered, rerank in MODES:
+            hits = in_category = returned = 0
+            start = time.perf_counter()
+            for query, category, source_id in queries:
+                results = retriever.retrieve_top_k(query, args.k, category if filtered else None, rerank=rerank)
+                hits += any(result.entry["id"] == source_id for result in results)
+                in_category += sum(result.entry["category"] == category for result in results)
+                returned += len(results)
+            elapsed = time.perf_counter() - start
+            print(
+                f"  {name:<16} {len(queries) / elapsed:10,.0f} queries/s  "
+                f"hit@{args.k} {hits / len(queries):6.1%}  in-category {in_category / max(returned, 1):6.1%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
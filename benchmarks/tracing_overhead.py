@@ -0,0 +1,70 @@
+"""Measure per-review tracing overhead: off, sampled and full.
+
+Spans go to a no-op sink on the background exporter thread, so the numbers
+show what request threads pay, not network cost::
+
+    python -m benchmarks.tracing_overhead --reviews 20000 --sample-rate 0.05
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.synthetic import synthetic_reviews
+from honeyhive import SpanExporter, configure_tracing, span_exporter
+from pipeline import AiriaPipeline, ReviewResult, _classify_text, _render_response
+
+
+def run_untraced(pipeline: AiriaPipeline, reviews) -> None:
+    """The same stages as ``AiriaPipeline.run`` without any trace wrappers."""
+    retriever = pipeline.retriever
+    for review in reviews:
+        text = review.get("text", "")
+        category = _classify_text(text)
+        entry = retriever.keyword_index.best(text, category=category)
+        response = _render_response(review, category, entry)
+        score = pipeline.honeyhive.score(text, response, entry)
+        ReviewResult(review=review, category=category, faq_entry=entry, response=response, honeyhive_score=score)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reviews", type=int, default=20_000)
+    parser.add_argument("--sample-rate", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=3, help="Best of this many runs per mode")
+    args = parser.parse_args()
+
+    reviews = synthetic_reviews(args.reviews)
+    # Keyword backend without a query cache keeps the measured work identical across modes.
+    pipeline = AiriaPipeline(enable_honeyhive=True)
+    pipeline.retriever.query_cache = None
+    pipeline.retriever.backend = "keyword"
+    exporter = SpanExporter(lambda batch: None)
+
+    def timed(label: str, func) -> float:
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        per_review = best / len(reviews) * 1e6
+        print(f"{label:<28} {per_review:8.2f} us/review")
+        return per_review
+
+    untraced = timed("untraced stages", lambda: run_untraced(pipeline, reviews))
+    configure_tracing(export=False)
+    off = timed("tracing off (histograms)", lambda: [pipeline.run(review) for review in reviews])
+    configure_tracing(sample_rate=args.sample_rate, exporter=exporter)
+    sampled = timed(f"sampled at {args.sample_rate:g}", lambda: [pipeline.run(review) for review in reviews])
+    exporter.flush()
+    configure_tracing(sample_rate=1.0)
+    full = timed("full tracing", lambda: [pipeline.run(review) for review in reviews])
+    span_exporter().flush()
+
+    for label, value in (("off", off), ("sampled", sampled), ("full", full)):
+        print(f"overhead {label:<8} {value - untraced:8.2f} us/review")
+    print(f"spans exported: {exporter.exported}, dropped: {exporter.dropped}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compare NumPy vector search with LlamaIndex's in-memory vector retriever.
+
+Both sides search the same hashing-embedder vectors with precomputed query
+embeddings, so only the search itself is timed. Requires numpy; the
+LlamaIndex side is skipped when LlamaIndex is not installed::
+
+    python -m benchmarks.vector_retrieval --entries 10000 --queries 500
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, List, Optional, Tuple
+
+from benchmarks.synthetic import synthetic_faq_entries, synthetic_reviews
+from retrieval import LLAMA_AVAILABLE, faq_text
+from vector_index import HashingEmbedder, NumpyVectorIndex
+
+
+def llama_search(
+    texts: List[str], document_matrix: Any, queries: List[str], query_matrix: Any, dim: int
+) -> Optional[Tuple[float, float, List[int]]]:
+    """Build LlamaIndex's in-memory index and search it; returns (build s, search s, top-1 positions)."""
+    if not LLAMA_AVAILABLE:
+        return None
+    from llama_index.core import MockEmbedding, VectorStoreIndex
+    from llama_index.core.schema import QueryBundle, TextNode
+
+    start = time.perf_counter()
+    nodes = [
+        TextNode(text=text, metadata={"position": position}, embedding=vector.tolist())
+        for position, (text, vector) in enumerate(zip(texts, document_matrix))
+    ]
+    # Nodes already carry embeddings, so the mock model is never called.
+    llama_index = VectorStoreIndex(nodes=nodes, embed_model=MockEmbedding(embed_dim=dim))
+    llama_retriever = llama_index.as_retriever(similarity_top_k=1)
+    build = time.perf_counter() - start
+
+    bundles = [QueryBundle(query_str=query, embedding=vector.tolist()) for query, vector in zip(queries, query_matrix)]
+    start = time.perf_counter()
+    positions = [llama_retriever.retrieve(bundle)[0].metadata["position"] for bundle in bundles]
+    return build, time.perf_counter() - start, positions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=1024)
+    args = parser.parse_args()
+
+    entries = synthetic_faq_entries(args.entries)
+    texts = [faq_text(entry) for entry in entries]
+    queries = [review["text"] for review in synthetic_reviews(args.queries)]
+    embedder = HashingEmbedder(dim=args.dim).fit(texts)
+    document_matrix = embedder.embed(texts)
+    query_matrix = embedder.embed(queries)
+
+    llama = llama_search(texts, document_matrix, queries, query_matrix, args.dim)
+
+    start = time.perf_counter()
+    numpy_index = NumpyVectorIndex(document_matrix)
+    numpy_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single_positions = [int(numpy_index.search(vector)[0][0]) for vector in query_matrix]
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_positions = numpy_index.search_batch(query_matrix)[0][:, 0].tolist()
+    batch_seconds = time.perf_counter() - start
+
+    print(f"FAQ entries: {args.entries}, queries: {len(queries)}, dim: {args.dim}")
+    timings = [("NumPy single query ", single_seconds), ("NumPy batch        ", batch_seconds)]
+    if llama is None:
+        print("LlamaIndex is not installed; skipping the LlamaIndex comparison")
+        print(f"Build:  NumPy {numpy_build * 1000:8.1f} ms")
+    else:
+        llama_build, llama_seconds, llama_positions = llama
+        print(f"Build:  LlamaIndex {llama_build * 1000:8.1f} ms | NumPy {numpy_build * 1000:8.1f} ms")
+        timings.insert(0, ("LlamaIndex retrieve", llama_seconds))
+    for label, seconds in timings:
+        print(f"{label}: {seconds / len(queries) * 1e6:10.1f} us/query")
+    if llama is not None:
+        agreement = sum(1 for left, right in zip(llama_positions, single_positions) if left == right)
+        print(f"Top-1 agreement with LlamaIndex: {agreement}/{len(queries)}")
+    print(f"Batch matches single-query search: {batch_positions == single_positions}")
+
+
+if __name__ == "__main__":
+    main()
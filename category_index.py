@@ -0,0 +1,129 @@
+"""Per-category partitions of the FAQ indexes for filtered top-k retrieval."""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from keyword_index import KeywordIndex
+from vector_index import NUMPY_AVAILABLE, NumpyVectorIndex, np
+
+# Entries in these categories (or with none) answer reviews of every category.
+# The bundled data/faq.json has none; add "general" entries to use the set.
+GLOBAL_CATEGORIES = frozenset({"", "general"})
+DEFAULT_RERANK_WEIGHT = 0.3
+_WORD = re.compile(r"\w{3,}")
+
+
+def lexical_tokens(text: str) -> FrozenSet[str]:
+    """Lowercased words of three or more characters, as a set."""
+    return frozenset(_WORD.findall(text.lower()))
+
+
+@dataclass(frozen=True)
+class Partition:
+    """The entries one category searches: its own plus the global set.
+
+    ``positions`` maps vector index rows to FAQ positions. The keyword index
+    spans the whole FAQ base but only holds the partition's entries, so its
+    positions are FAQ positions too.
+    """
+
+    positions: List[int]
+    keyword_index: KeywordIndex
+    vector_index: Optional[NumpyVectorIndex] = None
+
+    def vector_candidates(self, query_embedding: Any, k: int) -> List[Tuple[int, float]]:
+        rows, scores = self.vector_index.search(query_embedding, k)  # type: ignore[union-attr]
+        # Rows masked out by incremental reloads score -inf; never return them.
+        return [
+            (self.positions[int(row)], float(score))
+            for row, score in zip(rows, scores)
+            if np.isfinite(score)
+        ]
+
+
+class CategoryPartitions:
+    """Keyword and vector indexes split by FAQ category.
+
+    Each category gets indexes over its own entries plus those in
+    ``GLOBAL_CATEGORIES``, so a lookup filtered to one category scores only
+    that slice of the FAQ base. Lookups without a category, or with one no
+    entry has, use the indexes of the whole base. Built from one
+    :class:`~retrieval.FAQSnapshot` and never modified.
+    """
+
+    def __init__(
+        self,
+        entries: Sequence[Optional[Dict[str, str]]],
+        keyword_index: KeywordIndex,
+        vector_index: Optional[NumpyVectorIndex] = None,
+        row_positions: Optional[Sequence[int]] = None,
+        global_categories: FrozenSet[str] = GLOBAL_CATEGORIES,
+    ) -> None:
+        self.entries = entries
+        self.all = Partition(list(row_positions or ()), keyword_index, vector_index)
+        # An updated entry keeps its position and gets a new row; the last row wins.
+        row_of: Dict[int, int] = {}
+        for row, position in enumerate(row_positions or ()):
+            row_of[position] = row
+        by_category: Dict[str, List[int]] = {}
+        shared: List[int] = []
+        for position, entry in enumerate(entries):
+            if entry is None:
+                continue
+            category = entry.get("category") or ""
+            if category in global_categories:
+                shared.append(position)
+            else:
+                by_category.setdefault(category, []).append(position)
+        self.partitions: Dict[str, Partition] = {}
+        for category, own in by_category.items():
+            positions = sorted(own + shared)
+            members = set(positions)
+            partition_keywords = KeywordIndex([
+                entry if position in members else None for position, entry in enumerate(entries)
+            ])
+            partition_vectors = None
+            if vector_index is not None and NUMPY_AVAILABLE:
+                rows = [row_of[position] for position in positions]
+                partition_vectors = NumpyVectorIndex(vector_index.matrix[rows])
+            self.partitions[category] = Partition(positions, partition_keywords, partition_vectors)
+        self._tokens: Dict[int, FrozenSet[str]] = {}
+
+    def get(self, category: Optional[str]) -> Partition:
+        """The partition to search for ``category``; the whole base when there is none."""
+        if not category:
+            return self.all
+        return self.partitions.get(category, self.all)
+
+    def _entry_tokens(self, position: int) -> FrozenSet[str]:
+        tokens = self._tokens.get(position)
+        if tokens is None:
+            entry = self.entries[position] or {}
+            tokens = self._tokens[position] = lexical_tokens(f"{entry.get('title', '')} {entry.get('body', '')}")
+        return tokens
+
+    def rerank(
+        self,
+        query: str,
+        candidates: Sequence[Tuple[int, float]],
+        weight: float = DEFAULT_RERANK_WEIGHT,
+    ) -> List[Tuple[int, float]]:
+        """Reorder a shortlist by blending its scores with query word overlap.
+
+        First-stage scores are scaled by the shortlist's largest magnitude, and
+        the overlap is the share of the query's words found in the entry's
+        title and body; ``weight`` is the overlap's share of the final score.
+        """
+        query_tokens = lexical_tokens(query)
+        scale = max((abs(score) for _, score in candidates), default=0.0) or 1.0
+        reranked = []
+        for position, score in candidates:
+            overlap = len(query_tokens & self._entry_tokens(position)) / len(query_tokens) if query_tokens else 0.0
+            reranked.append((position, (1 - weight) * score / scale + weight * overlap))
+        reranked.sort(key=lambda item: (-item[1], item[0]))
+        return reranked
+
+
+__all__ = ["CategoryPartitions", "Partition", "GLOBAL_CATEGORIES", "lexical_tokens"]
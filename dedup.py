@@ -0,0 +1,276 @@
+"""Exact and near-duplicate review detection so repeated reviews reuse earlier work.
+
+Reviews are keyed by a hash of their normalized text for exact matches, and
+by MinHash signatures over character shingles, bucketed with LSH banding,
+for near-duplicates. A match hands back whatever value was stored for the
+canonical review (the pipeline stores its category and FAQ entry).
+"""
+from __future__ import annotations
+
+import hashlib
+import operator
+import random
+import string
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from query_cache import normalize_query
+from vector_index import NUMPY_AVAILABLE, np
+
+DEFAULT_MAX_ENTRIES = 50_000
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+DEFAULT_THRESHOLD = 0.8
+SHINGLE_SIZE = 5
+# Shorter texts only dedup exactly: for "bad app" vs "good app" a few
+# characters are the whole meaning.
+MIN_SIGNATURE_CHARS = 20
+# Signatures cover the start of a review only; long rants are then as cheap
+# to sign as short reviews, and exact keys still cover the whole text.
+SIGNATURE_CHARS = 512
+# Characters signed per NumPy pass; bounds the (num_perm x chars) temporaries.
+SIGN_GROUP_CHARS = 16_384
+_SHINGLE_MULTIPLIER = 0x9E3779B97F4A7C15
+_LOW_32_BITS = 0xFFFFFFFF
+_LOW_64_BITS = 0xFFFFFFFFFFFFFFFF
+_EDGE_PUNCTUATION = string.punctuation + string.whitespace
+
+
+def normalize_review(text: str) -> str:
+    """Lowercase, collapse whitespace and trim punctuation at either end."""
+    return normalize_query(text).strip(_EDGE_PUNCTUATION)
+
+
+@dataclass
+class Fingerprint:
+    """Exact-match key of a normalized review; the MinHash signature is filled in on demand."""
+
+    key: bytes
+    text: str
+    signed: bool = False
+    signature: Optional[Tuple[int, ...]] = None
+
+
+class ReviewDeduplicator:
+    """Remember canonical reviews and find exact or near-duplicate matches.
+
+    Near-duplicates are candidates sharing at least one LSH band whose
+    signatures agree on at least ``threshold`` of their positions, an
+    estimate of Jaccard similarity over ``SHINGLE_SIZE``-character shingles.
+    At most ``max_entries`` canonical reviews are kept, least recently
+    matched first out. ``sync`` forgets everything when the value source
+    (the FAQ snapshot) changes. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        num_perm: int = DEFAULT_NUM_PERM,
+        bands: int = DEFAULT_BANDS,
+        threshold: float = DEFAULT_THRESHOLD,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.max_entries = max_entries
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        rng = random.Random(seed)
+        # Multiply-shift hashing of the top 32 bits h of each shingle hash:
+        # the top 16 bits of (a * h + b) mod 2**32, which uint32 arithmetic
+        # computes by wrapping around. 32-bit lanes keep the NumPy pass fast.
+        self._a = [rng.randrange(1, 1 << 32) | 1 for _ in range(num_perm)]
+        self._b = [rng.randrange(0, 1 << 32) for _ in range(num_perm)]
+        if NUMPY_AVAILABLE:
+            self._a_array = np.array(self._a, dtype=np.uint32)[:, None]
+            self._b_array = np.array(self._b, dtype=np.uint32)[:, None]
+        # key -> (value, signature)
+        self._entries: "OrderedDict[bytes, Tuple[Any, Optional[Tuple[int, ...]]]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, ...], bytes] = {}
+        self._lock = threading.Lock()
+        self.version: Optional[int] = None
+        self.lookups = 0
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.fresh = 0
+        self.fresh_seconds = 0.0
+        self.reused_seconds = 0.0
+        self.overhead_seconds = 0.0
+
+    def fingerprint(self, text: str) -> Fingerprint:
+        normalized = normalize_review(text)
+        return Fingerprint(hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest(), normalized)
+
+    def prepare(self, fingerprints: Sequence[Fingerprint]) -> None:
+        """Sign, in one pass, the fingerprints with no exact match yet (see :meth:`sign_many`)."""
+        with self._lock:
+            unknown = [fingerprint for fingerprint in fingerprints if fingerprint.key not in self._entries]
+        self.sign_many(unknown)
+
+    def sign_many(self, fingerprints: Sequence[Fingerprint]) -> None:
+        """Compute the MinHash signatures of ``fingerprints`` that have none yet.
+
+        Each ``SHINGLE_SIZE``-character window is hashed as a polynomial over
+        its code points (mod 2**64). With NumPy, the texts are concatenated
+        and every window of every text is hashed, permuted and reduced to
+        per-text minimums in a few whole-array operations, so a chunk of
+        reviews costs about as much as one long review. Texts shorter than
+        ``MIN_SIGNATURE_CHARS`` get no signature.
+        """
+        pending = []
+        for fingerprint in fingerprints:
+            if fingerprint.signed:
+                continue
+            fingerprint.signed = True
+            if len(fingerprint.text) >= MIN_SIGNATURE_CHARS:
+                pending.append(fingerprint)
+        if not NUMPY_AVAILABLE:
+            for fingerprint in pending:
+                fingerprint.signature = self._python_signature(fingerprint.text[:SIGNATURE_CHARS])
+            return
+        group: List[Fingerprint] = []
+        group_chars = 0
+        for fingerprint in pending:
+            group.append(fingerprint)
+            group_chars += min(len(fingerprint.text), SIGNATURE_CHARS)
+            if group_chars >= SIGN_GROUP_CHARS:
+                self._numpy_signatures(group)
+                group, group_chars = [], 0
+        if group:
+            self._numpy_signatures(group)
+
+    def _numpy_signatures(self, fingerprints: List[Fingerprint]) -> None:
+        texts = [fingerprint.text[:SIGNATURE_CHARS] for fingerprint in fingerprints]
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+        ends = np.cumsum(lengths)
+        codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        padded = np.concatenate([codes, np.zeros(SHINGLE_SIZE - 1, dtype=np.uint64)])
+        hashes = np.zeros(len(codes), dtype=np.uint64)
+        for offset in range(SHINGLE_SIZE):
+            hashes = hashes * np.uint64(_SHINGLE_MULTIPLIER) + padded[offset:offset + len(codes)]
+        # Drop the windows that run past the end of their text.
+        crossing = (ends[:, None] - np.arange(1, SHINGLE_SIZE, dtype=np.int64)[None, :]).ravel()
+        keep = np.ones(len(codes), dtype=bool)
+        keep[crossing] = False
+        high = (hashes[keep] >> np.uint64(32)).astype(np.uint32)
+        values = (self._a_array * high + self._b_array) >> np.uint32(16)
+        starts = ends - lengths - np.arange(len(texts), dtype=np.int64) * (SHINGLE_SIZE - 1)
+        minimums = np.minimum.reduceat(values, starts, axis=1)
+        for fingerprint, signature in zip(fingerprints, minimums.T.tolist()):
+            fingerprint.signature = tuple(signature)
+
+    def _python_signature(self, text: str) -> Tuple[int, ...]:
+        codes = [ord(char) for char in text]
+        hashes = set()
+        for start in range(len(text) - SHINGLE_SIZE + 1):
+            value = 0
+            for code in codes[start:start + SHINGLE_SIZE]:
+                value = (value * _SHINGLE_MULTIPLIER + code) & _LOW_64_BITS
+            hashes.add(value >> 32)
+        return tuple(
+            min(((a * value + b) & _LOW_32_BITS) >> 16 for value in hashes)
+            for a, b in zip(self._a, self._b)
+        )
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        rows = self.rows
+        return [(band,) + signature[band * rows:(band + 1) * rows] for band in range(self.bands)]
+
+    def sync(self, version: int) -> None:
+        """Forget every canonical review if ``version`` differs from the last one seen."""
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self._buckets.clear()
+                self.version = version
+
+    def find(self, fingerprint: Fingerprint) -> Optional[Any]:
+        """Return the value stored for a matching canonical review, or ``None``."""
+        with self._lock:
+            self.lookups += 1
+            entry = self._entries.get(fingerprint.key)
+            if entry is not None:
+                self._entries.move_to_end(fingerprint.key)
+                self.exact_hits += 1
+                return entry[0]
+        self.sign_many((fingerprint,))
+        signature = fingerprint.signature
+        if signature is None:
+            return None
+        with self._lock:
+            needed = self.threshold * self.num_perm
+            checked = set()
+            for band_key in self._band_keys(signature):
+                candidate_key = self._buckets.get(band_key)
+                if candidate_key is None or candidate_key in checked:
+                    continue
+                checked.add(candidate_key)
+                candidate = self._entries.get(candidate_key)
+                if candidate is None:
+                    continue
+                if sum(map(operator.eq, signature, candidate[1])) >= needed:
+                    self._entries.move_to_end(candidate_key)
+                    self.near_hits += 1
+                    return candidate[0]
+            return None
+
+    def add(self, fingerprint: Fingerprint, value: Any) -> None:
+        """Make the review behind ``fingerprint`` canonical for ``value``."""
+        self.sign_many((fingerprint,))
+        signature = fingerprint.signature
+        with self._lock:
+            self._entries[fingerprint.key] = (value, signature)
+            self._entries.move_to_end(fingerprint.key)
+            if signature is not None:
+                for band_key in self._band_keys(signature):
+                    self._buckets[band_key] = fingerprint.key
+            while len(self._entries) > self.max_entries:
+                key, (_, evicted_signature) = self._entries.popitem(last=False)
+                if evicted_signature is not None:
+                    for band_key in self._band_keys(evicted_signature):
+                        if self._buckets.get(band_key) == key:
+                            del self._buckets[band_key]
+
+    def record(
+        self,
+        fresh: int = 0,
+        fresh_seconds: float = 0.0,
+        reused_seconds: float = 0.0,
+        overhead_seconds: float = 0.0,
+    ) -> None:
+        """Account for reviews processed from scratch, the processing time that
+        matches reused, and the time spent fingerprinting and matching."""
+        with self._lock:
+            self.fresh += fresh
+            self.fresh_seconds += fresh_seconds
+            self.reused_seconds += reused_seconds
+            self.overhead_seconds += overhead_seconds
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        """Hit counts, dedup ratio and the estimated processing time saved.
+
+        ``seconds_saved`` is the processing time of the canonical reviews
+        that matches reused, less the time spent fingerprinting and matching.
+        """
+        with self._lock:
+            hits = self.exact_hits + self.near_hits
+            return {
+                "size": len(self._entries),
+                "lookups": self.lookups,
+                "exact_hits": self.exact_hits,
+                "near_hits": self.near_hits,
+                "dedup_ratio": hits / self.lookups if self.lookups else 0.0,
+                "fresh": self.fresh,
+                "overhead_seconds": self.overhead_seconds,
+                "seconds_saved": self.reused_seconds - self.overhead_seconds,
+            }
+
+
+__all__ = ["ReviewDeduplicator", "Fingerprint", "normalize_review", "DEFAULT_THRESHOLD"]
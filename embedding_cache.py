@@ -0,0 +1,140 @@
+"""Persistent on-disk cache of FAQ embeddings keyed by content hash."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import weakref
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / "data" / ".embedding_cache"
+
+EmbedBatch = Callable[[List[str]], List[List[float]]]
+
+
+def content_key(text: str, model_name: str) -> str:
+    """Hash the embedded text together with the model that embeds it."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """Embeddings for one model, stored as a JSON header plus a float32 matrix.
+
+    ``<model>.emb`` starts with one line of JSON holding the ordered content
+    keys and the vector width, followed by the packed vectors. The file is
+    replaced atomically on save, so readers never observe a half-written cache.
+    Safe to share between retrievers on different threads; :meth:`prune`
+    keeps whatever any of them still uses.
+    """
+
+    def __init__(self, model_name: str, directory: Optional[str] = None) -> None:
+        self.model_name = model_name
+        self.directory = Path(directory or os.getenv("FAQ_EMBEDDING_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name) or "model"
+        self.path = self.directory / f"{slug}.emb"
+        self._vectors: Dict[str, array] = {}
+        self._dirty = False
+        # Content keys each live owner (a retriever) last pruned to; owners drop out when collected.
+        self._owners: "weakref.WeakKeyDictionary[Any, Set[str]]" = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with self.path.open("rb") as handle:
+                header = json.loads(handle.readline())
+                if header.get("model") != self.model_name:
+                    return
+                dim = int(header["dim"])
+                keys = header["keys"]
+                packed = array("f")
+                packed.fromfile(handle, dim * len(keys))
+        except (OSError, ValueError, KeyError, EOFError) as exc:
+            logger.warning("Ignoring unreadable embedding cache at %s (%s)", self.path, exc)
+            return
+        for row, key in enumerate(keys):
+            self._vectors[key] = packed[row * dim:(row + 1) * dim]
+        logger.info("Loaded %s cached embeddings from %s", len(keys), self.path)
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def embed(self, texts: Sequence[str], embed_batch: EmbedBatch) -> List[List[float]]:
+        """Return embeddings for ``texts``, calling ``embed_batch`` only for unseen content."""
+        keys = [content_key(text, self.model_name) for text in texts]
+        missing: Dict[str, str] = {}
+        with self._lock:
+            for key, text in zip(keys, texts):
+                if key not in self._vectors:
+                    missing.setdefault(key, text)
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        if missing:
+            # Embedding happens outside the lock; a concurrent caller may embed the same text too.
+            logger.info("Embedding %s new or changed FAQ entries", len(missing))
+            vectors = embed_batch(list(missing.values()))
+            with self._lock:
+                for key, vector in zip(missing, vectors):
+                    self._vectors[key] = array("f", vector)
+                self._dirty = True
+        with self._lock:
+            return [self._vectors[key].tolist() for key in keys]
+
+    def prune(self, texts: Sequence[str], owner: Any = None) -> None:
+        """Drop cached vectors whose content is not among ``texts``.
+
+        With an ``owner``, ``texts`` replaces what that owner uses and only
+        vectors no live owner uses are dropped, so retrievers sharing the
+        cache keep each other's embeddings.
+        """
+        keep = {content_key(text, self.model_name) for text in texts}
+        with self._lock:
+            if owner is not None:
+                self._owners[owner] = keep
+                keep = keep.union(*self._owners.values())
+            stale = [key for key in self._vectors if key not in keep]
+            for key in stale:
+                del self._vectors[key]
+            if stale:
+                self._dirty = True
+
+    def save(self) -> None:
+        """Persist the cache if anything changed since it was loaded."""
+        with self._lock:
+            if not self._dirty:
+                return
+            keys = list(self._vectors)
+            dim = len(self._vectors[keys[0]]) if keys else 0
+            packed = array("f")
+            for key in keys:
+                packed.extend(self._vectors[key])
+            self._dirty = False
+        header = json.dumps({"model": self.model_name, "dim": dim, "keys": keys})
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with tmp_path.open("wb") as handle:
+                handle.write(header.encode("utf-8") + b"\n")
+                packed.tofile(handle)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            self._dirty = True
+            raise
+
+
+__all__ = ["EmbeddingCache", "content_key", "DEFAULT_CACHE_DIR"]
@@ -0,0 +1,317 @@
+"""OpenAI embeddings client that coalesces concurrent query embeddings into batched requests."""
+from __future__ import annotations
+
+import asyncio
+import http.client
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from metrics import counter, stage_histogram
+
+logger = logging.getLogger(__name__)
+
+OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
+DEFAULT_API_BASE = "https://api.openai.com/v1"
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_SECONDS = 0.005
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT_SECONDS = 30.0
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+EMBEDDING_REQUESTS = counter("embedding_requests", "HTTP requests to the embeddings API, by outcome (ok, retry, error).")
+EMBEDDING_TEXTS = counter("embedding_texts", "Texts submitted for query embedding, by how they were served (sent, deduplicated).")
+
+
+class EmbeddingRequestError(RuntimeError):
+    """Raised when the embeddings API keeps failing or rejects a request."""
+
+
+class _ConnectionPool:
+    """Keep-alive HTTP(S) connections to one host, reused across requests and threads."""
+
+    def __init__(self, base_url: str, size: int, timeout: float) -> None:
+        parts = urlsplit(base_url)
+        self.secure = parts.scheme == "https"
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port
+        self.path = parts.path.rstrip("/")
+        self.size = size
+        self.timeout = timeout
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> http.client.HTTPConnection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        if self.secure:
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def release(self, connection: http.client.HTTPConnection, reusable: bool) -> None:
+        with self._lock:
+            if reusable and len(self._idle) < self.size:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class OpenAIEmbeddingClient:
+    """Minimal client for ``POST /embeddings`` with pooled connections and retries.
+
+    Failed requests (connection errors, timeouts, 429 and 5xx responses) are
+    retried up to ``retries`` times with jittered exponential backoff,
+    waiting at least as long as a ``Retry-After`` header asks. The API base
+    comes from ``OPENAI_API_BASE`` (or ``OPENAI_BASE_URL``), as for
+    LlamaIndex's ``OpenAIEmbedding``, so a local stub server can stand in.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = OPENAI_EMBEDDING_MODEL,
+        api_base: Optional[str] = None,
+        pool_size: int = DEFAULT_MAX_CONCURRENCY,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = 0.25,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    ) -> None:
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY", "")
+        self.model = model
+        self.api_base = api_base or os.getenv("OPENAI_API_BASE") or os.getenv("OPENAI_BASE_URL") or DEFAULT_API_BASE
+        self.retries = retries
+        self.backoff = backoff
+        self._pool = _ConnectionPool(self.api_base, pool_size, timeout)
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed ``texts`` in one request, in order."""
+        # Same input normalisation as LlamaIndex's OpenAIEmbedding, so vectors match.
+        body = json.dumps({
+            "model": self.model,
+            "input": [text.replace("\n", " ") for text in texts],
+            "encoding_format": "float",
+        }).encode("utf-8")
+        for attempt in range(self.retries + 1):
+            try:
+                status, headers, payload = self._post(body)
+            except (OSError, http.client.HTTPException) as exc:
+                retry_after, error = None, f"{type(exc).__name__}: {exc}"
+            else:
+                if status == 200:
+                    EMBEDDING_REQUESTS.inc(outcome="ok")
+                    data = sorted(json.loads(payload)["data"], key=lambda item: item["index"])
+                    return [item["embedding"] for item in data]
+                error = f"HTTP {status}: {payload[:200].decode('utf-8', 'replace')}"
+                if status not in RETRY_STATUSES:
+                    EMBEDDING_REQUESTS.inc(outcome="error")
+                    raise EmbeddingRequestError(error)
+                retry_after = headers.get("retry-after")
+            if attempt == self.retries:
+                break
+            EMBEDDING_REQUESTS.inc(outcome="retry")
+            delay = self.backoff * 2 ** attempt * (0.5 + random.random())
+            if retry_after:
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+            logger.warning("Embedding request failed (%s); retrying in %.2fs", error, delay)
+            time.sleep(delay)
+        EMBEDDING_REQUESTS.inc(outcome="error")
+        raise EmbeddingRequestError(f"Embedding request failed after {self.retries + 1} attempts: {error}")
+
+    def _post(self, body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        connection = self._pool.acquire()
+        reusable = False
+        try:
+            connection.request(
+                "POST",
+                f"{self._pool.path}/embeddings",
+                body=body,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+            )
+            response = connection.getresponse()
+            payload = response.read()
+            reusable = not response.will_close
+            return response.status, {key.lower(): value for key, value in response.getheaders()}, payload
+        finally:
+            self._pool.release(connection, reusable)
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+class CoalescingEmbedder:
+    """Batches concurrent embedding calls into shared requests.
+
+    Texts submitted from any thread or event loop wait up to ``max_wait``
+    seconds for company, then go out together, at most ``max_batch_size``
+    per request and ``max_concurrency`` requests at a time; while every
+    request slot is busy, new texts keep accumulating into the next batch.
+    Identical texts in a batch are sent once. Exposes ``embed`` (so NumPy
+    retrieval can use it as its ``embed_model``) and LlamaIndex's
+    ``get_text_embedding_batch``/``aget_text_embedding_batch``.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait: float = DEFAULT_MAX_WAIT_SECONDS,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> None:
+        self.client = client
+        self.model_name = getattr(client, "model", "")
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[str, Future]] = []
+        self._oldest = 0.0
+        self._ready = threading.Condition()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_concurrency, thread_name_prefix="embedding")
+        self._latency = stage_histogram("embedding_request")
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.texts = 0
+        self.deduplicated = 0
+        self._dispatcher = threading.Thread(target=self._dispatch, name="embedding-coalescer", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, texts: Sequence[str]) -> List[Future]:
+        """Queue ``texts``; each future resolves to that text's embedding."""
+        futures: List[Future] = [Future() for _ in texts]
+        with self._ready:
+            if self._closed:
+                raise RuntimeError("CoalescingEmbedder is closed")
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.extend(zip(texts, futures))
+            self._ready.notify()
+        return futures
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        return [future.result() for future in self.submit(texts)]
+
+    async def aembed(self, texts: Sequence[str]) -> List[List[float]]:
+        return list(await asyncio.gather(*(asyncio.wrap_future(future) for future in self.submit(texts))))
+
+    def get_text_embedding_batch(self, texts: Sequence[str], **_: Any) -> List[List[float]]:
+        return self.embed(texts)
+
+    async def aget_text_embedding_batch(self, texts: Sequence[str], **_: Any) -> List[List[float]]:
+        return await self.aembed(texts)
+
+    def _dispatch(self) -> None:
+        while True:
+            # Take a request slot first: while all are busy, the next batch keeps growing.
+            self._slots.acquire()
+            with self._ready:
+                while not self._pending and not self._closed:
+                    self._ready.wait()
+                if self._closed and not self._pending:
+                    self._slots.release()
+                    return
+                deadline = self._oldest + self.max_wait
+                while len(self._pending) < self.max_batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._ready.wait(remaining)
+                # Leftovers keep the oldest arrival time, so they go out next without waiting.
+                batch = self._pending[:self.max_batch_size]
+                del self._pending[:self.max_batch_size]
+            self._executor.submit(self._send, batch)
+
+    def _send(self, batch: List[Tuple[str, Future]]) -> None:
+        try:
+            unique = list(dict.fromkeys(text for text, _ in batch))
+            started = time.perf_counter_ns()
+            vectors = self.client.embed(unique)
+            self._latency.observe_ns(time.perf_counter_ns() - started)
+            with self._stats_lock:
+                self.requests += 1
+                self.texts += len(batch)
+                self.deduplicated += len(batch) - len(unique)
+            EMBEDDING_TEXTS.inc(len(unique), served="sent")
+            EMBEDDING_TEXTS.inc(len(batch) - len(unique), served="deduplicated")
+            by_text = dict(zip(unique, vectors))
+            for text, future in batch:
+                future.set_result(by_text[text])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "texts": self.texts,
+            "deduplicated": self.deduplicated,
+            "mean_batch_size": self.texts / self.requests if self.requests else 0.0,
+        }
+
+    def close(self) -> None:
+        """Send what is queued, then stop the dispatcher and release connections."""
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+        if hasattr(self.client, "close"):
+            self.client.close()
+
+
+_shared_embedder: Optional[CoalescingEmbedder] = None
+_shared_lock = threading.Lock()
+
+
+def shared_query_embedder() -> Optional[CoalescingEmbedder]:
+    """The process-wide coalescing OpenAI query embedder, or ``None`` if unconfigured.
+
+    Needs ``OPENAI_API_KEY``; ``EMBEDDING_COALESCE=0`` turns it off, and
+    ``EMBEDDING_MAX_BATCH``, ``EMBEDDING_MAX_WAIT_MS`` and
+    ``EMBEDDING_MAX_CONCURRENCY`` tune it.
+    """
+    global _shared_embedder
+    if not os.getenv("OPENAI_API_KEY") or os.getenv("EMBEDDING_COALESCE", "1") == "0":
+        return None
+    if _shared_embedder is None:
+        with _shared_lock:
+            if _shared_embedder is None:
+                concurrency = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+                _shared_embedder = CoalescingEmbedder(
+                    OpenAIEmbeddingClient(pool_size=concurrency),
+                    max_batch_size=int(os.getenv("EMBEDDING_MAX_BATCH", DEFAULT_MAX_BATCH_SIZE)),
+                    max_wait=float(os.getenv("EMBEDDING_MAX_WAIT_MS", DEFAULT_MAX_WAIT_SECONDS * 1000)) / 1000,
+                    max_concurrency=concurrency,
+                )
+    return _shared_embedder
+
+
+__all__ = [
+    "CoalescingEmbedder",
+    "EmbeddingRequestError",
+    "OpenAIEmbeddingClient",
+    "shared_query_embedder",
+    "OPENAI_EMBEDDING_MODEL",
+]
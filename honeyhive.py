@@ -1,65 +1,368 @@
 """HoneyHive integration for App Review Responder."""
 from __future__ import annotations
 
+import atexit
+import functools
+import importlib
+import inspect
+import logging
 import os
+import queue
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional, Sequence, Tuple
 import uuid
 
-# HoneyHive trace decorator setup
-HONEYHIVE_AVAILABLE = False
-api_key = os.getenv("HONEYHIVE_API_KEY")
+from keyword_matcher import KeywordMatcher
+from metrics import counter, stage_histogram
+
+logger = logging.getLogger(__name__)
 
+# NumPy only speeds up batch scoring; per-review scoring works without it.
 try:
-    import honeyhive
-    
-    # Check if we can import the trace decorator
-    if hasattr(honeyhive, 'trace'):
-        trace = honeyhive.trace
-        HONEYHIVE_AVAILABLE = True
-        print("HoneyHive trace decorator imported successfully!")
-    else:
-        # Try alternative import paths
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None  # type: ignore
+    NUMPY_AVAILABLE = False
+
+api_key = os.getenv("HONEYHIVE_API_KEY")
+
+
+@functools.lru_cache(maxsize=None)
+def honeyhive_available() -> bool:
+    """Whether the HoneyHive SDK can be imported, probed on first call.
+
+    Importing the SDK is slow and only needed once an evaluation reports
+    how it was scored, so it is not probed at import time. This module is
+    itself named ``honeyhive``; finding it instead of the SDK counts as the
+    SDK being absent.
+    """
+    try:
+        sdk = importlib.import_module("honeyhive")
+    except ImportError:
+        sdk = None
+    if sdk is None or sdk is sys.modules.get(__name__) or not hasattr(sdk, "trace"):
+        logger.info("HoneyHive package not installed - using mock tracing")
+        return False
+    logger.info("HoneyHive trace decorator imported successfully")
+    if not api_key:
+        logger.info("HONEYHIVE_API_KEY not found - traces will be mocked")
+    return True
+
+
+def __getattr__(name: str) -> Any:
+    # ``HONEYHIVE_AVAILABLE`` is kept for importers but resolved lazily.
+    if name == "HONEYHIVE_AVAILABLE":
+        return honeyhive_available()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# --- Instrumentation layer ---
+#
+# Every traced call is timed with perf_counter_ns into a per-stage histogram
+# (see metrics.py). Spans are only built for sampled traces: the sampling
+# decision is made once at the outermost traced call and inherited by nested
+# calls. Finished spans are queued for a background thread that ships them
+# to HoneyHive in batches, so request threads never wait on telemetry.
+
+HONEYHIVE_API_URL = os.getenv("HONEYHIVE_API_URL", "https://api.honeyhive.ai")
+HONEYHIVE_PROJECT = "App-Review-Responder"
+DEFAULT_SAMPLE_RATE = 1.0
+
+_UNSAMPLED = ("", "")
+# (trace id, span id) of the innermost sampled span, or _UNSAMPLED.
+_current_span: ContextVar[Optional[Tuple[str, str]]] = ContextVar("honeyhive_span", default=None)
+
+
+def _env_sample_rate() -> float:
+    try:
+        return min(1.0, max(0.0, float(os.getenv("HONEYHIVE_SAMPLE_RATE", DEFAULT_SAMPLE_RATE))))
+    except ValueError:
+        return DEFAULT_SAMPLE_RATE
+
+
+def _uuid(hex_id: str) -> str:
+    return str(uuid.UUID(hex=hex_id))
+
+
+def honeyhive_events(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Shape finished spans as HoneyHive events.
+
+    Ids become hyphenated UUIDs and the trace id is the session id, which
+    is also the parent of top-level spans; times are in milliseconds.
+    """
+    source = os.getenv("HONEYHIVE_SOURCE", "development")
+    return [
+        {
+            "project": HONEYHIVE_PROJECT,
+            "source": source,
+            "event_type": "tool",
+            "event_name": span["name"],
+            "event_id": _uuid(span["span_id"]),
+            "session_id": _uuid(span["trace_id"]),
+            "parent_id": _uuid(span["parent_id"] or span["trace_id"]),
+            "start_time": span["start_time_ms"],
+            "end_time": span["start_time_ms"] + span["duration_ms"],
+            "duration": span["duration_ms"],
+            "error": span["error"],
+            "config": {},
+            "inputs": {},
+            "outputs": {},
+        }
+        for span in spans
+    ]
+
+
+def honeyhive_sink(spans: List[Dict[str, Any]]) -> None:
+    """Post a batch of finished spans to the HoneyHive events API."""
+    import requests
+
+    response = requests.post(
+        f"{HONEYHIVE_API_URL}/events/batch",
+        json={"events": honeyhive_events(spans)},
+        headers={"Authorization": f"Bearer {api_key}"},
+        timeout=10,
+    )
+    response.raise_for_status()
+
+
+class SpanExporter:
+    """Background thread that drains finished spans and hands them to ``sink`` in batches.
+
+    ``submit`` never blocks: when the bounded queue is full the span is
+    dropped and counted instead. The thread starts with the first submitted
+    span, so a process that never samples a trace never runs it.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[List[Dict[str, Any]]], None],
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+        max_queue: int = 10_000,
+    ) -> None:
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=max_queue)
+        self.exported = 0
+        self.dropped = 0
+        self.failed_batches = 0
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, span: Dict[str, Any]) -> None:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    thread = threading.Thread(target=self._run, name="honeyhive-exporter", daemon=True)
+                    thread.start()
+                    self._thread = thread
         try:
-            from honeyhive import trace
-            HONEYHIVE_AVAILABLE = True
-            print("HoneyHive trace decorator imported successfully!")
-        except ImportError:
-            raise ImportError("trace decorator not found")
-    
-    # Initialize HoneyHive if API key is available
-    if api_key and HONEYHIVE_AVAILABLE:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Dict[str, Any]] = []
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    span = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if span is None:
+                    stop = True
+                    break
+                batch.append(span)
+            if batch:
+                try:
+                    self.sink(batch)
+                    self.exported += len(batch)
+                except Exception as exc:
+                    self.failed_batches += 1
+                    logger.warning("Failed to export %s spans to HoneyHive: %s", len(batch), exc)
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                self._queue.task_done()
+                return
+
+    def flush(self) -> None:
+        """Block until every submitted span has been handed to the sink."""
+        self._queue.join()
+
+    def shutdown(self) -> None:
+        with self._start_lock:
+            thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout=5)
+
+
+_sample_rate = _env_sample_rate()
+_exporter: Optional[SpanExporter] = None
+
+
+def configure_tracing(
+    sample_rate: Optional[float] = None,
+    exporter: Optional[SpanExporter] = None,
+    export: Optional[bool] = None,
+) -> None:
+    """Adjust tracing at runtime.
+
+    ``sample_rate`` is the fraction of top-level calls whose spans are
+    exported (timing histograms are always recorded). ``exporter`` replaces
+    the span exporter; ``export=False`` disables span export entirely.
+    """
+    global _sample_rate, _exporter
+    if sample_rate is not None:
+        _sample_rate = min(1.0, max(0.0, sample_rate))
+    if exporter is not None:
+        if _exporter is not None and _exporter is not exporter:
+            _exporter.shutdown()
+        _exporter = exporter
+    if export is False and _exporter is not None:
+        _exporter.shutdown()
+        _exporter = None
+
+
+def span_exporter() -> Optional[SpanExporter]:
+    """The active span exporter, or ``None`` when spans are not exported."""
+    return _exporter
+
+
+def _start_span(parent: Optional[Tuple[str, str]]) -> Optional[Tuple[str, str]]:
+    """Return the new span context, or ``None`` if this call is not sampled."""
+    if parent is None:
+        if _sample_rate <= 0.0 or (_sample_rate < 1.0 and random.random() >= _sample_rate):
+            return _UNSAMPLED
+        return (uuid.uuid4().hex, uuid.uuid4().hex)
+    if parent is _UNSAMPLED:
+        return None
+    return (parent[0], uuid.uuid4().hex)
+
+
+def _finish_span(
+    name: str,
+    context: Tuple[str, str],
+    parent: Optional[Tuple[str, str]],
+    started_ns: int,
+    duration_ns: int,
+    error: Optional[BaseException],
+) -> None:
+    exporter = _exporter
+    if exporter is None:
+        return
+    exporter.submit(
+        {
+            "name": name,
+            "trace_id": context[0],
+            "span_id": context[1],
+            "parent_id": parent[1] if parent else None,
+            "start_time_ms": started_ns // 1_000_000,
+            "duration_ms": duration_ns / 1e6,
+            "error": repr(error) if error else None,
+        }
+    )
+
+
+def _instrument(func: Callable, name: str) -> Callable:
+    histogram = stage_histogram(name)
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if _exporter is None:
+                started = time.perf_counter_ns()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    histogram.observe_ns(time.perf_counter_ns() - started)
+            parent = _current_span.get()
+            context = _start_span(parent)
+            token = _current_span.set(context) if context is not None else None
+            wall_ns = time.time_ns()
+            started = time.perf_counter_ns()
+            error: Optional[BaseException] = None
+            try:
+                return await func(*args, **kwargs)
+            except BaseException as exc:
+                error = exc
+                raise
+            finally:
+                duration = time.perf_counter_ns() - started
+                histogram.observe_ns(duration)
+                if token is not None:
+                    _current_span.reset(token)
+                if context is not None and context is not _UNSAMPLED:
+                    _finish_span(name, context, parent, wall_ns, duration, error)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _exporter is None:
+            started = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe_ns(time.perf_counter_ns() - started)
+        parent = _current_span.get()
+        context = _start_span(parent)
+        token = _current_span.set(context) if context is not None else None
+        wall_ns = time.time_ns()
+        started = time.perf_counter_ns()
+        error: Optional[BaseException] = None
         try:
-            # Try to initialize with available methods
-            if hasattr(honeyhive, 'HoneyHiveTracer'):
-                # honeyhive.HoneyHiveTracer.init(
-                #     api_key=api_key,
-                #     project="App-Review-Responder",
-                #     source="development",
-                #     session_name="Review Response Session"
-                # )
-                print("HoneyHive initialized successfully!")
-            else:
-                print("HoneyHive tracer initialization not available - traces will still work")
-        except Exception as e:
-            print(f"Failed to initialize HoneyHive tracer: {e}")
-    elif not api_key:
-        print("HONEYHIVE_API_KEY not found - traces will be mocked")
-        
-except ImportError:
-    print("HoneyHive package not installed - using mock tracing")
-    HONEYHIVE_AVAILABLE = False
+            return func(*args, **kwargs)
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            duration = time.perf_counter_ns() - started
+            histogram.observe_ns(duration)
+            if token is not None:
+                _current_span.reset(token)
+            if context is not None and context is not _UNSAMPLED:
+                _finish_span(name, context, parent, wall_ns, duration, error)
 
-# Create a mock trace decorator if HoneyHive is not available
-if not HONEYHIVE_AVAILABLE:
-    def trace(func=None, **kwargs):
-        """Mock trace decorator when HoneyHive is not available."""
-        if func is None:
-            return lambda f: f
-        return func
+    return wrapper
 
 
-@dataclass
+def trace(func=None, *, name: Optional[str] = None, **kwargs):
+    """Trace decorator: always-on stage timing plus sampled, asynchronously exported spans.
+
+    Usable as ``@trace`` or ``@trace(name="stage")``; the stage name defaults
+    to the function's qualified name.
+    """
+    if func is None:
+        return lambda f: _instrument(f, name or f.__qualname__)
+    return _instrument(func, name or func.__qualname__)
+
+
+if api_key and os.getenv("HONEYHIVE_EXPORT", "1") != "0":
+    _exporter = SpanExporter(honeyhive_sink)
+    atexit.register(_exporter.flush)
+
+
+REVIEW_KEYWORDS = ("crash", "bug", "slow", "feature", "love", "great", "billing")
+EMPATHY_WORDS = ("sorry", "thank", "appreciate", "understand", "listening")
+_REVIEW_MATCHER = KeywordMatcher(REVIEW_KEYWORDS)
+_RESPONSE_MATCHER = KeywordMatcher(REVIEW_KEYWORDS + EMPATHY_WORDS)
+METRIC_NAMES = ("correctness", "relevance", "tone", "clarity", "helpfulness")
+EVALUATIONS = counter("evaluations", "Responses scored by the evaluator.")
+EVALUATIONS_DROPPED = counter("evaluations_dropped", "Responses not scored because the scoring queue was full.")
+
+
+@dataclass(slots=True)
 class HoneyHiveScore:
     correctness: float
     relevance: float
@@ -69,6 +372,40 @@ class HoneyHiveScore:
     notes: str
 
 
+@dataclass
+class ScoreBatch:
+    """Scores for a batch of responses, one column per metric.
+
+    Columns are float64 NumPy arrays when NumPy is installed and plain lists
+    otherwise; either way ``scores()`` yields exactly what ``score`` returns.
+    """
+
+    correctness: Sequence[float]
+    relevance: Sequence[float]
+    tone: Sequence[float]
+    clarity: Sequence[float]
+    helpfulness: Sequence[float]
+    notes: str
+
+    def __len__(self) -> int:
+        return len(self.helpfulness)
+
+    def columns(self) -> Dict[str, List[float]]:
+        """The metric columns as lists of Python floats."""
+        columns = {}
+        for name in METRIC_NAMES:
+            column = getattr(self, name)
+            columns[name] = column.tolist() if hasattr(column, "tolist") else list(column)
+        return columns
+
+    def scores(self) -> List[HoneyHiveScore]:
+        notes = self.notes
+        return [
+            HoneyHiveScore(correctness, relevance, tone, clarity, helpfulness, notes)
+            for correctness, relevance, tone, clarity, helpfulness in zip(*self.columns().values())
+        ]
+
+
 class HoneyHiveEvaluator:
     """HoneyHive evaluator with metrics calculation."""
 
@@ -79,27 +416,29 @@ class HoneyHiveEvaluator:
 
     def calculate_metrics(self, review_text: str, response_text: str, faq_entry: Dict[str, str]) -> Dict[str, float]:
         """Calculate metrics for the review response."""
-        review_lower = review_text.lower()
-        response_lower = response_text.lower()
+        # Each text is scanned once by a compiled matcher.
+        review_hits = _REVIEW_MATCHER.find(review_text.lower())
+        response_hits = _RESPONSE_MATCHER.find(response_text.lower())
         
         # Correctness: Does the response address the review's main concern?
         correctness = 0.7  # Base score
-        review_keywords = ["crash", "bug", "slow", "feature", "love", "great", "billing"]
-        matched_keywords = [kw for kw in review_keywords if kw in review_lower]
+        matched_keywords = [kw for kw in REVIEW_KEYWORDS if kw in review_hits]
         if matched_keywords:
             # Check if response addresses these keywords
-            addressed_keywords = [kw for kw in matched_keywords if kw in response_lower or kw in faq_entry.get("body", "").lower()]
+            body_hits = _REVIEW_MATCHER.find(faq_entry.get("body", "").lower())
+            addressed_keywords = [kw for kw in matched_keywords if kw in response_hits or kw in body_hits]
             correctness = min(1.0, 0.5 + (len(addressed_keywords) / len(matched_keywords)) * 0.5)
         
         # Relevance: Did we pull the right FAQ entry?
         relevance = 0.8  # Assume good retrieval for now
-        if faq_entry.get("title") and any(word in faq_entry["title"].lower() for word in matched_keywords):
-            relevance = min(1.0, relevance + 0.2)
+        if faq_entry.get("title") and matched_keywords:
+            title_hits = _REVIEW_MATCHER.find(faq_entry["title"].lower())
+            if any(word in title_hits for word in matched_keywords):
+                relevance = min(1.0, relevance + 0.2)
         
         # Tone: Empathetic and friendly
         tone = 0.6
-        empathy_words = ["sorry", "thank", "appreciate", "understand", "listening"]
-        if any(word in response_lower for word in empathy_words):
+        if any(word in response_hits for word in EMPATHY_WORDS):
             tone += 0.3
         if "!" in response_text:
             tone += 0.1
@@ -124,17 +463,20 @@ class HoneyHiveEvaluator:
             "helpfulness": helpfulness
         }
 
+    def _notes(self) -> str:
+        if self.api_key and honeyhive_available():
+            return "HoneyHive metrics calculated and logged via @trace decorators."
+        return "Mock evaluation (HONEYHIVE_API_KEY not configured or honeyhive not available)."
+
+    @trace
     def score(self, review_text: str, response_text: str, faq_entry: Optional[Dict[str, str]] = None) -> HoneyHiveScore:
         """Score the review response and log to HoneyHive."""
         if faq_entry is None:
             faq_entry = {}
             
         metrics = self.calculate_metrics(review_text, response_text, faq_entry)
-        
-        if HONEYHIVE_AVAILABLE and self.api_key:
-            notes = "HoneyHive metrics calculated and logged via @trace decorators."
-        else:
-            notes = "Mock evaluation (HONEYHIVE_API_KEY not configured or honeyhive not available)."
+        EVALUATIONS.inc(mode="single")
+        notes = self._notes()
         
         return HoneyHiveScore(
             correctness=metrics["correctness"],
@@ -145,5 +487,187 @@ class HoneyHiveEvaluator:
             notes=notes
         )
 
+    @trace
+    def score_many(
+        self,
+        review_texts: Sequence[str],
+        response_texts: Sequence[str],
+        faq_entries: Sequence[Optional[Dict[str, str]]],
+    ) -> List[HoneyHiveScore]:
+        """Score a batch of responses; equivalent to calling ``score`` on each."""
+        return self._score_columns(review_texts, response_texts, faq_entries).scores()
+
+    @trace
+    def score_batch(
+        self,
+        review_texts: Sequence[str],
+        response_texts: Sequence[str],
+        faq_entries: Sequence[Optional[Dict[str, str]]],
+    ) -> ScoreBatch:
+        """Score a batch of responses into columns; row ``i`` equals ``score`` on triple ``i``."""
+        return self._score_columns(review_texts, response_texts, faq_entries)
+
+    def _score_columns(
+        self,
+        review_texts: Sequence[str],
+        response_texts: Sequence[str],
+        faq_entries: Sequence[Optional[Dict[str, str]]],
+    ) -> ScoreBatch:
+        EVALUATIONS.inc(len(review_texts), mode="batch")
+        notes = self._notes()
+        if not NUMPY_AVAILABLE:
+            rows = [
+                self.calculate_metrics(review_text, response_text, faq_entry or {})
+                for review_text, response_text, faq_entry in zip(review_texts, response_texts, faq_entries)
+            ]
+            return ScoreBatch(
+                *([row[name] for row in rows] for name in METRIC_NAMES),
+                notes=notes,
+            )
+
+        # Text features are extracted once per row (FAQ entries once per
+        # distinct entry); the scoring arithmetic then runs column-wise with
+        # the same float operations, in the same order, as calculate_metrics.
+        count = len(review_texts)
+        matched = np.zeros(count, dtype=np.int64)
+        addressed = np.zeros(count, dtype=np.int64)
+        title_match = np.zeros(count, dtype=bool)
+        empathetic = np.zeros(count, dtype=bool)
+        exclaims = np.zeros(count, dtype=bool)
+        word_counts = np.zeros(count, dtype=np.int64)
+        no_entry: Dict[str, str] = {}
+        faq_hits: Dict[int, Tuple[frozenset, Optional[frozenset]]] = {}
+        for row, (review_text, response_text, faq_entry) in enumerate(zip(review_texts, response_texts, faq_entries)):
+            faq_entry = faq_entry or no_entry
+            review_hits = _REVIEW_MATCHER.find(review_text.lower())
+            response_hits = _RESPONSE_MATCHER.find(response_text.lower())
+            if review_hits:
+                hits = faq_hits.get(id(faq_entry))
+                if hits is None:
+                    title = faq_entry.get("title")
+                    hits = faq_hits[id(faq_entry)] = (
+                        _REVIEW_MATCHER.find(faq_entry.get("body", "").lower()),
+                        _REVIEW_MATCHER.find(title.lower()) if title else None,
+                    )
+                body_hits, title_hits = hits
+                matched[row] = len(review_hits)
+                addressed[row] = sum(1 for keyword in review_hits if keyword in response_hits or keyword in body_hits)
+                title_match[row] = title_hits is not None and not review_hits.isdisjoint(title_hits)
+            empathetic[row] = any(word in response_hits for word in EMPATHY_WORDS)
+            exclaims[row] = "!" in response_text
+            word_counts[row] = len(response_text.split())
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correctness = np.where(matched > 0, np.minimum(1.0, 0.5 + (addressed / matched) * 0.5), 0.7)
+        relevance = np.where(title_match, min(1.0, 0.8 + 0.2), 0.8)
+        tone = np.full(count, 0.6)
+        tone = np.where(empathetic, tone + 0.3, tone)
+        tone = np.where(exclaims, tone + 0.1, tone)
+        tone = np.minimum(tone, 1.0)
+        clarity = np.select(
+            [(word_counts >= 20) & (word_counts <= 100), word_counts > 150],
+            [min(1.0, 0.8 + 0.2), max(0.3, 0.8 - 0.3)],
+            0.8,
+        )
+        helpfulness = (correctness + relevance + tone + clarity) / 4
+        return ScoreBatch(correctness, relevance, tone, clarity, helpfulness, notes)
+
+
+class ScoringWorker:
+    """Background thread that scores responses in batches, off the request path.
+
+    ``submit`` never blocks: when the bounded queue is full the response is
+    left unscored and counted instead. Each queued response's ``callback``
+    receives its :class:`HoneyHiveScore` once its batch has been scored.
+    """
+
+    def __init__(
+        self,
+        evaluator: HoneyHiveEvaluator,
+        batch_size: int = 256,
+        flush_interval: float = 0.05,
+        max_queue: int = 10_000,
+    ) -> None:
+        self.evaluator = evaluator
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[Tuple[str, str, Dict[str, str], Callable[[HoneyHiveScore], None]]]]" = (
+            queue.Queue(maxsize=max_queue)
+        )
+        self.scored = 0
+        self.dropped = 0
+        self.failed_batches = 0
+        self._thread = threading.Thread(target=self._run, name="honeyhive-scorer", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def submit(
+        self,
+        review_text: str,
+        response_text: str,
+        faq_entry: Optional[Dict[str, str]],
+        callback: Callable[[HoneyHiveScore], None],
+    ) -> bool:
+        """Queue a response for scoring; returns ``False`` if it was dropped."""
+        try:
+            self._queue.put_nowait((review_text, response_text, faq_entry or {}, callback))
+        except queue.Full:
+            self.dropped += 1
+            EVALUATIONS_DROPPED.inc()
+            return False
+        return True
+
+    def _run(self) -> None:
+        while True:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    job = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                batch.append(job)
+            if batch:
+                try:
+                    review_texts, response_texts, faq_entries, callbacks = zip(*batch)
+                    scores = self.evaluator.score_many(review_texts, response_texts, faq_entries)
+                    for callback, score in zip(callbacks, scores):
+                        callback(score)
+                    self.scored += len(batch)
+                except Exception as exc:
+                    self.failed_batches += 1
+                    logger.warning("Failed to score %s responses in the background: %s", len(batch), exc)
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                self._queue.task_done()
+                return
+
+    def flush(self) -> None:
+        """Block until every submitted response has been scored."""
+        self._queue.join()
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
 
-__all__ = ["HoneyHiveEvaluator", "HoneyHiveScore", "trace", "HONEYHIVE_AVAILABLE"]
+__all__ = [
+    "HoneyHiveEvaluator",
+    "HoneyHiveScore",
+    "ScoreBatch",
+    "ScoringWorker",
+    "SpanExporter",
+    "configure_tracing",
+    "span_exporter",
+    "trace",
+    "honeyhive_available",
+    "HONEYHIVE_AVAILABLE",
+]
@@ -0,0 +1,498 @@
+"""Bounded review ingestion queue with admission control and a worker pool that drains it."""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from metrics import counter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOBS_PATH = Path(__file__).resolve().parent / "data" / "jobs.sqlite3"
+DEFAULT_MAX_PENDING = 10_000
+DEFAULT_RETENTION_SECONDS = 3600.0
+# Completions over this many seconds give the drain rate behind Retry-After.
+RATE_WINDOW_SECONDS = 10.0
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 60
+
+JOBS = counter("jobs", "Ingestion jobs by event (submitted, rejected, done, failed).")
+JOB_REVIEWS = counter("job_reviews", "Reviews processed by the ingestion workers, by outcome.")
+
+# A claimed review: (job id, position in the job, review dict).
+JobItem = Tuple[str, int, Dict[str, Any]]
+
+
+class QueueFull(Exception):
+    """Raised by :meth:`JobQueue.submit` when admitting a job would exceed the queue's capacity."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"Job queue is full; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobQueue(ABC):
+    """Reviews waiting to be answered, grouped into jobs.
+
+    Capacity is counted in pending reviews: :meth:`submit` raises
+    :class:`QueueFull`, with a retry delay estimated from the recent drain
+    rate, rather than let a burst grow the queue without bound. Workers
+    :meth:`claim` reviews in FIFO order, at most ``limit`` at a time and all
+    of one app, then :meth:`complete` or :meth:`fail` them. Finished jobs are
+    dropped ``retention_seconds`` after they finish. Subclasses provide the
+    storage by implementing every abstract method; all methods are safe to
+    call from several threads.
+    """
+
+    def __init__(self, max_pending: int = DEFAULT_MAX_PENDING, retention_seconds: float = DEFAULT_RETENTION_SECONDS) -> None:
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self._completions: Deque[Tuple[float, int]] = deque()
+        self._rate_lock = threading.Lock()
+        self._ready = threading.Condition()
+        self._generation = 0
+
+    @property
+    @abstractmethod
+    def pending(self) -> int:
+        """Reviews submitted but not yet finished."""
+
+    @abstractmethod
+    def submit(self, reviews: Sequence[Dict[str, Any]], app_id: Optional[str] = None) -> str:
+        """Queue ``reviews`` as one job and return its id."""
+
+    @abstractmethod
+    def claim(self, limit: int, timeout: float = 0.0) -> Tuple[Optional[str], List[JobItem]]:
+        """Take up to ``limit`` pending reviews of one app, waiting up to ``timeout`` for any."""
+
+    @abstractmethod
+    def complete(self, items: Sequence[JobItem], results: Sequence[Dict[str, Any]]) -> None:
+        """Record one result dict per claimed item."""
+
+    @abstractmethod
+    def fail(self, items: Sequence[JobItem], error: str) -> None:
+        """Mark the jobs of ``items`` failed; their unclaimed reviews are skipped."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a job and its results so far (``None`` for reviews still pending)."""
+
+    def close(self) -> None:
+        pass
+
+    def _admit(self, pending: int, count: int) -> None:
+        if count == 0:
+            raise ValueError("A job needs at least one review")
+        if count > self.max_pending:
+            raise ValueError(f"A job holds at most {self.max_pending} reviews")
+        if pending + count > self.max_pending:
+            JOBS.inc(event="rejected")
+            raise QueueFull(self.retry_after(pending + count - self.max_pending))
+
+    def _wait_for_work(self, generation: int, timeout: float) -> None:
+        # A submit since ``generation`` was read ends the wait at once, so none is missed.
+        with self._ready:
+            self._ready.wait_for(lambda: self._generation != generation, timeout)
+
+    def _notify(self) -> None:
+        with self._ready:
+            self._generation += 1
+            self._ready.notify_all()
+
+    def _record_completed(self, count: int) -> None:
+        now = time.monotonic()
+        with self._rate_lock:
+            self._completions.append((now, count))
+            while self._completions and self._completions[0][0] < now - RATE_WINDOW_SECONDS:
+                self._completions.popleft()
+        JOB_REVIEWS.inc(count, outcome="done")
+
+    def drain_rate(self) -> float:
+        """Reviews finished per second over the last ``RATE_WINDOW_SECONDS``."""
+        now = time.monotonic()
+        with self._rate_lock:
+            done = sum(count for stamp, count in self._completions if stamp >= now - RATE_WINDOW_SECONDS)
+            oldest = self._completions[0][0] if self._completions else now
+        return done / max(now - oldest, 1.0) if done else 0.0
+
+    def retry_after(self, excess: int) -> int:
+        """Whole seconds until ``excess`` more reviews should fit, at the recent drain rate."""
+        rate = self.drain_rate()
+        if rate <= 0:
+            return MIN_RETRY_AFTER
+        return max(MIN_RETRY_AFTER, min(MAX_RETRY_AFTER, math.ceil(excess / rate)))
+
+
+def _new_job(job_id: str, app_id: Optional[str], total: int) -> Dict[str, Any]:
+    return {
+        "job_id": job_id,
+        "app_id": app_id,
+        "status": "queued",
+        "total": total,
+        "completed": 0,
+        "error": None,
+        "created_at": time.time(),
+        "finished_at": None,
+    }
+
+
+class MemoryJobQueue(JobQueue):
+    """Jobs held in process memory; lost on restart."""
+
+    def __init__(self, max_pending: int = DEFAULT_MAX_PENDING, retention_seconds: float = DEFAULT_RETENTION_SECONDS) -> None:
+        super().__init__(max_pending, retention_seconds)
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._results: Dict[str, List[Optional[Dict[str, Any]]]] = {}
+        self._queue: Deque[Tuple[Optional[str], str, int, Dict[str, Any]]] = deque()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def submit(self, reviews: Sequence[Dict[str, Any]], app_id: Optional[str] = None) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._admit(self._pending, len(reviews))
+            self._expire()
+            self._jobs[job_id] = _new_job(job_id, app_id, len(reviews))
+            self._results[job_id] = [None] * len(reviews)
+            self._queue.extend((app_id, job_id, position, review) for position, review in enumerate(reviews))
+            self._pending += len(reviews)
+        JOBS.inc(event="submitted")
+        self._notify()
+        return job_id
+
+    def claim(self, limit: int, timeout: float = 0.0) -> Tuple[Optional[str], List[JobItem]]:
+        generation = self._generation
+        if not self._queue and timeout > 0:
+            self._wait_for_work(generation, timeout)
+        with self._lock:
+            items: List[JobItem] = []
+            app_id: Optional[str] = None
+            while self._queue and len(items) < limit:
+                item_app, job_id, position, review = self._queue[0]
+                job = self._jobs.get(job_id)
+                if job is None or job["status"] == "failed":
+                    self._queue.popleft()
+                    continue
+                if items and item_app != app_id:
+                    break
+                self._queue.popleft()
+                app_id = item_app
+                job["status"] = "running"
+                items.append((job_id, position, review))
+        return app_id, items
+
+    def complete(self, items: Sequence[JobItem], results: Sequence[Dict[str, Any]]) -> None:
+        finished = 0
+        with self._lock:
+            for (job_id, position, _), result in zip(items, results):
+                job = self._jobs.get(job_id)
+                if job is None or job["status"] == "failed":
+                    # fail() already took the job's unfinished reviews off the count.
+                    continue
+                self._results[job_id][position] = result
+                self._pending -= 1
+                finished += 1
+                job["completed"] += 1
+                if job["completed"] == job["total"]:
+                    job["status"] = "done"
+                    job["finished_at"] = time.time()
+                    JOBS.inc(event="done")
+        self._record_completed(finished)
+
+    def fail(self, items: Sequence[JobItem], error: str) -> None:
+        with self._lock:
+            for job_id in dict.fromkeys(job_id for job_id, _, _ in items):
+                job = self._jobs.get(job_id)
+                if job is None or job["status"] == "failed":
+                    continue
+                job["status"] = "failed"
+                job["error"] = error
+                job["finished_at"] = time.time()
+                # Reviews of the job still queued are skipped by claim.
+                self._pending -= job["total"] - job["completed"]
+                JOBS.inc(event="failed")
+        JOB_REVIEWS.inc(len(items), outcome="failed")
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {**job, "results": list(self._results[job_id])}
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [job_id for job_id, job in self._jobs.items() if (job["finished_at"] or math.inf) < cutoff]:
+            del self._jobs[job_id]
+            del self._results[job_id]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    app_id TEXT,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    completed INTEGER NOT NULL,
+    error TEXT,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    app_id TEXT,
+    state TEXT NOT NULL,
+    review TEXT NOT NULL,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS job_items_by_state ON job_items (state, seq);
+CREATE INDEX IF NOT EXISTS job_items_by_job ON job_items (job_id, position);
+"""
+
+
+class SQLiteJobQueue(JobQueue):
+    """Jobs persisted in a SQLite database (WAL mode), so queued reviews survive a restart.
+
+    Reviews claimed but not finished when the process stopped are queued
+    again on open.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        retention_seconds: float = DEFAULT_RETENTION_SECONDS,
+    ) -> None:
+        super().__init__(max_pending, retention_seconds)
+        self.path = Path(path or os.getenv("JOB_QUEUE_PATH") or DEFAULT_JOBS_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path), timeout=30.0, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("UPDATE job_items SET state = 'pending' WHERE state = 'claimed'")
+            self._connection.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'")
+            self._pending = self._connection.execute(
+                "SELECT COUNT(*) FROM job_items WHERE state != 'done'"
+            ).fetchone()[0]
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def submit(self, reviews: Sequence[Dict[str, Any]], app_id: Optional[str] = None) -> str:
+        job_id = uuid.uuid4().hex
+        job = _new_job(job_id, app_id, len(reviews))
+        rows = [
+            (job_id, position, app_id, json.dumps(review, ensure_ascii=False))
+            for position, review in enumerate(reviews)
+        ]
+        with self._lock:
+            self._admit(self._pending, len(reviews))
+            with self._connection:
+                self._expire()
+                self._connection.execute(
+                    "INSERT INTO jobs VALUES (:job_id, :app_id, :status, :total, :completed, :error, :created_at, :finished_at)",
+                    job,
+                )
+                self._connection.executemany(
+                    "INSERT INTO job_items (job_id, position, app_id, state, review) VALUES (?, ?, ?, 'pending', ?)", rows
+                )
+            self._pending += len(reviews)
+        JOBS.inc(event="submitted")
+        self._notify()
+        return job_id
+
+    def claim(self, limit: int, timeout: float = 0.0) -> Tuple[Optional[str], List[JobItem]]:
+        generation = self._generation
+        app_id, items = self._claim(limit)
+        if not items and timeout > 0:
+            self._wait_for_work(generation, timeout)
+            app_id, items = self._claim(limit)
+        return app_id, items
+
+    def _claim(self, limit: int) -> Tuple[Optional[str], List[JobItem]]:
+        with self._lock, self._connection:
+            rows = self._connection.execute(
+                "SELECT seq, job_id, position, app_id, review FROM job_items"
+                " WHERE state = 'pending' ORDER BY seq LIMIT ?",
+                (limit,),
+            ).fetchall()
+            if not rows:
+                return None, []
+            app_id = rows[0][3]
+            claimed = []
+            for row in rows:
+                if row[3] != app_id:
+                    break
+                claimed.append(row)
+            self._connection.executemany(
+                "UPDATE job_items SET state = 'claimed' WHERE seq = ?", [(row[0],) for row in claimed]
+            )
+            self._connection.executemany(
+                "UPDATE jobs SET status = 'running' WHERE job_id = ? AND status = 'queued'",
+                [(job_id,) for job_id in dict.fromkeys(row[1] for row in claimed)],
+            )
+        return app_id, [(job_id, position, json.loads(review)) for _, job_id, position, _, review in claimed]
+
+    def complete(self, items: Sequence[JobItem], results: Sequence[Dict[str, Any]]) -> None:
+        finished_at = time.time()
+        done = 0
+        with self._lock, self._connection:
+            # Reviews of a job failed meanwhile are already 'done' and stay as they are,
+            # so only rows this update actually finished count towards their job.
+            finished: Dict[str, int] = {}
+            for (job_id, position, _), result in zip(items, results):
+                finished[job_id] = finished.get(job_id, 0) + self._connection.execute(
+                    "UPDATE job_items SET state = 'done', result = ?"
+                    " WHERE job_id = ? AND position = ? AND state = 'claimed'",
+                    (json.dumps(result, ensure_ascii=False), job_id, position),
+                ).rowcount
+            for job_id, count in finished.items():
+                if not count:
+                    continue
+                self._connection.execute(
+                    "UPDATE jobs SET completed = completed + ? WHERE job_id = ?", (count, job_id)
+                )
+                done += self._connection.execute(
+                    "UPDATE jobs SET status = 'done', finished_at = ?"
+                    " WHERE job_id = ? AND completed = total AND status != 'failed'",
+                    (finished_at, job_id),
+                ).rowcount
+            self._pending -= sum(finished.values())
+        if done:
+            JOBS.inc(done, event="done")
+        self._record_completed(sum(finished.values()))
+
+    def fail(self, items: Sequence[JobItem], error: str) -> None:
+        with self._lock, self._connection:
+            for job_id in dict.fromkeys(job_id for job_id, _, _ in items):
+                updated = self._connection.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE job_id = ? AND status != 'failed'",
+                    (error, time.time(), job_id),
+                ).rowcount
+                if not updated:
+                    continue
+                skipped = self._connection.execute(
+                    "UPDATE job_items SET state = 'done' WHERE job_id = ? AND state != 'done'", (job_id,)
+                ).rowcount
+                self._pending -= skipped
+                JOBS.inc(event="failed")
+        JOB_REVIEWS.inc(len(items), outcome="failed")
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            cursor = self._connection.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            job = dict(zip((column[0] for column in cursor.description), row))
+            results = self._connection.execute(
+                "SELECT result FROM job_items WHERE job_id = ? ORDER BY position", (job_id,)
+            ).fetchall()
+        job["results"] = [json.loads(result) if result else None for (result,) in results]
+        return job
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            (job_id,)
+            for (job_id,) in self._connection.execute("SELECT job_id FROM jobs WHERE finished_at < ?", (cutoff,))
+        ]
+        self._connection.executemany("DELETE FROM job_items WHERE job_id = ?", expired)
+        self._connection.executemany("DELETE FROM jobs WHERE job_id = ?", expired)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+def open_job_queue(kind: Optional[str] = None, path: Optional[str] = None) -> JobQueue:
+    """The queue named by ``kind`` or ``JOB_QUEUE`` (``memory``, the default, or ``sqlite``)."""
+    kind = kind or os.getenv("JOB_QUEUE") or "memory"
+    max_pending = int(os.getenv("JOB_QUEUE_MAX_PENDING", DEFAULT_MAX_PENDING))
+    if kind == "memory":
+        return MemoryJobQueue(max_pending)
+    if kind == "sqlite":
+        return SQLiteJobQueue(path, max_pending)
+    raise ValueError(f"Unknown job queue {kind!r}; expected memory or sqlite")
+
+
+class JobWorkers:
+    """Threads that drain a :class:`JobQueue` through the pipeline in micro-batches.
+
+    ``route`` maps a job's app id (``None`` for the default FAQ base) to the
+    pipeline answering it. A batch that raises fails its jobs; the workers
+    carry on with the next batch.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        route: Callable[[Optional[str]], Any],
+        workers: int = 2,
+        batch_size: int = 64,
+        poll_interval: float = 0.5,
+    ) -> None:
+        self.queue = queue
+        self.route = route
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"job-worker-{index}", daemon=True) for index in range(workers)
+        ]
+
+    def start(self) -> "JobWorkers":
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self.queue._notify()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            app_id, items = self.queue.claim(self.batch_size, self.poll_interval)
+            if not items:
+                continue
+            try:
+                pipeline = self.route(app_id)
+                results = pipeline.run_batch([review for _, _, review in items], self.batch_size)
+            except Exception as exc:
+                logger.exception("Job batch of %s reviews failed", len(items))
+                self.queue.fail(items, str(exc) or type(exc).__name__)
+                continue
+            self.queue.complete(items, [result.to_dict() for result in results])
+
+
+__all__ = [
+    "JobQueue",
+    "JobWorkers",
+    "MemoryJobQueue",
+    "QueueFull",
+    "SQLiteJobQueue",
+    "open_job_queue",
+    "DEFAULT_JOBS_PATH",
+]
@@ -0,0 +1,205 @@
+"""Precompiled inverted index for the keyword fallback retriever."""
+from __future__ import annotations
+
+import copy
+import heapq
+from collections import defaultdict
+from typing import Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+from keyword_matcher import KeywordMatcher
+
+# Topic tokens that earn a bonus when they appear in both the query and an entry.
+KEYWORD_TOKENS = (
+    "crash", "bug", "slow", "lag",
+    "feature", "request", "love", "thanks",
+    "billing", "charge", "login", "password",
+    "mode", "dark",
+)
+TOKEN_MATCHER = KeywordMatcher(KEYWORD_TOKENS)
+CATEGORY_BOOST = 5.0
+TOKEN_WEIGHT = 2.0
+TITLE_WEIGHT = 1.0
+BODY_WEIGHT = 0.5
+
+
+class KeywordIndex:
+    """Inverted index reproducing the linear keyword scoring of ``FAQRetriever``.
+
+    Every entry is lowercased and split once at construction. Title and body
+    words go into a prefix set so a query only has to be walked once to find
+    which indexed words occur inside it, and only the entries in the matching
+    posting lists are scored. Ties resolve to the earliest entry, exactly like
+    the original scan.
+
+    :meth:`with_changes` derives an updated index for a hot-reloaded FAQ base
+    without touching this one. ``entries`` may then hold ``None`` for deleted
+    positions.
+    """
+
+    def __init__(self, faq_entries: List[Optional[Dict[str, str]]]) -> None:
+        self.entries = faq_entries
+        self._token_postings: Dict[str, List[int]] = {token: [] for token in KEYWORD_TOKENS}
+        self._title_postings: Dict[str, List[int]] = defaultdict(list)
+        self._body_postings: Dict[str, List[int]] = defaultdict(list)
+        self._category_boost: Dict[str, List[int]] = defaultdict(list)
+        self._prefixes: Set[str] = set()
+        self._max_word_len = 0
+
+        for entry_id, entry in enumerate(faq_entries):
+            if entry is not None:
+                self._add_entry(entry_id, entry)
+        self._title_postings = dict(self._title_postings)
+        self._body_postings = dict(self._body_postings)
+        self._category_boost = dict(self._category_boost)
+        self._fallback_position = _first_live(faq_entries)
+
+    def _postings(self) -> Dict[str, Dict[str, List[int]]]:
+        return {
+            "category": self._category_boost,
+            "token": self._token_postings,
+            "title": self._title_postings,
+            "body": self._body_postings,
+        }
+
+    @staticmethod
+    def _entry_keys(entry: Dict[str, str]) -> Iterator[Tuple[str, str]]:
+        """Yield ``(table, key)`` for every posting list the entry belongs to."""
+        title = entry.get("title", "").lower()
+        body = entry.get("body", "").lower()
+        category = entry.get("category")
+        if category:
+            yield "category", category
+        for token in TOKEN_MATCHER.find(title + body):
+            yield "token", token
+        for word in set(title.split()):
+            yield "title", word
+        for word in set(body.split()):
+            yield "body", word
+
+    def _add_entry(self, entry_id: int, entry: Dict[str, str]) -> None:
+        tables = self._postings()
+        for table, key in self._entry_keys(entry):
+            tables[table][key].append(entry_id)
+            if table in ("title", "body"):
+                self._add_prefixes(key)
+
+    def with_changes(
+        self,
+        entries: List[Optional[Dict[str, str]]],
+        removed: Mapping[int, Dict[str, str]],
+        added: Mapping[int, Dict[str, str]],
+    ) -> "KeywordIndex":
+        """Return a new index over ``entries`` after removing and adding entries by position.
+
+        ``removed`` maps positions to the entries they held before (deleted or
+        updated); ``added`` maps positions to their new entries. Only the
+        posting lists those entries touch are rebuilt; every other list is
+        shared with this index, which stays valid for in-flight lookups. The
+        prefix set is shared and only grows, which never changes results.
+        """
+        index = copy.copy(self)
+        index.entries = entries
+        index._category_boost = dict(self._category_boost)
+        index._token_postings = dict(self._token_postings)
+        index._title_postings = dict(self._title_postings)
+        index._body_postings = dict(self._body_postings)
+        tables = index._postings()
+
+        drops: Dict[Tuple[str, str], Set[int]] = defaultdict(set)
+        adds: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for entry_id, entry in removed.items():
+            for table_key in self._entry_keys(entry):
+                drops[table_key].add(entry_id)
+        for entry_id, entry in added.items():
+            for table_key in self._entry_keys(entry):
+                adds[table_key].append(entry_id)
+                if table_key[0] in ("title", "body"):
+                    index._add_prefixes(table_key[1])
+
+        for table_key in set(drops) | set(adds):
+            table, key = table_key
+            # Copy, then remove by value: both run in C, unlike a filtering comprehension.
+            postings = list(tables[table].get(key, ()))
+            for entry_id in drops.get(table_key, ()):
+                postings.remove(entry_id)
+            postings.extend(adds.get(table_key, ()))
+            if postings or table == "token":
+                tables[table][key] = postings
+            else:
+                del tables[table][key]
+        index._fallback_position = _first_live(entries)
+        return index
+
+    def _add_prefixes(self, word: str) -> None:
+        for end in range(1, len(word) + 1):
+            self._prefixes.add(word[:end])
+        self._max_word_len = max(self._max_word_len, len(word))
+
+    def _words_in(self, lowered_query: str) -> Set[str]:
+        """Return every indexed word that occurs as a substring of the query."""
+        found: Set[str] = set()
+        prefixes = self._prefixes
+        title_postings = self._title_postings
+        body_postings = self._body_postings
+        length = len(lowered_query)
+        for start in range(length):
+            stop = min(length, start + self._max_word_len)
+            for end in range(start + 1, stop + 1):
+                fragment = lowered_query[start:end]
+                if fragment not in prefixes:
+                    break
+                if fragment in title_postings or fragment in body_postings:
+                    found.add(fragment)
+        return found
+
+    def scores(self, query: str, category: Optional[str] = None) -> Dict[int, float]:
+        """Score the candidate entries for ``query``; unlisted entries score zero."""
+        lowered_query = query.lower()
+        scores: Dict[int, float] = defaultdict(float)
+        if category:
+            for entry_id in self._category_boost.get(category, ()):
+                scores[entry_id] += CATEGORY_BOOST
+        for token in TOKEN_MATCHER.find(lowered_query):
+            for entry_id in self._token_postings[token]:
+                scores[entry_id] += TOKEN_WEIGHT
+        # Title and body matches count once per entry, however many words hit.
+        title_hits: Set[int] = set()
+        body_hits: Set[int] = set()
+        for word in self._words_in(lowered_query):
+            title_hits.update(self._title_postings.get(word, ()))
+            body_hits.update(self._body_postings.get(word, ()))
+        for entry_id in title_hits:
+            scores[entry_id] += TITLE_WEIGHT
+        for entry_id in body_hits:
+            scores[entry_id] += BODY_WEIGHT
+        return scores
+
+    def best_position(self, query: str, category: Optional[str] = None) -> int:
+        """Return the position of the highest scoring entry, preferring the earliest on ties."""
+        scores = self.scores(query, category)
+        if not scores:
+            return self._fallback_position
+        return min(scores, key=lambda entry_id: (-scores[entry_id], entry_id))
+
+    def top_positions(self, query: str, k: int, category: Optional[str] = None) -> List[Tuple[int, float]]:
+        """Return up to ``k`` ``(position, score)`` pairs, best first and earliest on ties.
+
+        When nothing scores, the fallback entry is returned alone with score zero.
+        """
+        scores = self.scores(query, category)
+        if not scores:
+            return [(self._fallback_position, 0.0)]
+        best = heapq.nsmallest(k, scores, key=lambda entry_id: (-scores[entry_id], entry_id))
+        return [(entry_id, scores[entry_id]) for entry_id in best]
+
+    def best(self, query: str, category: Optional[str] = None) -> Dict[str, str]:
+        """Return the highest scoring entry, preferring the earliest on ties."""
+        return self.entries[self.best_position(query, category)]
+
+
+def _first_live(entries: List[Optional[Dict[str, str]]]) -> int:
+    """Position the legacy scan returns when nothing scores: the first entry."""
+    return next((position for position, entry in enumerate(entries) if entry is not None), 0)
+
+
+__all__ = ["KeywordIndex", "KEYWORD_TOKENS"]
@@ -0,0 +1,77 @@
+"""Shared matcher reporting which keywords of a fixed table occur in a text."""
+from __future__ import annotations
+
+import re
+from typing import Dict, FrozenSet, Iterable
+
+# Below this many keywords CPython's C-level ``in`` scans beat a single regex
+# pass; see ``python -m benchmarks.classifier`` for the crossover.
+COMPILED_MIN_KEYWORDS = 96
+STRATEGIES = ("auto", "scan", "regex")
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Build a prefix-merged alternation that prefers the longest keyword."""
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return render(trie)
+
+
+class KeywordMatcher:
+    """Find which keywords of a fixed table occur anywhere in a text.
+
+    Built once per keyword table and shared by the classifier, the retriever
+    and the evaluator. ``find`` returns exactly
+    ``{kw for kw in keywords if kw in text}``, overlaps included, using one
+    of two strategies:
+
+    * ``scan``: one C-level substring search per keyword, fastest for the
+      small tables this app ships with.
+    * ``regex``: a single pass of a compiled, prefix-merged lookahead regex
+      that reports the longest keyword starting at each position; shorter
+      keywords contained in a reported one are added from a precomputed
+      table. Its cost barely grows with the number of keywords.
+
+    ``auto`` picks ``regex`` for tables of ``COMPILED_MIN_KEYWORDS`` or more.
+    Matching is case-sensitive; callers lowercase the text as before.
+    """
+
+    def __init__(self, keywords: Iterable[str], strategy: str = "auto") -> None:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}; expected one of {', '.join(STRATEGIES)}")
+        self.keywords = tuple(dict.fromkeys(keyword for keyword in keywords if keyword))
+        if strategy == "auto":
+            strategy = "regex" if len(self.keywords) >= COMPILED_MIN_KEYWORDS else "scan"
+        self.strategy = strategy
+        self._pattern = None
+        self._implied: Dict[str, FrozenSet[str]] = {}
+        if strategy == "regex" and self.keywords:
+            self._pattern = re.compile(f"(?=({_trie_pattern(self.keywords)}))")
+            self._implied = {
+                keyword: frozenset(other for other in self.keywords if other in keyword)
+                for keyword in self.keywords
+            }
+
+    def find(self, text: str) -> FrozenSet[str]:
+        """Return the set of keywords that occur as substrings of ``text``."""
+        if self._pattern is None:
+            return frozenset(keyword for keyword in self.keywords if keyword in text)
+        found = set()
+        for longest in set(self._pattern.findall(text)):
+            found.update(self._implied[longest])
+        return frozenset(found)
+
+
+__all__ = ["KeywordMatcher", "COMPILED_MIN_KEYWORDS"]
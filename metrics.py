@@ -0,0 +1,215 @@
+"""In-process metrics: stage latency histograms, counters and Prometheus exposition."""
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+METRIC_PREFIX = "review_responder"
+
+# Upper bounds in seconds, roughly log-spaced from 10us to 10s.
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram fed with ``perf_counter_ns`` durations.
+
+    Observations only bump an integer bucket counter and two running totals
+    under a lock, so recording on every call stays cheap.
+    """
+
+    def __init__(self, name: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.buckets = tuple(buckets)
+        self._bounds_ns = [int(bound * 1e9) for bound in self.buckets]
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum_ns = 0
+        self._lock = threading.Lock()
+
+    def observe_ns(self, duration_ns: int) -> None:
+        index = bisect_left(self._bounds_ns, duration_ns)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum_ns += duration_ns
+
+    def observe(self, seconds: float) -> None:
+        self.observe_ns(int(seconds * 1e9))
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    def snapshot(self) -> Dict[str, object]:
+        """Return per-bucket counts (non-cumulative), total count and sum in seconds."""
+        with self._lock:
+            counts = list(self._counts)
+            total_ns = self._sum_ns
+        return {
+            "buckets": list(self.buckets),
+            "counts": counts,
+            "count": sum(counts),
+            "sum": total_ns / 1e9,
+        }
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Approximate quantile: the upper bound of the bucket holding it."""
+        counts: List[int] = self.snapshot()["counts"]  # type: ignore[assignment]
+        total = sum(counts)
+        if not total:
+            return None
+        threshold = fraction * total
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            if running >= threshold:
+                return bound
+        return float("inf")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._sum_ns = 0
+
+
+_STAGE_HISTOGRAMS: Dict[str, LatencyHistogram] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def stage_histogram(name: str) -> LatencyHistogram:
+    """Return the process-wide histogram for ``name``, creating it on first use."""
+    histogram = _STAGE_HISTOGRAMS.get(name)
+    if histogram is None:
+        with _REGISTRY_LOCK:
+            histogram = _STAGE_HISTOGRAMS.setdefault(name, LatencyHistogram(name))
+    return histogram
+
+
+def drop_stage_histogram(name: str) -> None:
+    """Unregister the histogram for ``name`` so it is no longer exported, e.g. for an evicted tenant."""
+    with _REGISTRY_LOCK:
+        _STAGE_HISTOGRAMS.pop(name, None)
+
+
+def stage_histograms() -> Dict[str, LatencyHistogram]:
+    """Snapshot of every registered stage histogram, keyed by stage name."""
+    return dict(_STAGE_HISTOGRAMS)
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0.0)
+
+    def samples(self) -> List[Tuple[Dict[str, str], float]]:
+        with self._lock:
+            return [(dict(key), value) for key, value in self._values.items()]
+
+
+# A gauge sample produced at scrape time: (name, help, labels, value).
+GaugeSample = Tuple[str, str, Dict[str, str], float]
+
+_COUNTERS: Dict[str, Counter] = {}
+_COLLECTORS: List[Callable[[], Iterable[GaugeSample]]] = []
+
+
+def counter(name: str, help_text: str = "") -> Counter:
+    """Return the process-wide counter ``name``, creating it on first use."""
+    existing = _COUNTERS.get(name)
+    if existing is None:
+        with _REGISTRY_LOCK:
+            existing = _COUNTERS.setdefault(name, Counter(name, help_text))
+    return existing
+
+
+def register_collector(collector: Callable[[], Iterable[GaugeSample]]) -> None:
+    """Register a callable evaluated on every scrape to report gauges (cache sizes, ratios)."""
+    with _REGISTRY_LOCK:
+        _COLLECTORS.append(collector)
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in sorted(labels.items()):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value) if not value.is_integer() else str(int(value))
+
+
+def render_prometheus() -> str:
+    """Render every histogram, counter and collector in the Prometheus text format."""
+    lines: List[str] = []
+    latency = f"{METRIC_PREFIX}_stage_latency_seconds"
+    lines.append(f"# HELP {latency} Latency of traced pipeline stages.")
+    lines.append(f"# TYPE {latency} histogram")
+    for name, histogram in sorted(stage_histograms().items()):
+        snapshot = histogram.snapshot()
+        running = 0
+        for bound, count in zip(list(snapshot["buckets"]) + [float("inf")], snapshot["counts"]):  # type: ignore[operator]
+            running += count
+            lines.append(f"{latency}_bucket{_labels({'stage': name, 'le': _number(bound)})} {running}")
+        lines.append(f"{latency}_sum{_labels({'stage': name})} {_number(snapshot['sum'])}")  # type: ignore[arg-type]
+        lines.append(f"{latency}_count{_labels({'stage': name})} {snapshot['count']}")
+
+    for name, metric in sorted(_COUNTERS.items()):
+        full_name = f"{METRIC_PREFIX}_{name}_total"
+        lines.append(f"# HELP {full_name} {_help(metric.help_text)}")
+        lines.append(f"# TYPE {full_name} counter")
+        for labels, value in metric.samples():
+            lines.append(f"{full_name}{_labels(labels)} {_number(value)}")
+
+    gauges: Dict[str, List[GaugeSample]] = {}
+    for collector in list(_COLLECTORS):
+        for sample in collector():
+            gauges.setdefault(sample[0], []).append(sample)
+    for name, samples in sorted(gauges.items()):
+        full_name = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# HELP {full_name} {_help(samples[0][1])}")
+        lines.append(f"# TYPE {full_name} gauge")
+        for _, _, labels, value in samples:
+            lines.append(f"{full_name}{_labels(labels)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+__all__ = [
+    "Counter",
+    "LatencyHistogram",
+    "counter",
+    "drop_stage_histogram",
+    "register_collector",
+    "render_prometheus",
+    "stage_histogram",
+    "stage_histograms",
+    "DEFAULT_BUCKETS",
+    "GaugeSample",
+]
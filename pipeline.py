@@ -1,12 +1,27 @@
 """Airia orchestration pipeline for responding to reviews."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, Optional
+import copy
+import functools
+import json
+import logging
+import sys
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from honeyhive import HoneyHiveEvaluator, HoneyHiveScore, trace, HONEYHIVE_AVAILABLE
+from dedup import Fingerprint, ReviewDeduplicator
+from honeyhive import HoneyHiveEvaluator, HoneyHiveScore, ScoringWorker, trace
+from keyword_matcher import KeywordMatcher
+from metrics import counter
+from response_templates import TemplateEngine
+from result_store import ResultStore, review_key
 from retrieval import FAQRetriever
+from streaming_loader import iter_reviews
 
+logger = logging.getLogger(__name__)
 
 CATEGORY_KEYWORDS = {
     "bug": ["crash", "bug", "error", "freeze", "won't", "cant", "can't", "issue"],
@@ -15,9 +30,20 @@ CATEGORY_KEYWORDS = {
     "complaint": ["slow", "lag", "bad", "frustrated", "billing", "charge", "annoying", "unhappy"],
 }
 DEFAULT_CATEGORY = "complaint"
+DEFAULT_BATCH_SIZE = 256
+STAGES = ("classify", "retrieve", "generate", "score")
+DEDUP_TOTALS = ("lookups", "exact_hits", "near_hits", "seconds_saved")
+# Bump whenever a code change alters results, so stored results are recomputed.
+PIPELINE_VERSION = "1"
+RESPONSE_TEMPLATES = TemplateEngine.from_file()
+REVIEWS_PROCESSED = counter("reviews_processed", "Reviews that completed the pipeline.")
+RESULT_STORE_LOOKUPS = counter("result_store_lookups", "Batch reviews looked up in the result store.")
+_CATEGORY_MATCHER = KeywordMatcher(
+    keyword for keywords in CATEGORY_KEYWORDS.values() for keyword in keywords
+)
 
 
-@dataclass
+@dataclass(slots=True)
 class ReviewResult:
     review: Dict[str, str]
     category: str
@@ -25,82 +51,622 @@ class ReviewResult:
     response: str
     honeyhive_score: Optional[HoneyHiveScore] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable representation of the result."""
+        return asdict(self)
 
-@trace
-def classify_review(review_text: str) -> str:
-    """Classify review into categories based on keywords."""
-    lowered = review_text.lower()
+    @classmethod
+    def from_dict(
+        cls,
+        data: Dict[str, Any],
+        faq_entries: Optional[Dict[Any, Dict[str, str]]] = None,
+    ) -> "ReviewResult":
+        """Rebuild a result from :meth:`to_dict` output.
+
+        ``faq_entries`` maps FAQ ids to entries; a result whose entry equals
+        the one under its id references that entry instead of its own copy.
+        """
+        score = data.get("honeyhive_score")
+        faq_entry = data["faq_entry"]
+        if faq_entries is not None:
+            shared = faq_entries.get(faq_entry.get("id"))
+            if shared == faq_entry:
+                faq_entry = shared
+        return cls(
+            review=data["review"],
+            category=sys.intern(data["category"]),
+            faq_entry=faq_entry,
+            response=data["response"],
+            honeyhive_score=HoneyHiveScore(**score) if score is not None else None,
+        )
+
+
+def _classify_text(review_text: str) -> str:
+    hits = _CATEGORY_MATCHER.find(review_text.lower())
     best_category = DEFAULT_CATEGORY
     best_score = 0
+    if not hits:
+        return best_category
     for category, keywords in CATEGORY_KEYWORDS.items():
-        score = sum(1 for keyword in keywords if keyword in lowered)
+        score = sum(1 for keyword in keywords if keyword in hits)
         if score > best_score:
             best_score = score
             best_category = category
     return best_category
 
 
+@trace
+def classify_review(review_text: str) -> str:
+    """Classify review into categories based on keywords."""
+    return _classify_text(review_text)
+
+
+@trace
+def classify_reviews(review_texts: Sequence[str]) -> List[str]:
+    """Classify a batch of reviews under a single trace span."""
+    return [_classify_text(text) for text in review_texts]
+
+
+def _render_response(review: Dict[str, str], category: str, faq_entry: Dict[str, str]) -> str:
+    return RESPONSE_TEMPLATES.render(review, category, faq_entry)
+
+
 @trace
 def generate_response(review: Dict[str, str], category: str, faq_entry: Dict[str, str]) -> str:
     """Generate a personalized response to a review based on category and FAQ entry."""
-    author = review.get("author") or "there"
-    rating = review.get("rating")
-    review_text = review.get("text", "")
-    base_intro = {
-        "bug": "I'm sorry you're running into trouble",
-        "feature request": "Thank you for the thoughtful idea",
-        "praise": "We're thrilled you're enjoying the app",
-        "complaint": "Thanks for sharing your experience",
-    }.get(category, "Thanks for reaching out")
-
-    rating_snippet = f" and for leaving a {rating}-star rating" if rating else ""
-    faq_answer = faq_entry.get("body", "")
-    category_line = {
-        "bug": "Our engineers are actively looking into issues like the one you described.",
-        "feature request": "I've shared your request with the product team so it can influence the roadmap.",
-        "praise": "Feedback like yours keeps us motivated to keep building.",
-        "complaint": "We're keeping a close eye on similar reports so we can improve right away.",
-    }.get(category, "We're on it.")
-
-    response = (
-        f"Hi {author}, {base_intro}{rating_snippet}. "
-        f"I read your note (\"{review_text}\") and want you to know we're listening. "
-        f"{faq_answer} {category_line}"
-        " If you have more details to share, just reply to this review or contact support and we'll jump in."
-        " Thanks again for helping us build a better app!"
-    )
-    return response.strip()
+    return _render_response(review, category, faq_entry)
+
+
+@trace
+def generate_responses(
+    reviews: Sequence[Dict[str, str]],
+    categories: Sequence[str],
+    faq_entries: Sequence[Dict[str, str]],
+) -> List[str]:
+    """Generate responses for a batch of reviews under a single trace span."""
+    return RESPONSE_TEMPLATES.render_batch(reviews, categories, faq_entries)
+
+
+def _shards(reviews: Iterable[Dict[str, str]], size: int) -> Iterator[List[Dict[str, str]]]:
+    shard: List[Dict[str, str]] = []
+    for review in reviews:
+        shard.append(review)
+        if len(shard) >= size:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
 
 
 class AiriaPipeline:
-    """Simple Airia-style orchestrator with explicit steps."""
+    """Simple Airia-style orchestrator with explicit steps.
+
+    With ``background_scoring`` the HoneyHive evaluation of :meth:`run` and
+    :meth:`arun` moves to a :class:`~honeyhive.ScoringWorker`: results are
+    returned without a score, and ``honeyhive_score`` is filled in once the
+    worker has scored the batch the review landed in. By then an API
+    response has already been sent, so each background score is also logged
+    on this module's logger at INFO. Batch processing always scores inline.
+
+    With ``dedup`` a :class:`~dedup.ReviewDeduplicator` runs ahead of
+    classification: a review that exactly or nearly duplicates one seen
+    since the FAQ base last changed reuses that review's category and FAQ
+    entry, and only its response is rendered (with its own author, rating
+    and text) and scored.
+
+    With a ``result_store`` batch processing first looks every review up by
+    ``(store, id)`` under the current FAQ content digest and
+    :attr:`version`; unchanged reviews get their stored result back and only
+    the rest run through the stages, so a rerun over a growing dump costs
+    about as much as its new reviews. Fresh results are written back in bulk.
+    """
 
-    def __init__(self, enable_honeyhive: bool = True) -> None:
-        self.retriever = FAQRetriever()
+    def __init__(
+        self,
+        enable_honeyhive: bool = True,
+        background_scoring: bool = False,
+        dedup: bool = False,
+        result_store: Optional[ResultStore] = None,
+        retriever: Optional[FAQRetriever] = None,
+    ) -> None:
+        self.retriever = retriever if retriever is not None else FAQRetriever()
         self.honeyhive = HoneyHiveEvaluator() if enable_honeyhive else None
+        self.scoring_worker = ScoringWorker(self.honeyhive) if self.honeyhive and background_scoring else None
+        self.dedup = ReviewDeduplicator() if dedup else None
+        self.result_store = result_store
+        self.stored_results = 0
+        self.stage_seconds: Dict[str, float] = {stage: 0.0 for stage in STAGES}
+        self._faq_index: Tuple[int, Dict[Any, Dict[str, str]]] = (-1, {})
+
+    def with_retriever(self, retriever: FAQRetriever) -> "AiriaPipeline":
+        """A pipeline over ``retriever``'s FAQ base sharing this one's evaluator, scoring worker and store.
+
+        Dedup state and stage timings start fresh: reused FAQ entries must
+        come from the same FAQ base.
+        """
+        pipeline = copy.copy(self)
+        pipeline.retriever = retriever
+        pipeline.dedup = ReviewDeduplicator() if self.dedup is not None else None
+        pipeline.stored_results = 0
+        pipeline.stage_seconds = {stage: 0.0 for stage in STAGES}
+        pipeline._faq_index = (-1, {})
+        return pipeline
+
+    @property
+    def version(self) -> str:
+        """Everything besides the FAQ base that shapes a result: code, backend, templates and options."""
+        return ":".join((
+            PIPELINE_VERSION,
+            self.retriever.backend,
+            RESPONSE_TEMPLATES.digest,
+            "honeyhive" if self.honeyhive else "no-honeyhive",
+            "dedup" if self.dedup is not None else "no-dedup",
+        ))
+
+    def _find_duplicate(self, review_text: str) -> Tuple[Optional[Fingerprint], Optional[Tuple[str, Dict[str, str]]]]:
+        """Fingerprint ``review_text`` and return the canonical (category, FAQ entry), if any.
+
+        Dedup slots are ``[(category, faq_entry) or None, seconds]``, where
+        ``seconds`` is what classifying and retrieving the canonical review cost.
+        """
+        if self.dedup is None:
+            return None, None
+        started = time.perf_counter()
+        self.dedup.sync(self.retriever.snapshot.version)
+        fingerprint = self.dedup.fingerprint(review_text)
+        slot = self.dedup.find(fingerprint)
+        reused = slot[0] if slot is not None else None
+        self.dedup.record(
+            reused_seconds=slot[1] if reused is not None else 0.0,
+            overhead_seconds=time.perf_counter() - started,
+        )
+        return fingerprint, reused
+
+    def _remember(self, fingerprint: Optional[Fingerprint], category: str, faq_entry: Dict[str, str], seconds: float) -> None:
+        if fingerprint is not None:
+            self.dedup.add(fingerprint, [(category, faq_entry), seconds])
+            self.dedup.record(fresh=1, fresh_seconds=seconds)
+
+    def _score(self, result: ReviewResult, review_text: str) -> None:
+        if self.scoring_worker is not None:
+            self.scoring_worker.submit(
+                review_text, result.response, result.faq_entry,
+                functools.partial(self._record_background_score, result),
+            )
+        elif self.honeyhive:
+            result.honeyhive_score = self.honeyhive.score(review_text, result.response, result.faq_entry)
+
+    @staticmethod
+    def _record_background_score(result: ReviewResult, score: HoneyHiveScore) -> None:
+        result.honeyhive_score = score
+        logger.info(
+            "HoneyHive score for review %s (%s): helpfulness %.3f, correctness %.3f, relevance %.3f, tone %.3f, clarity %.3f",
+            result.review.get("id"), result.category, score.helpfulness,
+            score.correctness, score.relevance, score.tone, score.clarity,
+        )
 
     @trace
     def run(self, review: Dict[str, str]) -> ReviewResult:
         """Main pipeline to process a review and generate a response."""
         review_text = review.get("text", "")
-        category = classify_review(review_text)
-        faq_entry = self.retriever.retrieve(review_text, category=category)
+        fingerprint, reused = self._find_duplicate(review_text)
+        if reused is not None:
+            category, faq_entry = reused
+        else:
+            started = time.perf_counter()
+            category = classify_review(review_text)
+            faq_entry = self.retriever.retrieve(review_text, category=category)
+            self._remember(fingerprint, category, faq_entry, time.perf_counter() - started)
         response = generate_response(review, category, faq_entry)
-        honeyhive_score = None
+        result = ReviewResult(review=review, category=category, faq_entry=faq_entry, response=response)
+        self._score(result, review_text)
+        REVIEWS_PROCESSED.inc(mode="single")
+        return result
+
+    @trace
+    async def arun(self, review: Dict[str, str]) -> ReviewResult:
+        """Async variant of :meth:`run`; only retrieval performs I/O and is awaited."""
+        review_text = review.get("text", "")
+        fingerprint, reused = self._find_duplicate(review_text)
+        if reused is not None:
+            category, faq_entry = reused
+        else:
+            started = time.perf_counter()
+            category = classify_review(review_text)
+            faq_entry = await self.retriever.aretrieve(review_text, category=category)
+            self._remember(fingerprint, category, faq_entry, time.perf_counter() - started)
+        response = generate_response(review, category, faq_entry)
+        result = ReviewResult(review=review, category=category, faq_entry=faq_entry, response=response)
+        self._score(result, review_text)
+        REVIEWS_PROCESSED.inc(mode="async")
+        return result
+
+    def run_batch(
+        self,
+        reviews: Iterable[Dict[str, str]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        stage_seconds: Optional[Dict[str, float]] = None,
+    ) -> List[ReviewResult]:
+        """Process many reviews, returning results in input order.
+
+        Each stage runs once per batch of ``batch_size`` reviews, so tracing,
+        embedding and scoring overhead is paid per batch instead of per review.
+        Results are identical to calling :meth:`run` on each review. Seconds
+        spent per stage by this call alone are added to ``stage_seconds``,
+        if given, as well as to the pipeline-wide :attr:`stage_seconds`.
+        """
+        return list(self.iter_results(reviews, batch_size=batch_size, stage_seconds=stage_seconds))
+
+    def iter_results(
+        self,
+        reviews: Iterable[Dict[str, str]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        stage_seconds: Optional[Dict[str, float]] = None,
+    ) -> Iterator[ReviewResult]:
+        """Lazily process ``reviews`` batch by batch, yielding results in input order.
+
+        Only one batch is held in memory at a time, so ``reviews`` can be a
+        generator such as :func:`streaming_loader.iter_reviews`.
+        ``stage_seconds`` is as for :meth:`run_batch`.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        for batch in _shards(reviews, batch_size):
+            yield from self._run_chunk(batch, stage_seconds)
+
+    def _dedup_slots(self, review_texts: Sequence[str]) -> Tuple[List[List[Any]], List[int]]:
+        """Return one shared slot per row plus the rows that must be processed to fill them.
+
+        Slots are filled as in :meth:`_find_duplicate`. Rows duplicating
+        an earlier row of the same chunk share its slot. A slot left unfilled
+        by a chunk still running in another thread counts as a miss, so every
+        slot is filled by the end of this chunk.
+        """
+        self.dedup.sync(self.retriever.snapshot.version)
+        fingerprints = [self.dedup.fingerprint(review_text) for review_text in review_texts]
+        self.dedup.prepare(fingerprints)
+        own_slots = set()
+        slots = []
+        fresh_rows = []
+        for row, fingerprint in enumerate(fingerprints):
+            slot = self.dedup.find(fingerprint)
+            if slot is None or (slot[0] is None and id(slot) not in own_slots):
+                slot = [None, 0.0]
+                own_slots.add(id(slot))
+                self.dedup.add(fingerprint, slot)
+                fresh_rows.append(row)
+            slots.append(slot)
+        return slots, fresh_rows
+
+    def _faq_by_id(self) -> Dict[Any, Dict[str, str]]:
+        """The served FAQ entries by id, rebuilt when the FAQ base changes."""
+        snapshot = self.retriever.snapshot
+        version, entries = self._faq_index
+        if version != snapshot.version:
+            entries = {entry.get("id"): entry for entry in snapshot.live_entries()}
+            self._faq_index = (snapshot.version, entries)
+        return entries
+
+    @trace
+    def _run_chunk(
+        self, reviews: List[Dict[str, str]], stage_seconds: Optional[Dict[str, float]] = None
+    ) -> List[ReviewResult]:
+        if self.result_store is None:
+            return self._process_chunk(reviews, stage_seconds)
+        faq_version, pipeline_version = self.retriever.content_version(), self.version
+        keys = [review_key(review) for review in reviews]
+        stored = self.result_store.get_many([key for key in keys if key is not None], faq_version, pipeline_version)
+        results: List[Optional[ReviewResult]] = [None] * len(reviews)
+        pending = []
+        for row, (review, key) in enumerate(zip(reviews, keys)):
+            hit = stored.get(key) if key is not None else None
+            # A review edited since it was stored keeps its id, so compare the review too.
+            if hit is not None and hit["review"] == review:
+                results[row] = ReviewResult.from_dict(hit, self._faq_by_id())
+            else:
+                pending.append(row)
+        reused = len(reviews) - len(pending)
+        self.stored_results += reused
+        RESULT_STORE_LOOKUPS.inc(reused, outcome="hit")
+        RESULT_STORE_LOOKUPS.inc(len(pending), outcome="miss")
+        if pending:
+            fresh = self._process_chunk([reviews[row] for row in pending], stage_seconds)
+            self.result_store.put_many((result.to_dict() for result in fresh), faq_version, pipeline_version)
+            for row, result in zip(pending, fresh):
+                results[row] = result
+        return results
+
+    def _process_chunk(
+        self, reviews: List[Dict[str, str]], stage_seconds: Optional[Dict[str, float]] = None
+    ) -> List[ReviewResult]:
+        review_texts = [review.get("text", "") for review in reviews]
+        started = time.perf_counter()
+        slots = None
+        fresh_texts = review_texts
+        if self.dedup is not None:
+            slots, fresh_rows = self._dedup_slots(review_texts)
+            fresh_texts = [review_texts[row] for row in fresh_rows]
+        deduped = time.perf_counter()
+        categories = classify_reviews(fresh_texts)
+        classified = time.perf_counter()
+        faq_entries = self.retriever.retrieve_batch(fresh_texts, categories=categories)
+        retrieved = time.perf_counter()
+        if slots is not None:
+            # Split the chunk's processing time over its fresh reviews by length.
+            fresh_seconds = retrieved - deduped
+            weights = [len(text) + 1 for text in fresh_texts]
+            total_weight = sum(weights)
+            for row, category, faq_entry, weight in zip(fresh_rows, categories, faq_entries, weights):
+                slots[row][1] = fresh_seconds * weight / total_weight
+                slots[row][0] = (category, faq_entry)
+            categories = [slot[0][0] for slot in slots]
+            faq_entries = [slot[0][1] for slot in slots]
+            self.dedup.record(
+                fresh=len(fresh_rows),
+                fresh_seconds=fresh_seconds,
+                reused_seconds=sum(slot[1] for slot in slots) - fresh_seconds,
+                overhead_seconds=deduped - started,
+            )
+        responses = generate_responses(reviews, categories, faq_entries)
+        generated = time.perf_counter()
+        scores: List[Optional[HoneyHiveScore]] = [None] * len(reviews)
         if self.honeyhive:
-            honeyhive_score = self.honeyhive.score(review_text, response, faq_entry)
-        return ReviewResult(
-            review=review,
-            category=category,
-            faq_entry=faq_entry,
-            response=response,
-            honeyhive_score=honeyhive_score,
+            scores = self.honeyhive.score_many(review_texts, responses, faq_entries)
+        scored = time.perf_counter()
+
+        timings = {
+            "classify": classified - started,
+            "retrieve": retrieved - classified,
+            "generate": generated - retrieved,
+            "score": scored - generated,
+        }
+        for stage, seconds in timings.items():
+            self.stage_seconds[stage] += seconds
+            if stage_seconds is not None:
+                stage_seconds[stage] = stage_seconds.get(stage, 0.0) + seconds
+        REVIEWS_PROCESSED.inc(len(reviews), mode="batch")
+        return [
+            ReviewResult(
+                review=review,
+                category=category,
+                faq_entry=faq_entry,
+                response=response,
+                honeyhive_score=score,
+            )
+            for review, category, faq_entry, response, score in zip(
+                reviews, categories, faq_entries, responses, scores
+            )
+        ]
+
+
+# --- Command-line batch processing ---
+
+_worker_pipeline: Optional[AiriaPipeline] = None
+
+
+def _init_worker(enable_honeyhive: bool, dedup: bool = False, store_path: Optional[Path] = None) -> None:
+    """Build one pipeline per worker process, reused for every shard."""
+    global _worker_pipeline
+    _worker_pipeline = AiriaPipeline(
+        enable_honeyhive=enable_honeyhive,
+        dedup=dedup,
+        result_store=ResultStore(store_path) if store_path is not None else None,
+    )
+
+
+def _totals(pipeline: AiriaPipeline) -> Dict[str, float]:
+    totals: Dict[str, float] = {}
+    if pipeline.dedup is not None:
+        stats = pipeline.dedup.stats()
+        totals.update((key, stats[key]) for key in DEDUP_TOTALS)
+    if pipeline.result_store is not None:
+        totals["stored_results"] = pipeline.stored_results
+    return totals
+
+
+def _process_shard(shard: List[Dict[str, str]]) -> Tuple[List[str], Dict[str, float]]:
+    """Run a shard in a worker and return encoded JSON lines plus stage timings.
+
+    With dedup enabled the timings also carry the shard's ``DEDUP_TOTALS``,
+    and with a result store the number of results it supplied.
+    """
+    assert _worker_pipeline is not None, "worker pipeline not initialised"
+    before = dict(_worker_pipeline.stage_seconds, **_totals(_worker_pipeline))
+    results = _worker_pipeline.run_batch(shard, batch_size=len(shard))
+    after = dict(_worker_pipeline.stage_seconds, **_totals(_worker_pipeline))
+    timings = {key: after[key] - before[key] for key in after}
+    lines = [json.dumps(result.to_dict(), ensure_ascii=False) for result in results]
+    return lines, timings
+
+
+def process_file(
+    input_path: Path,
+    output_path: Path,
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    enable_honeyhive: bool = True,
+    dedup: bool = False,
+    store_path: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Process a review dump into a JSONL (or ``.parquet``) file of results, preserving input order.
+
+    With ``workers > 1`` shards of ``batch_size`` reviews are fanned out over a
+    process pool; each worker builds its pipeline once. At most two shards per
+    worker are in flight so memory stays bounded on large inputs. With
+    ``dedup`` each worker skips classification and retrieval for duplicates
+    of reviews it has already seen. With ``store_path`` results are kept in
+    that :class:`~result_store.ResultStore`, and reviews already answered
+    there under the same FAQ base and pipeline version are not reprocessed.
+    Parquet output (requires pyarrow) is collected in a
+    :class:`~result_columns.ResultColumns` and written when the run ends.
+    """
+    columns = None
+    if output_path.suffix == ".parquet":
+        # Imported here: only Parquet output needs the columnar container.
+        from result_columns import PYARROW_AVAILABLE, ResultColumns
+
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required for Parquet output (pip install pyarrow)")
+        columns = ResultColumns()
+    reviews = iter_reviews(input_path)
+    stage_seconds = {stage: 0.0 for stage in STAGES}
+    totals = dict.fromkeys(DEDUP_TOTALS + ("stored_results",), 0.0)
+    processed = 0
+    started = time.perf_counter()
+
+    out = output_path.open("w", encoding="utf-8") if columns is None else None
+    try:
+        def write(lines: List[str], timings: Dict[str, float]) -> None:
+            nonlocal processed
+            if columns is not None:
+                columns.extend(ReviewResult.from_dict(json.loads(line)) for line in lines)
+            else:
+                for line in lines:
+                    out.write(line)
+                    out.write("\n")
+            processed += len(lines)
+            for key, value in timings.items():
+                if key in stage_seconds:
+                    stage_seconds[key] += value
+                else:
+                    totals[key] += value
+
+        if workers <= 1:
+            _init_worker(enable_honeyhive, dedup, store_path)
+            for shard in _shards(reviews, batch_size):
+                write(*_process_shard(shard))
+        else:
+            # Imported here: process pools cost startup time that single-process runs never need.
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(enable_honeyhive, dedup, store_path),
+            ) as executor:
+                pending: deque = deque()
+                for shard in _shards(reviews, batch_size):
+                    pending.append(executor.submit(_process_shard, shard))
+                    if len(pending) >= workers * 2:
+                        write(*pending.popleft().result())
+                while pending:
+                    write(*pending.popleft().result())
+        if columns is not None:
+            columns.write_parquet(output_path)
+    finally:
+        if out is not None:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    stats: Dict[str, Any] = {
+        "reviews": processed,
+        "workers": workers,
+        "elapsed_seconds": elapsed,
+        "reviews_per_second": processed / elapsed if elapsed else 0.0,
+        "stage_seconds": stage_seconds,
+    }
+    if dedup:
+        dedup_totals = {key: totals[key] for key in DEDUP_TOTALS}
+        hits = dedup_totals["exact_hits"] + dedup_totals["near_hits"]
+        stats["dedup"] = dict(
+            dedup_totals,
+            dedup_ratio=hits / dedup_totals["lookups"] if dedup_totals["lookups"] else 0.0,
         )
+    if store_path is not None:
+        stats["stored_results"] = int(totals["stored_results"])
+    return stats
+
+
+def export_results(
+    store_path: Optional[Path],
+    output: Any,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    **filters: Optional[str],
+) -> int:
+    """Write stored results for reviews dated within ``[since, until]`` to ``output`` as JSONL."""
+    store = ResultStore(store_path)
+    count = 0
+    try:
+        for result in store.query(since=since, until=until, **filters):
+            output.write(json.dumps(result, ensure_ascii=False))
+            output.write("\n")
+            count += 1
+    finally:
+        store.close()
+    return count
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Entry point for ``python -m pipeline``."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m pipeline", description="Airia review pipeline")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    process = subcommands.add_parser("process", help="Process a review dump into JSONL results")
+    process.add_argument("--input", required=True, type=Path, help="JSON array or JSONL file of reviews, optionally gzip'd")
+    process.add_argument("--output", required=True, type=Path, help="Destination JSONL file, or .parquet (needs pyarrow)")
+    process.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    process.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Reviews per shard")
+    process.add_argument("--no-honeyhive", action="store_true", help="Skip HoneyHive scoring")
+    process.add_argument("--dedup", action="store_true", help="Reuse classification and retrieval for duplicate reviews")
+    process.add_argument("--store", type=Path, help="SQLite result store; reviews already answered there are skipped")
+    results = subcommands.add_parser("results", help="Export stored results for a date range as JSONL")
+    results.add_argument("--store", type=Path, help="SQLite result store (default: REVIEW_RESULTS_DB or data/results.sqlite3)")
+    results.add_argument("--since", help="Earliest review date, inclusive (YYYY-MM-DD)")
+    results.add_argument("--until", help="Latest review date, inclusive (YYYY-MM-DD)")
+    results.add_argument("--app-store", dest="store_name", help="Only reviews from this store")
+    results.add_argument("--output", type=Path, help="Destination JSONL file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.command == "results":
+        if args.output is None:
+            count = export_results(args.store, sys.stdout, args.since, args.until, store=args.store_name)
+        else:
+            with args.output.open("w", encoding="utf-8") as out:
+                count = export_results(args.store, out, args.since, args.until, store=args.store_name)
+        print(f"Exported {count} stored results", file=sys.stderr)
+        return 0
+
+    stats = process_file(
+        args.input,
+        args.output,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        enable_honeyhive=not args.no_honeyhive,
+        dedup=args.dedup,
+        store_path=args.store,
+    )
+    print(
+        f"Processed {stats['reviews']} reviews with {stats['workers']} worker(s) "
+        f"in {stats['elapsed_seconds']:.2f}s ({stats['reviews_per_second']:,.1f} reviews/sec)",
+        file=sys.stderr,
+    )
+    for stage, seconds in stats["stage_seconds"].items():
+        print(f"  {stage:<9} {seconds:8.3f}s (summed across workers)", file=sys.stderr)
+    if "dedup" in stats:
+        dedup = stats["dedup"]
+        print(
+            f"  dedup     {dedup['dedup_ratio']:.1%} duplicates ({dedup['exact_hits']:.0f} exact, "
+            f"{dedup['near_hits']:.0f} near), ~{dedup['seconds_saved']:.3f}s of classify+retrieve saved",
+            file=sys.stderr,
+        )
+    if "stored_results" in stats:
+        print(f"  stored    {stats['stored_results']} results reused from {args.store}", file=sys.stderr)
+    return 0
 
 
 __all__ = [
     "AiriaPipeline",
     "ReviewResult",
     "classify_review",
+    "classify_reviews",
     "generate_response",
+    "generate_responses",
+    "process_file",
+    "export_results",
 ]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Bounded LRU cache of retrieval results with a time-to-live."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+DEFAULT_MAX_SIZE = 10_000
+DEFAULT_TTL_SECONDS = 3600.0
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivially different reviews share a key."""
+    return " ".join(query.lower().split())
+
+
+class QueryCache:
+    """Map normalized query text (plus category) to a retrieved FAQ entry position.
+
+    Least recently used keys are evicted once ``max_size`` is reached and
+    entries older than ``ttl_seconds`` are treated as misses. ``invalidate``
+    drops everything, e.g. when the FAQ base changes. Safe to share between
+    threads.
+
+    ``generation`` tags the FAQ snapshot the cached positions belong to:
+    ``get`` and ``put`` calls made for another generation miss or are
+    ignored, so a lookup that started before a reload can neither read nor
+    store a position from the wrong snapshot.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_SIZE,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.generation = 0
+
+    def get(self, query: str, category: Optional[str] = None, generation: Optional[int] = None) -> Optional[int]:
+        """Return the cached entry position for ``query`` or ``None`` on a miss."""
+        key = (normalize_query(query), category)
+        with self._lock:
+            cached = self._entries.get(key) if generation in (None, self.generation) else None
+            if cached is None:
+                self.misses += 1
+                return None
+            position, expires_at = cached
+            if self.ttl_seconds is not None and self._clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return position
+
+    def put(self, query: str, category: Optional[str], position: int, generation: Optional[int] = None) -> None:
+        """Remember that ``query`` retrieved the FAQ entry at ``position``."""
+        key = (normalize_query(query), category)
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds is not None else 0.0
+        with self._lock:
+            if generation not in (None, self.generation):
+                return
+            self._entries[key] = (position, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, generation: Optional[int] = None) -> None:
+        """Forget every cached result, optionally moving to a new ``generation``."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+            if generation is not None:
+                self.generation = generation
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss/eviction counters and the current hit ratio."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+__all__ = ["QueryCache", "normalize_query", "DEFAULT_MAX_SIZE", "DEFAULT_TTL_SECONDS"]
@@ -0,0 +1,226 @@
+"""Response templates parsed once and rendered by (category, locale, store).
+
+Template text uses ``{field}`` placeholders, ``{#field}...{/field}``
+sections that render only when the field is truthy, ``{>name}`` partials
+spliced in at load time, and ``{{``/``}}`` for literal braces.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_TEMPLATES_PATH = Path(__file__).resolve().parent / "data" / "response_templates.json"
+WILDCARD = "*"
+MAX_RESOLVED_KEYS = 4096
+
+Render = Callable[[Dict[str, Any], Dict[str, str]], str]
+
+# Values a template can reference, as expressions over ``review`` and ``faq_entry``.
+# Compiled templates inline these, so only this fixed table is ever evaluated.
+FIELDS: Dict[str, str] = {
+    "author": "review.get('author') or 'there'",
+    "rating": "review.get('rating')",
+    "review_text": "review.get('text', '')",
+    "store": "review.get('store', '')",
+    "faq_title": "faq_entry.get('title', '')",
+    "faq_answer": "faq_entry.get('body', '')",
+}
+
+_TOKEN = re.compile(r"\{\{|\}\}|\{([#/>]?)([A-Za-z_][A-Za-z0-9_]*)\}")
+
+# A parsed segment: literal text, ("field", name) or ("section", name, children).
+Segment = Union[str, Tuple[Any, ...]]
+
+
+def _parse(text: str, partials: Dict[str, str], source: str, depth: int = 0) -> List[Segment]:
+    if depth > 8:
+        raise ValueError(f"{source}: partials nested too deeply")
+    root: List[Segment] = []
+    stack: List[Tuple[str, List[Segment]]] = [("", root)]
+    position = 0
+    for match in _TOKEN.finditer(text):
+        current = stack[-1][1]
+        if match.start() > position:
+            current.append(text[position:match.start()])
+        position = match.end()
+        token = match.group(0)
+        if token in ("{{", "}}"):
+            current.append(token[0])
+            continue
+        sigil, name = match.group(1), match.group(2)
+        if sigil == ">":
+            if name not in partials:
+                raise ValueError(f"{source}: unknown partial {name!r}")
+            current.extend(_parse(partials[name], partials, f"{source} > {name}", depth + 1))
+            continue
+        if name not in FIELDS:
+            raise ValueError(f"{source}: unknown field {name!r}; expected one of {', '.join(FIELDS)}")
+        if sigil == "#":
+            children: List[Segment] = []
+            current.append(("section", name, children))
+            stack.append((name, children))
+        elif sigil == "/":
+            if stack[-1][0] != name:
+                raise ValueError(f"{source}: unexpected {{/{name}}}")
+            stack.pop()
+        else:
+            current.append(("field", name))
+    if len(stack) > 1:
+        raise ValueError(f"{source}: section {stack[-1][0]!r} is never closed")
+    if position < len(text):
+        stack[-1][1].append(text[position:])
+    return root
+
+
+def _merge_literals(segments: Sequence[Segment]) -> List[Segment]:
+    merged: List[Segment] = []
+    for segment in segments:
+        if isinstance(segment, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += segment
+        elif isinstance(segment, tuple) and segment[0] == "section":
+            merged.append(("section", segment[1], _merge_literals(segment[2])))
+        elif segment:
+            merged.append(segment)
+    return merged
+
+
+def _compile(segments: Sequence[Segment], namespace: Dict[str, Any]) -> Render:
+    """Turn segments into one function whose body is a single f-string.
+
+    Literal text is bound as a constant in ``namespace`` rather than pasted
+    into source, so template content is never evaluated as code.
+    """
+    pieces = []
+    for segment in segments:
+        if isinstance(segment, str):
+            name = f"_text{len(namespace)}"
+            namespace[name] = segment
+            pieces.append(f"{{{name}}}")
+        elif segment[0] == "field":
+            pieces.append(f"{{({FIELDS[segment[1]]})}}")
+        else:
+            name = f"_section{len(namespace)}"
+            namespace[name] = _compile(segment[2], namespace)
+            pieces.append(f"{{({name}(review, faq_entry) if ({FIELDS[segment[1]]}) else '')}}")
+    source = f'def render(review, faq_entry):\n    return f"{"".join(pieces)}"\n'
+    local: Dict[str, Any] = {}
+    exec(compile(source, "<response template>", "exec"), namespace, local)
+    return local["render"]
+
+
+class CompiledTemplate:
+    """A template parsed into segments and compiled to a single-join render function.
+
+    Literal runs are merged at load time and every field is inlined, so a
+    render builds no intermediate dicts or strings: it evaluates the fields
+    and joins them with the literals in one step.
+    """
+
+    __slots__ = ("key", "segments", "render")
+
+    def __init__(self, segments: Sequence[Segment], key: Tuple[str, str, str] = ("", "", "")) -> None:
+        self.key = key
+        self.segments = _merge_literals(segments)
+        self.render: Render = _compile(self.segments, {"__builtins__": {}})
+
+
+class TemplateEngine:
+    """Pick and render the most specific template for a review.
+
+    Lookups try the review's locale before ``default_locale``; within a
+    locale, the exact category before ``*``, and the exact store before
+    ``*``. A ``("*", default_locale, "*")`` template is required so every
+    review resolves to something.
+    """
+
+    def __init__(
+        self,
+        templates: Dict[Tuple[str, str, str], CompiledTemplate],
+        default_locale: str = "en",
+        digest: str = "",
+    ) -> None:
+        if (WILDCARD, default_locale, WILDCARD) not in templates:
+            raise ValueError(f"A catch-all template for category '*', locale {default_locale!r}, store '*' is required")
+        self.templates = templates
+        self.default_locale = default_locale
+        # Identifies the template source so stored responses can be tied to it.
+        self.digest = digest
+        self._resolved: Dict[Tuple[str, Optional[str], Optional[str]], CompiledTemplate] = {}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], source: str = "templates") -> "TemplateEngine":
+        default_locale = data.get("default_locale", "en")
+        partials = data.get("partials", {})
+        templates: Dict[Tuple[str, str, str], CompiledTemplate] = {}
+        for number, spec in enumerate(data.get("templates", [])):
+            key = (
+                spec.get("category", WILDCARD),
+                spec.get("locale", default_locale),
+                spec.get("store", WILDCARD),
+            )
+            if key in templates:
+                raise ValueError(f"{source}: duplicate template for {key}")
+            if "text" not in spec:
+                raise ValueError(f"{source}: template #{number} has no 'text'")
+            templates[key] = CompiledTemplate(_parse(spec["text"], partials, f"{source} template {key}"), key)
+        digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        return cls(templates, default_locale, digest)
+
+    @classmethod
+    def from_file(cls, path: Optional[str] = None) -> "TemplateEngine":
+        """Load templates from ``path``, ``RESPONSE_TEMPLATES_PATH`` or the bundled file."""
+        template_path = Path(path or os.getenv("RESPONSE_TEMPLATES_PATH") or DEFAULT_TEMPLATES_PATH)
+        if not template_path.exists():
+            raise FileNotFoundError(f"Response templates not found at {template_path}")
+        with template_path.open("r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        return cls.from_dict(data, source=str(template_path))
+
+    def resolve(self, category: str, locale: Optional[str] = None, store: Optional[str] = None) -> CompiledTemplate:
+        """Return the most specific template for the key; results are memoised."""
+        cache_key = (category, locale, store)
+        template = self._resolved.get(cache_key)
+        if template is not None:
+            return template
+        templates = self.templates
+        for candidate_locale in (locale or self.default_locale, self.default_locale):
+            for candidate_category in (category, WILDCARD):
+                for candidate_store in (store or WILDCARD, WILDCARD):
+                    template = templates.get((candidate_category, candidate_locale, candidate_store))
+                    if template is not None:
+                        if len(self._resolved) < MAX_RESOLVED_KEYS:
+                            self._resolved[cache_key] = template
+                        return template
+        raise AssertionError("unreachable: the catch-all template always matches")
+
+    def render(self, review: Dict[str, Any], category: str, faq_entry: Dict[str, str]) -> str:
+        """Render the response for one review."""
+        locale, store = review.get("locale"), review.get("store")
+        template = self._resolved.get((category, locale, store)) or self.resolve(category, locale, store)
+        return template.render(review, faq_entry)
+
+    def render_batch(
+        self,
+        reviews: Sequence[Dict[str, Any]],
+        categories: Sequence[str],
+        faq_entries: Sequence[Dict[str, str]],
+    ) -> List[str]:
+        """Render responses for many reviews, resolving each distinct key once."""
+        render = self.render
+        return [render(review, category, faq_entry) for review, category, faq_entry in zip(reviews, categories, faq_entries)]
+
+    def render_results(self, results: Iterable[Any]) -> List[str]:
+        """Re-render responses for pipeline results (anything with ``review``, ``category``, ``faq_entry``)."""
+        results = list(results)
+        return self.render_batch(
+            [result.review for result in results],
+            [result.category for result in results],
+            [result.faq_entry for result in results],
+        )
+
+
+__all__ = ["TemplateEngine", "CompiledTemplate", "FIELDS", "DEFAULT_TEMPLATES_PATH"]
@@ -0,0 +1,207 @@
+"""Columnar container for large batches of pipeline results."""
+from __future__ import annotations
+
+import importlib.util
+import json
+import math
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, TextIO
+
+from honeyhive import HoneyHiveScore
+from pipeline import ReviewResult
+
+# pyarrow is only needed to write Parquet; it is imported on first use.
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+SCORE_FIELDS = ("correctness", "relevance", "tone", "clarity", "helpfulness")
+_NO_NOTES = 0xFFFFFFFF
+
+
+class StringTable:
+    """Strings packed end to end in one UTF-8 buffer, addressed by row."""
+
+    __slots__ = ("_data", "_offsets")
+
+    def __init__(self) -> None:
+        self._data = bytearray()
+        self._offsets = array("Q", [0])
+
+    def append(self, text: str) -> None:
+        self._data += text.encode("utf-8")
+        self._offsets.append(len(self._data))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, row: int) -> str:
+        return self._data[self._offsets[row]:self._offsets[row + 1]].decode("utf-8")
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._data) + self._offsets.itemsize * len(self._offsets)
+
+
+class _Interner:
+    """Distinct values and their codes; equal values share one code and one object."""
+
+    __slots__ = ("values", "_codes", "_by_identity")
+
+    def __init__(self) -> None:
+        self.values: List[Any] = []
+        self._codes: Dict[Any, int] = {}
+        self._by_identity: Dict[int, int] = {}
+
+    def code(self, value: Any, key: Callable[[Any], Any] = lambda value: value) -> int:
+        # Results mostly share the retriever's own dicts, so identity hits are the common case.
+        code = self._by_identity.get(id(value))
+        if code is None:
+            key = key(value)
+            code = self._codes.get(key)
+            if code is None:
+                code = self._codes[key] = len(self.values)
+                self.values.append(value)
+            if self.values[code] is value:
+                self._by_identity[id(value)] = code
+        return code
+
+
+def _entry_key(entry: Dict[str, str]) -> str:
+    return json.dumps(entry, sort_keys=True)
+
+
+class ResultColumns:
+    """Pipeline results stored column by column instead of one object per result.
+
+    Categories, FAQ entries and score notes are stored once and referenced
+    by integer codes; scores are float64 arrays (NaN where a result was not
+    scored); responses and reviews (as JSON) are packed into string tables.
+    Rows read back as :class:`~pipeline.ReviewResult` equal to the results
+    stored, sharing one category string, FAQ entry dict and notes string
+    per distinct value.
+    """
+
+    def __init__(self, results: Iterable[ReviewResult] = ()) -> None:
+        self._categories = _Interner()
+        self._faq_entries = _Interner()
+        self._notes = _Interner()
+        self.category_codes = array("H")
+        self.faq_codes = array("I")
+        self.note_codes = array("I")
+        self.scores = {name: array("d") for name in SCORE_FIELDS}
+        self.responses = StringTable()
+        self.reviews = StringTable()
+        self.extend(results)
+
+    @classmethod
+    def from_results(cls, results: Iterable[ReviewResult]) -> "ResultColumns":
+        return cls(results)
+
+    def to_results(self) -> List[ReviewResult]:
+        """Every row as a :class:`~pipeline.ReviewResult`, in order."""
+        return list(self)
+
+    def append(self, result: ReviewResult) -> None:
+        self.category_codes.append(self._categories.code(result.category))
+        self.faq_codes.append(self._faq_entries.code(result.faq_entry, _entry_key))
+        score = result.honeyhive_score
+        if score is None:
+            for column in self.scores.values():
+                column.append(math.nan)
+            self.note_codes.append(_NO_NOTES)
+        else:
+            for name, column in self.scores.items():
+                column.append(getattr(score, name))
+            self.note_codes.append(self._notes.code(score.notes))
+        self.responses.append(result.response)
+        self.reviews.append(json.dumps(result.review, ensure_ascii=False))
+
+    def extend(self, results: Iterable[ReviewResult]) -> None:
+        for result in results:
+            self.append(result)
+
+    def __len__(self) -> int:
+        return len(self.category_codes)
+
+    def __getitem__(self, row: int) -> ReviewResult:
+        if row < 0:
+            row += len(self)
+        note_code = self.note_codes[row]
+        score = None
+        if note_code != _NO_NOTES:
+            score = HoneyHiveScore(
+                **{name: column[row] for name, column in self.scores.items()},
+                notes=self._notes.values[note_code],
+            )
+        return ReviewResult(
+            review=json.loads(self.reviews[row]),
+            category=self._categories.values[self.category_codes[row]],
+            faq_entry=self._faq_entries.values[self.faq_codes[row]],
+            response=self.responses[row],
+            honeyhive_score=score,
+        )
+
+    def __iter__(self) -> Iterator[ReviewResult]:
+        for row in range(len(self)):
+            yield self[row]
+
+    @property
+    def categories(self) -> List[str]:
+        return list(self._categories.values)
+
+    @property
+    def faq_entries(self) -> List[Dict[str, str]]:
+        return list(self._faq_entries.values)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate bytes held, counting each distinct FAQ entry and note once."""
+        arrays = [self.category_codes, self.faq_codes, self.note_codes, *self.scores.values()]
+        # Interned values are counted by their keys (an FAQ entry's JSON stands in for the dict).
+        shared = sum(
+            sys.getsizeof(key)
+            for interner in (self._categories, self._faq_entries, self._notes)
+            for key in interner._codes
+        )
+        return sum(column.itemsize * len(column) for column in arrays) + self.responses.nbytes + self.reviews.nbytes + shared
+
+    def write_jsonl(self, output: TextIO) -> int:
+        """Write one ``ReviewResult.to_dict`` JSON line per row; returns the row count."""
+        for result in self:
+            output.write(json.dumps(result.to_dict(), ensure_ascii=False))
+            output.write("\n")
+        return len(self)
+
+    def to_arrow(self) -> Any:
+        """The rows as a ``pyarrow.Table``, with categories and FAQ entries dictionary-encoded."""
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required for Arrow and Parquet output (pip install pyarrow)")
+        import pyarrow as pa
+
+        def dictionary(codes: array, values: List[str]) -> Any:
+            indices = pa.array([None if code == _NO_NOTES else code for code in codes], type=pa.uint32())
+            return pa.DictionaryArray.from_arrays(indices, pa.array(values, type=pa.string()))
+
+        columns = {
+            "review": pa.array([self.reviews[row] for row in range(len(self))], type=pa.string()),
+            "category": dictionary(self.category_codes, self._categories.values),
+            "faq_entry": dictionary(
+                self.faq_codes, [json.dumps(entry, ensure_ascii=False) for entry in self._faq_entries.values]
+            ),
+            "response": pa.array([self.responses[row] for row in range(len(self))], type=pa.string()),
+        }
+        for name, column in self.scores.items():
+            columns[name] = pa.array(column, type=pa.float64(), from_pandas=True)
+        columns["notes"] = dictionary(self.note_codes, self._notes.values)
+        return pa.table(columns)
+
+    def write_parquet(self, path: Path) -> int:
+        """Write the rows to a Parquet file (requires pyarrow); returns the row count."""
+        table = self.to_arrow()
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, str(path))
+        return len(self)
+
+
+__all__ = ["ResultColumns", "StringTable", "PYARROW_AVAILABLE"]
@@ -0,0 +1,151 @@
+"""Persistent SQLite store of pipeline results so reruns skip reviews already answered."""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_RESULTS_PATH = Path(__file__).resolve().parent / "data" / "results.sqlite3"
+# Stay well below SQLite's bound-parameter limit in ``IN (...)`` lookups.
+LOOKUP_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    store TEXT NOT NULL,
+    review_id TEXT NOT NULL,
+    faq_version TEXT NOT NULL,
+    pipeline_version TEXT NOT NULL,
+    review_date TEXT,
+    stored_at REAL NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (store, review_id, faq_version, pipeline_version)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_by_date ON results (review_date);
+"""
+
+ReviewKey = Tuple[str, str]
+
+
+def review_key(review: Dict[str, Any]) -> Optional[ReviewKey]:
+    """``(store, id)`` for a review, or ``None`` when it has no id to key on."""
+    review_id = review.get("id")
+    if review_id in (None, ""):
+        return None
+    return (str(review.get("store") or ""), str(review_id))
+
+
+class ResultStore:
+    """Pipeline results keyed by (store, review id, FAQ version, pipeline version).
+
+    Backed by one SQLite database in WAL mode, so a writer never blocks
+    readers and several worker processes can share the file. Results are
+    stored as the JSON of ``ReviewResult.to_dict()``; writes go in bulk, one
+    transaction per call. Safe to share between threads.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = Path(path or os.getenv("REVIEW_RESULTS_DB") or DEFAULT_RESULTS_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path), timeout=30.0, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(
+        self,
+        keys: Sequence[ReviewKey],
+        faq_version: str,
+        pipeline_version: str,
+    ) -> Dict[ReviewKey, Dict[str, Any]]:
+        """Return the stored result dicts for whichever ``keys`` are present."""
+        by_store: Dict[str, List[str]] = {}
+        for store, review_id in dict.fromkeys(keys):
+            by_store.setdefault(store, []).append(review_id)
+        found: Dict[ReviewKey, Dict[str, Any]] = {}
+        with self._lock:
+            for store, review_ids in by_store.items():
+                for start in range(0, len(review_ids), LOOKUP_CHUNK):
+                    chunk = review_ids[start:start + LOOKUP_CHUNK]
+                    rows = self._connection.execute(
+                        "SELECT review_id, result FROM results WHERE store = ? AND faq_version = ?"
+                        f" AND pipeline_version = ? AND review_id IN ({', '.join('?' * len(chunk))})",
+                        (store, faq_version, pipeline_version, *chunk),
+                    )
+                    for review_id, result in rows:
+                        found[(store, review_id)] = json.loads(result)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, results: Iterable[Dict[str, Any]], faq_version: str, pipeline_version: str) -> int:
+        """Store result dicts (keyed by their ``review``) in one transaction; returns how many."""
+        stored_at = time.time()
+        rows = []
+        for result in results:
+            key = review_key(result["review"])
+            if key is None:
+                continue
+            rows.append((
+                key[0], key[1], faq_version, pipeline_version, result["review"].get("date"),
+                stored_at, json.dumps(result, ensure_ascii=False),
+            ))
+        if rows:
+            with self._lock, self._connection:
+                self._connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def query(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        store: Optional[str] = None,
+        faq_version: Optional[str] = None,
+        pipeline_version: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield stored results whose review date falls in ``[since, until]``, oldest first.
+
+        Dates compare as strings, so ISO ``YYYY-MM-DD`` bounds work as
+        expected; either bound may be omitted.
+        """
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column, operator, value in (
+            ("review_date", ">=", since),
+            ("review_date", "<=", until),
+            ("store", "=", store),
+            ("faq_version", "=", faq_version),
+            ("pipeline_version", "=", pipeline_version),
+        ):
+            if value is not None:
+                clauses.append(f"{column} {operator} ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        # A connection of its own lets the caller consume results lazily
+        # while other threads keep writing (WAL readers see a snapshot).
+        connection = sqlite3.connect(str(self.path), timeout=30.0)
+        try:
+            rows = connection.execute(
+                f"SELECT result FROM results{where} ORDER BY review_date, store, review_id", params
+            )
+            for (result,) in rows:
+                yield json.loads(result)
+        finally:
+            connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+__all__ = ["ResultStore", "review_key", "DEFAULT_RESULTS_PATH"]
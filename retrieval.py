@@ -1,116 +1,949 @@
-"""Retrieval layer backed by LlamaIndex with a keyword fallback."""
+"""Retrieval layer backed by LlamaIndex or NumPy with a keyword fallback."""
 from __future__ import annotations
 
+import hashlib
+import importlib.util
+import json
 import logging
 import os
-from typing import Dict, List, Optional
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from faq_loader import load_faq_entries
+from category_index import DEFAULT_RERANK_WEIGHT, CategoryPartitions
+from embedding_cache import EmbeddingCache
+from faq_loader import DEFAULT_FAQ_PATH, load_faq_entries
 from honeyhive import trace
+from keyword_index import KeywordIndex
+from metrics import counter, stage_histogram
+from query_cache import DEFAULT_MAX_SIZE, DEFAULT_TTL_SECONDS, QueryCache
+from vector_index import NUMPY_AVAILABLE, HashingEmbedder, NumpyVectorIndex, embed_texts
 
 logger = logging.getLogger(__name__)
 
-try:
-    from llama_index.core import Document, VectorStoreIndex
-    from llama_index.embeddings.openai import OpenAIEmbedding
-    LLAMA_AVAILABLE = True
-except ImportError as exc:
-    Document = None  # type: ignore
-    VectorStoreIndex = None  # type: ignore
-    OpenAIEmbedding = None  # type: ignore
-    MockEmbedding = None  # type: ignore
-    LLAMA_AVAILABLE = False
-    logger.warning("LlamaIndex not available: %s", exc)
+# LlamaIndex and its OpenAI embeddings take seconds to import, so they are
+# imported by _load_llama_index only when the llamaindex backend is built.
+LLAMA_AVAILABLE = importlib.util.find_spec("llama_index") is not None
+VectorStoreIndex: Any = None
+MetadataMode: Any = None
+QueryBundle: Any = None
+TextNode: Any = None
+OpenAIEmbedding: Any = None
+_llama_lock = threading.Lock()
+_llama_loaded = False
+
+
+def _load_llama_index() -> bool:
+    """Import LlamaIndex on first use; returns whether it is usable."""
+    global LLAMA_AVAILABLE, VectorStoreIndex, MetadataMode, QueryBundle, TextNode, OpenAIEmbedding, _llama_loaded
+    with _llama_lock:
+        if _llama_loaded:
+            return LLAMA_AVAILABLE
+        _llama_loaded = True
+        try:
+            from llama_index.core import VectorStoreIndex
+            from llama_index.core.schema import MetadataMode, QueryBundle, TextNode
+        except ImportError as exc:
+            LLAMA_AVAILABLE = False
+            logger.warning("LlamaIndex not available: %s", exc)
+            return False
+        try:
+            from llama_index.embeddings.openai import OpenAIEmbedding
+        except ImportError:
+            OpenAIEmbedding = None
+        LLAMA_AVAILABLE = True
+        return True
+
+
+BACKENDS = ("llamaindex", "numpy", "keyword")
+DEFAULT_WATCH_INTERVAL = 2.0
+# retrieve_top_k(rerank=True) reranks this many times k first-stage candidates.
+RERANK_SHORTLIST = 4
+
+RETRIEVALS = counter("faq_retrievals", "FAQ lookups by the path that answered them (cache or backend).")
+FALLBACKS = counter("retriever_fallbacks", "Keyword fallbacks by configured backend and reason.")
+EMBEDDING_CALLS = counter("embedding_calls", "Calls made to the embedding model.")
+FAQ_RELOADS = counter("faq_reloads", "FAQ hot reloads by kind (incremental, full, failed).")
+
+
+def openai_embed_model() -> Optional[Any]:
+    """The OpenAI embedding model LlamaIndex uses by default, if it can be built."""
+    if not (os.getenv("OPENAI_API_KEY") and _load_llama_index() and OpenAIEmbedding):
+        return None
+    from embedding_client import OPENAI_EMBEDDING_MODEL
+
+    return OpenAIEmbedding(model=OPENAI_EMBEDDING_MODEL)
+
+
+def faq_text(entry: Dict[str, str]) -> str:
+    """Text representation of an FAQ entry used for embedding."""
+    return (
+        f"Category: {entry['category']}\n"
+        f"Title: {entry['title']}\n"
+        f"Answer: {entry['body']}"
+    )
+
+
+def _cache_model_name(embed_model: Any) -> str:
+    return f"{type(embed_model).__name__}:{getattr(embed_model, 'model_name', '')}"
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class FAQSnapshot:
+    """One consistent version of the FAQ base and every index built from it.
+
+    A lookup reads ``FAQRetriever.snapshot`` once and uses nothing else, so a
+    reload swapping in a new snapshot never mixes versions mid-request.
+    ``entries`` holds ``None`` where an incremental reload deleted an entry;
+    NumPy rows map to entry positions through ``row_positions``.
+    ``llama_embeddings`` holds the document vector behind each LlamaIndex
+    node, by entry position.
+    """
+
+    version: int
+    entries: List[Optional[Dict[str, str]]]
+    positions: Dict[Any, int]
+    keyword_index: KeywordIndex
+    embed_model: Any = None
+    vector_index: Optional[NumpyVectorIndex] = None
+    row_positions: Optional[List[int]] = None
+    llama_retriever: Any = None
+    llama_embeddings: Optional[List[Optional[List[float]]]] = None
+    deleted: int = 0
+
+    def live_entries(self) -> List[Dict[str, str]]:
+        if not self.deleted:
+            return self.entries  # type: ignore[return-value]
+        return [entry for entry in self.entries if entry is not None]
+
+
+@dataclass(frozen=True)
+class FAQCandidate:
+    """One scored entry from :meth:`FAQRetriever.retrieve_top_k`."""
+
+    entry: Dict[str, str]
+    score: float
+    position: int
 
 
 class FAQRetriever:
-    """Thin wrapper around LlamaIndex to serve FAQ snippets."""
+    """Thin wrapper around LlamaIndex to serve FAQ snippets.
+
+    ``backend`` selects ``"llamaindex"`` (vector store index), ``"numpy"``
+    (in-process float32 matrix with an offline hashing embedder unless
+    ``embed_model`` is given) or ``"keyword"``. It defaults to the
+    ``FAQ_RETRIEVER_BACKEND`` environment variable, then to LlamaIndex when
+    ``use_llamaindex`` is set. Every backend falls back to keyword search.
+
+    The FAQ base can change while serving: :meth:`reload` applies a new list
+    of entries and :meth:`start_watching` polls ``faq_path`` for edits.
+    Several retrievers can share one ``embed_model`` and ``embedding_cache``.
+
+    With the OpenAI model, query embeddings go through ``query_embedder``
+    (by default the process-wide :class:`~embedding_client.CoalescingEmbedder`),
+    so concurrent lookups share batched requests.
+    """
 
     def __init__(
         self,
         faq_entries: Optional[List[Dict[str, str]]] = None,
         use_llamaindex: bool = True,
+        embed_model: Optional[Any] = None,
+        embedding_cache_dir: Optional[str] = None,
+        use_embedding_cache: bool = True,
+        query_cache_size: int = DEFAULT_MAX_SIZE,
+        query_cache_ttl: Optional[float] = DEFAULT_TTL_SECONDS,
+        backend: Optional[str] = None,
+        faq_path: Optional[str] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        query_embedder: Optional[Any] = None,
     ) -> None:
-        self.faq_entries = faq_entries or load_faq_entries()
-        self._retriever = None
-        self.use_llamaindex = use_llamaindex and LLAMA_AVAILABLE
+        if faq_entries:
+            self.faq_path = Path(faq_path) if faq_path else None
+        else:
+            self.faq_path = Path(faq_path) if faq_path else DEFAULT_FAQ_PATH
+            faq_entries = load_faq_entries(str(self.faq_path))
+        self._source_signature: Optional[Tuple[int, int]] = None
+        self._source_digest: Optional[str] = None
+        if self.faq_path is not None and self.faq_path.exists():
+            stat = self.faq_path.stat()
+            self._source_signature = (stat.st_mtime_ns, stat.st_size)
+            self._source_digest = _file_digest(self.faq_path)
+
+        self.query_cache = (
+            QueryCache(max_size=query_cache_size, ttl_seconds=query_cache_ttl)
+            if query_cache_size > 0
+            else None
+        )
+        # May be shared by retrievers with the same embedding model (see tenants.py).
+        self.embedding_cache: Optional[EmbeddingCache] = embedding_cache
+        self.query_embedder = query_embedder
+        self._use_embedding_cache = use_embedding_cache
+        self._embedding_cache_dir = embedding_cache_dir
+        self._reload_lock = threading.Lock()
+        self._content_version: Tuple[int, str] = (-1, "")
+        self._partitions: Tuple[int, Optional[CategoryPartitions]] = (-1, None)
+        self._stop_watching: Optional[threading.Event] = None
+
+        backend = backend or os.getenv("FAQ_RETRIEVER_BACKEND") or ("llamaindex" if use_llamaindex else "keyword")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown retriever backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+        self.backend = backend
+        self.requested_backend = backend
+
+        indexes: Dict[str, Any] = {}
+        if backend == "llamaindex":
+            indexes = self._init_llamaindex(faq_entries, embed_model)
+        elif backend == "numpy":
+            indexes = self._init_numpy(faq_entries, embed_model)
+        if self.backend == "keyword":
+            logger.info("Using keyword fallback retriever.")
+            if backend != "keyword":
+                FALLBACKS.inc(backend=backend, reason="init")
+        self.snapshot = self._new_snapshot(faq_entries, 0, **indexes)
+
+    @property
+    def use_llamaindex(self) -> bool:
+        return self.backend == "llamaindex"
+
+    @property
+    def faq_entries(self) -> List[Dict[str, str]]:
+        return self.snapshot.live_entries()
+
+    @property
+    def keyword_index(self) -> KeywordIndex:
+        return self.snapshot.keyword_index
+
+    def content_version(self) -> str:
+        """Digest of the served FAQ entries, stable across restarts (unlike ``snapshot.version``).
+
+        Persistent caches key on this, so results computed against one FAQ
+        base are never served once it changes.
+        """
+        snapshot = self.snapshot
+        version, digest = self._content_version
+        if version != snapshot.version:
+            payload = json.dumps(snapshot.live_entries(), sort_keys=True, ensure_ascii=False)
+            digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+            self._content_version = (snapshot.version, digest)
+        return digest
+
+    @staticmethod
+    def _new_snapshot(faq_entries: List[Dict[str, str]], version: int, **indexes: Any) -> FAQSnapshot:
+        return FAQSnapshot(
+            version=version,
+            entries=faq_entries,
+            positions={entry.get("id"): pos for pos, entry in enumerate(faq_entries)},
+            keyword_index=KeywordIndex(faq_entries),
+            **indexes,
+        )
+
+    def _embed_documents(
+        self,
+        texts: List[str],
+        embed_batch: Any,
+        embed_model: Any,
+        save: bool = True,
+    ) -> List[List[float]]:
+        def counted_batch(batch: List[str]) -> List[List[float]]:
+            EMBEDDING_CALLS.inc(purpose="documents")
+            return embed_batch(batch)
+
+        if not self._use_embedding_cache:
+            return counted_batch(texts)
+        model_name = _cache_model_name(embed_model)
+        if self.embedding_cache is None or self.embedding_cache.model_name != model_name:
+            self.embedding_cache = EmbeddingCache(model_name, self._embedding_cache_dir)
+        embeddings = self.embedding_cache.embed(texts, counted_batch)
+        if save:
+            # A full build embeds the whole FAQ base, so entries removed since drop out of the file.
+            self.embedding_cache.prune(texts, owner=self)
+            self.embedding_cache.save()
+        return embeddings
+
+    @staticmethod
+    def _llama_nodes(faq_entries: Sequence[Dict[str, str]]) -> Tuple[List[Any], List[str]]:
+        """Nodes for ``faq_entries`` and the text LlamaIndex embeds for each."""
+        nodes = [TextNode(text=faq_text(entry), metadata=entry) for entry in faq_entries]
+        return nodes, [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+
+    def _build_llamaindex(self, faq_entries: List[Dict[str, str]], embed_model: Any) -> Dict[str, Any]:
+        nodes, texts = self._llama_nodes(faq_entries)
+        embeddings = self._embed_documents(texts, embed_model.get_text_embedding_batch, embed_model)
+        return {
+            "embed_model": embed_model,
+            "llama_retriever": self._llama_retriever(nodes, embeddings, embed_model),
+            "llama_embeddings": embeddings,
+        }
+
+    @staticmethod
+    def _llama_retriever(nodes: List[Any], embeddings: Sequence[List[float]], embed_model: Any) -> Any:
+        # Nodes carrying an embedding are not re-embedded by the index,
+        # so an unchanged FAQ base never touches the embedding model.
+        for node, embedding in zip(nodes, embeddings):
+            node.embedding = embedding
+        index = VectorStoreIndex(nodes=nodes, embed_model=embed_model)
+        return index.as_retriever(similarity_top_k=1)
+
+    def _build_numpy(self, faq_entries: List[Dict[str, str]], embed_model: Optional[Any]) -> Dict[str, Any]:
+        texts = [faq_text(entry) for entry in faq_entries]
+        if embed_model is None or isinstance(embed_model, HashingEmbedder):
+            # Hashing is cheap and its IDF depends on the corpus, so it is refit and not cached.
+            embed_model = HashingEmbedder().fit(texts)
+            embeddings = embed_model.embed(texts)
+        else:
+            embeddings = self._embed_documents(texts, lambda batch: embed_texts(embed_model, batch).tolist(), embed_model)
+        return {
+            "embed_model": embed_model,
+            "vector_index": NumpyVectorIndex(embeddings),
+            "row_positions": list(range(len(texts))),
+        }
+
+    def _init_llamaindex(self, faq_entries: List[Dict[str, str]], embed_model: Optional[Any]) -> Dict[str, Any]:
+        if not _load_llama_index():
+            self.backend = "keyword"
+            return {}
+        try:
+            # Use the injected model, else OpenAI embeddings if API key is set.
+            # A mock embedding returns identical vectors for every text, so it
+            # is never chosen implicitly; use backend="numpy" to search offline.
+            if embed_model is not None:
+                logger.info("Using %s for FAQ retrieval", type(embed_model).__name__)
+            else:
+                embed_model = openai_embed_model()
+                if embed_model is None:
+                    raise RuntimeError("No embedding model available (set OPENAI_API_KEY or pass embed_model)")
+                logger.info("Using OpenAIEmbedding for FAQ retrieval")
+
+            indexes = self._build_llamaindex(faq_entries, embed_model)
+            # Imported here like LlamaIndex itself: only this backend sends query embeddings over HTTP.
+            from embedding_client import OPENAI_EMBEDDING_MODEL, shared_query_embedder
+
+            if (
+                self.query_embedder is None
+                and OpenAIEmbedding is not None
+                and isinstance(embed_model, OpenAIEmbedding)
+                and getattr(embed_model, "model_name", None) == OPENAI_EMBEDDING_MODEL
+            ):
+                self.query_embedder = shared_query_embedder()
+            logger.info(
+                "Initialized LlamaIndex retriever with %s FAQ entries",
+                len(faq_entries),
+            )
+            return indexes
+        except Exception as exc:
+            logger.warning(
+                "Failed to initialize LlamaIndex (%s). Falling back to keyword search.",
+                exc,
+            )
+            self.backend = "keyword"
+            return {}
+
+    def _init_numpy(self, faq_entries: List[Dict[str, str]], embed_model: Optional[Any]) -> Dict[str, Any]:
+        if not NUMPY_AVAILABLE:
+            logger.warning("NumPy backend requested but numpy is not installed. Falling back to keyword search.")
+            self.backend = "keyword"
+            return {}
+        try:
+            indexes = self._build_numpy(faq_entries, embed_model)
+            logger.info("Initialized NumPy retriever with %s FAQ entries", len(faq_entries))
+            return indexes
+        except Exception as exc:
+            logger.warning(
+                "Failed to initialize NumPy retriever (%s). Falling back to keyword search.",
+                exc,
+            )
+            self.backend = "keyword"
+            return {}
+
+    # --- Hot reload -----------------------------------------------------------
+
+    def reload(self, faq_entries: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Replace the FAQ base with ``faq_entries``, applying only what changed.
+
+        Entries are diffed against the current snapshot by ``id`` and the
+        difference goes through :meth:`update`. Missing or duplicate ids
+        force a full rebuild instead. Returns counts of added, updated and
+        removed entries.
+
+        Only changed entries are embedded on every backend, but LlamaIndex
+        still gets a new vector store over all live entries on each reload
+        (from vectors already held, without calling the model); see
+        :meth:`update`.
+        """
+        if not faq_entries:
+            raise ValueError("Refusing to reload an empty FAQ base")
+        with self._reload_lock:
+            current = self.snapshot
+            ids = [entry.get("id") for entry in faq_entries]
+            diffable = (
+                None not in ids
+                and len(set(ids)) == len(ids)
+                and None not in current.positions
+                and len(current.positions) == len(current.entries) - current.deleted
+            )
+            if not diffable:
+                return self._rebuild(faq_entries, reason="ids")
+            by_id = dict(zip(ids, faq_entries))
+            upserts = [
+                entry for entry_id, entry in by_id.items()
+                if entry_id not in current.positions or entry != current.entries[current.positions[entry_id]]
+            ]
+            deletes = [entry_id for entry_id in current.positions if entry_id not in by_id]
+            return self._update(upserts, deletes)
+
+    def update(
+        self,
+        upserts: Sequence[Dict[str, str]] = (),
+        deletes: Sequence[Any] = (),
+    ) -> Dict[str, Any]:
+        """Add or replace ``upserts`` and drop the entries whose ids are in ``deletes``.
+
+        Updated entries keep their position, deleted ones leave a hole and new
+        ones are appended, so unchanged entries keep their tie-breaking order.
+        Only the changed entries are re-tokenised and re-embedded; the new
+        snapshot shares everything else with the old one. The LlamaIndex
+        backend is the exception: its vector store is mutable and in use by
+        lookups on the current snapshot, so it is not edited in place but
+        rebuilt over every live entry, an O(n) copy of vectors the snapshot
+        already holds. Once holes outnumber live entries everything is rebuilt.
+
+        Lookups already running keep using the snapshot they started with.
+        """
+        with self._reload_lock:
+            return self._update(upserts, deletes)
+
+    def _update(self, upserts: Sequence[Dict[str, str]], deletes: Sequence[Any]) -> Dict[str, Any]:
+        started = time.perf_counter_ns()
+        current = self.snapshot
+        entries = list(current.entries)
+        positions = dict(current.positions)
+        removed: Dict[int, Dict[str, str]] = {}
+        added: Dict[int, Dict[str, str]] = {}
+        for entry_id in deletes:
+            position = positions.pop(entry_id, None)
+            if position is not None:
+                removed[position] = entries[position]  # type: ignore[assignment]
+                entries[position] = None
+        updated = 0
+        for entry in upserts:
+            entry_id = entry.get("id")
+            if entry_id is None:
+                raise ValueError("FAQ entries need an 'id' to be updated incrementally")
+            position = positions.get(entry_id)
+            if position is None:
+                position = positions[entry_id] = len(entries)
+                entries.append(entry)
+            else:
+                removed[position] = entries[position]  # type: ignore[assignment]
+                entries[position] = entry
+                updated += 1
+            added[position] = entry
+        deleted = current.deleted + len(removed) - updated
+        stats = {
+            "version": current.version + 1,
+            "added": len(added) - updated,
+            "updated": updated,
+            "removed": len(removed) - updated,
+            "full_rebuild": False,
+        }
+        if deleted * 2 > len(entries):
+            live = [entry for entry in entries if entry is not None]
+            return dict(self._rebuild(live, reason="compaction"), added=stats["added"], updated=updated, removed=stats["removed"])
+
+        indexes: Dict[str, Any] = {"embed_model": current.embed_model}
+        try:
+            if current.vector_index is not None:
+                indexes.update(self._update_numpy(current, removed, added))
+            elif current.llama_retriever is not None:
+                indexes.update(self._update_llamaindex(current, entries, added))
+            keyword_index = current.keyword_index.with_changes(entries, removed, added)
+        except Exception:
+            FAQ_RELOADS.inc(kind="failed")
+            raise
+        self._swap(FAQSnapshot(
+            version=current.version + 1,
+            entries=entries,
+            positions=positions,
+            keyword_index=keyword_index,
+            deleted=deleted,
+            **indexes,
+        ))
+        self._record_reload("incremental", started, stats)
+        return stats
+
+    def _rebuild(self, faq_entries: List[Dict[str, str]], reason: str) -> Dict[str, Any]:
+        started = time.perf_counter_ns()
+        logger.info("Rebuilding FAQ indexes from scratch (%s)", reason)
+        current = self.snapshot
+        try:
+            indexes: Dict[str, Any] = {}
+            if current.vector_index is not None:
+                indexes = self._build_numpy(faq_entries, current.embed_model)
+            elif current.llama_retriever is not None:
+                indexes = self._build_llamaindex(faq_entries, current.embed_model)
+            snapshot = self._new_snapshot(faq_entries, current.version + 1, **indexes)
+        except Exception:
+            FAQ_RELOADS.inc(kind="failed")
+            raise
+        self._swap(snapshot)
+        stats = {
+            "version": snapshot.version,
+            "added": len(faq_entries),
+            "updated": 0,
+            "removed": len(current.entries) - current.deleted,
+            "full_rebuild": True,
+        }
+        self._record_reload("full", started, stats)
+        return stats
+
+    def _swap(self, snapshot: FAQSnapshot) -> None:
+        self.snapshot = snapshot
+        if self.query_cache is not None:
+            self.query_cache.invalidate(generation=snapshot.version)
+
+    def _record_reload(self, kind: str, started_ns: int, stats: Dict[str, Any]) -> None:
+        FAQ_RELOADS.inc(kind=kind)
+        stage_histogram(f"faq_reload.{kind}").observe_ns(time.perf_counter_ns() - started_ns)
+        logger.info(
+            "FAQ base now at version %s (%s added, %s updated, %s removed, %s)",
+            stats["version"], stats["added"], stats["updated"], stats["removed"], kind,
+        )
+
+    def _update_numpy(
+        self,
+        current: FAQSnapshot,
+        removed: Dict[int, Dict[str, str]],
+        added: Dict[int, Dict[str, str]],
+    ) -> Dict[str, Any]:
+        embed_model = current.embed_model
+        added_positions = sorted(added)
+        texts = [faq_text(added[position]) for position in added_positions]
+        if not texts:
+            embeddings: Any = []
+        elif isinstance(embed_model, HashingEmbedder):
+            # IDF weights stay those of the last full build until the next one.
+            EMBEDDING_CALLS.inc(purpose="documents")
+            embeddings = embed_model.embed(texts)
+        else:
+            # Kept in memory; the on-disk cache is rewritten by the next full build.
+            embeddings = self._embed_documents(
+                texts, lambda batch: embed_texts(embed_model, batch).tolist(), embed_model, save=False
+            )
+        row_positions = list(current.row_positions or ())
+        removed_rows = [row for row, position in enumerate(row_positions) if position in removed]
+        row_positions.extend(added_positions)
+        # Ties go to the earliest entry, as in a fresh build, not to the earliest row.
+        vector_index, _ = current.vector_index.with_changes(  # type: ignore[union-attr]
+            removed_rows, embeddings, order=row_positions
+        )
+        return {"vector_index": vector_index, "row_positions": row_positions}
+
+    def _update_llamaindex(
+        self,
+        current: FAQSnapshot,
+        entries: List[Optional[Dict[str, str]]],
+        added: Dict[int, Dict[str, str]],
+    ) -> Dict[str, Any]:
+        embed_model = current.embed_model
+        vectors: List[Optional[List[float]]] = list(current.llama_embeddings or ())
+        vectors.extend([None] * (len(entries) - len(vectors)))
+        added_positions = sorted(added)
+        if added_positions:
+            # Kept in memory; the on-disk cache is rewritten by the next full build.
+            _, texts = self._llama_nodes([added[position] for position in added_positions])
+            embeddings = self._embed_documents(texts, embed_model.get_text_embedding_batch, embed_model, save=False)
+            for position, embedding in zip(added_positions, embeddings):
+                vectors[position] = embedding
+        for position, entry in enumerate(entries):
+            if entry is None:
+                vectors[position] = None
+        live = [position for position, entry in enumerate(entries) if entry is not None]
+        nodes, _ = self._llama_nodes([entries[position] for position in live])  # type: ignore[misc]
+        return {
+            "llama_retriever": self._llama_retriever(nodes, [vectors[position] for position in live], embed_model),
+            "llama_embeddings": vectors,
+        }
+
+    def check_for_updates(self) -> Optional[Dict[str, Any]]:
+        """Reload ``faq_path`` if its content changed; return the reload stats or ``None``.
+
+        The cheap mtime/size check runs first; the file is hashed only when
+        that changed, so touching the file without editing it is a no-op.
+        """
+        if self.faq_path is None:
+            return None
+        stat = self.faq_path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._source_signature:
+            return None
+        self._source_signature = signature
+        digest = _file_digest(self.faq_path)
+        if digest == self._source_digest:
+            return None
+        stats = self.reload(load_faq_entries(str(self.faq_path)))
+        self._source_digest = digest
+        return stats
+
+    def start_watching(self, interval: float = DEFAULT_WATCH_INTERVAL) -> None:
+        """Poll ``faq_path`` every ``interval`` seconds on a daemon thread."""
+        if self.faq_path is None:
+            raise ValueError("No FAQ file to watch; pass faq_path")
+        if self._stop_watching is not None:
+            return
+        self._stop_watching = threading.Event()
+        thread = threading.Thread(
+            target=self._watch, args=(interval, self._stop_watching), name="faq-watcher", daemon=True
+        )
+        thread.start()
 
-        if self.use_llamaindex and VectorStoreIndex and Document:
+    def stop_watching(self) -> None:
+        if self._stop_watching is not None:
+            self._stop_watching.set()
+            self._stop_watching = None
+
+    def _watch(self, interval: float, stop: threading.Event) -> None:
+        while not stop.wait(interval):
             try:
-                documents = [
-                    Document(
-                        text=(
-                            f"Category: {entry['category']}\n"
-                            f"Title: {entry['title']}\n"
-                            f"Answer: {entry['body']}"
-                        ),
-                        metadata=entry,
-                    )
-                    for entry in self.faq_entries
-                ]
-
-                # Use OpenAI embeddings if API key is set, else fallback to mock
-                if os.getenv("OPENAI_API_KEY") and OpenAIEmbedding:
-                    embed_model = OpenAIEmbedding(model="text-embedding-3-small")
-                    logger.info("Using OpenAIEmbedding for FAQ retrieval")
-                elif MockEmbedding:
-                    embed_model = MockEmbedding(embed_dim=1536)
-                    logger.info("Using MockEmbedding for FAQ retrieval")
-                else:
-                    raise RuntimeError("No embedding model available")
-
-                index = VectorStoreIndex.from_documents(documents, embed_model=embed_model)
-                self._retriever = index.as_retriever(similarity_top_k=1)
-                logger.info(
-                    "Initialized LlamaIndex retriever with %s FAQ entries",
-                    len(documents),
-                )
+                self.check_for_updates()
             except Exception as exc:
-                logger.warning(
-                    "Failed to initialize LlamaIndex (%s). Falling back to keyword search.",
-                    exc,
-                )
-                self.use_llamaindex = False
-        if not self.use_llamaindex:
-            logger.info("Using keyword fallback retriever.")
+                logger.warning("FAQ reload from %s failed (%s); keeping version %s", self.faq_path, exc, self.snapshot.version)
+
+    # --- Lookups --------------------------------------------------------------
+
+    def invalidate_cache(self) -> None:
+        """Drop cached query results, e.g. after the FAQ base changed."""
+        if self.query_cache is not None:
+            self.query_cache.invalidate(generation=self.snapshot.version)
+
+    def _cached(self, snapshot: FAQSnapshot, query: str, category: Optional[str]) -> Optional[Dict[str, str]]:
+        if self.query_cache is None:
+            return None
+        position = self.query_cache.get(query, category, snapshot.version)
+        if position is None:
+            return None
+        return snapshot.entries[position]
+
+    def _remember(
+        self,
+        snapshot: FAQSnapshot,
+        query: str,
+        category: Optional[str],
+        entry: Dict[str, str],
+        position: Optional[int],
+    ) -> None:
+        if self.query_cache is None:
+            return
+        if position is None:
+            position = snapshot.positions.get(entry.get("id"))
+        if position is not None:
+            self.query_cache.put(query, category, position, snapshot.version)
+
+    def _observe(self, path: str, started_ns: int, stage: str = "retrieve", count: int = 1) -> None:
+        """Record which path answered and how long it took, e.g. ``retrieve.keyword``."""
+        stage_histogram(f"{stage}.{path}").observe_ns(time.perf_counter_ns() - started_ns)
+        RETRIEVALS.inc(count, path=path)
+
+    def _fell_back(self, reason: str, count: int = 1) -> None:
+        if self.backend != "keyword":
+            FALLBACKS.inc(count, backend=self.backend, reason=reason)
+
+    @staticmethod
+    def _llama_entry(snapshot: FAQSnapshot, node: Any) -> Tuple[Dict[str, str], Optional[int]]:
+        """The snapshot's own entry for a LlamaIndex hit, found by id, and its position.
+
+        Node metadata is LlamaIndex's copy of the entry, so results share the
+        snapshot's dict instead; a copy of the metadata is the fallback for a
+        node that matches no entry.
+        """
+        metadata = node.metadata
+        position = snapshot.positions.get(metadata.get("id"))
+        if position is not None and snapshot.entries[position] == metadata:
+            return snapshot.entries[position], position  # type: ignore[return-value]
+        return dict(metadata), None
+
+    @staticmethod
+    def _keyword_lookup(snapshot: FAQSnapshot, query: str, category: Optional[str]) -> Tuple[Dict[str, str], int]:
+        position = snapshot.keyword_index.best_position(query, category=category)
+        return snapshot.entries[position], position  # type: ignore[return-value]
+
+    @staticmethod
+    def _rows_to_positions(snapshot: FAQSnapshot, rows: Any) -> List[int]:
+        return [snapshot.row_positions[int(row)] for row in rows[:, 0]]  # type: ignore[index]
+
+    def _query_embeddings(self, embed_model: Any, queries: Sequence[str]) -> List[List[float]]:
+        """Embed ``queries`` for a LlamaIndex lookup, as ``retrieve`` would one at a time.
+
+        LlamaIndex models may embed queries differently from documents (an
+        instruction prefix, a separate model), so this uses the query path:
+        ``query_embedder`` when set, else the model's query embeddings.
+        """
+        if self.query_embedder is not None:
+            return self.query_embedder.embed(list(queries))
+        embed_batch = getattr(embed_model, "get_query_embedding_batch", None)
+        if embed_batch is not None:
+            return embed_batch(list(queries))
+        return [embed_model.get_query_embedding(query) for query in queries]
+
+    def _vector_positions(self, snapshot: FAQSnapshot, queries: Sequence[str]) -> List[int]:
+        EMBEDDING_CALLS.inc(purpose="query")
+        query_matrix = embed_texts(snapshot.embed_model, queries)
+        rows, _ = snapshot.vector_index.search_batch(query_matrix, k=1)  # type: ignore[union-attr]
+        return self._rows_to_positions(snapshot, rows)
 
     @trace
     def retrieve(self, query: str, category: Optional[str] = None) -> Dict[str, str]:
         """Return the FAQ entry that best matches the query."""
-        if self.use_llamaindex and self._retriever is not None:
+        started = time.perf_counter_ns()
+        snapshot = self.snapshot
+        cached = self._cached(snapshot, query, category)
+        if cached is not None:
+            self._observe("cache", started)
+            return cached
+
+        if self.backend == "llamaindex" and snapshot.llama_retriever is not None:
             try:
-                nodes = self._retriever.retrieve(query)
+                EMBEDDING_CALLS.inc(purpose="query")
+                if self.query_embedder is not None:
+                    embedding = self.query_embedder.embed([query])[0]
+                    nodes = snapshot.llama_retriever.retrieve(QueryBundle(query_str=query, embedding=embedding))
+                else:
+                    nodes = snapshot.llama_retriever.retrieve(query)
                 if nodes:
-                    return dict(nodes[0].metadata)
+                    entry, position = self._llama_entry(snapshot, nodes[0])
+                    self._remember(snapshot, query, category, entry, position)
+                    self._observe("llamaindex", started)
+                    return entry
+                self._fell_back("no_result")
             except Exception as exc:
                 logger.warning("LlamaIndex retrieval failed (%s). Falling back.", exc)
+                self._fell_back("error")
+        elif self.backend == "numpy" and snapshot.vector_index is not None:
+            try:
+                position = self._vector_positions(snapshot, [query])[0]
+                entry = snapshot.entries[position]
+                self._remember(snapshot, query, category, entry, position)  # type: ignore[arg-type]
+                self._observe("numpy", started)
+                return entry  # type: ignore[return-value]
+            except Exception as exc:
+                logger.warning("NumPy retrieval failed (%s). Falling back.", exc)
+                self._fell_back("error")
 
         # --- Keyword fallback ---
-        lowered_query = query.lower()
-        best_score = -1
-        best_entry: Dict[str, str] = self.faq_entries[0]
-        for entry in self.faq_entries:
-            score = 0
-            if category and entry.get("category") == category:
-                score += 5
-            title = entry.get("title", "").lower()
-            body = entry.get("body", "").lower()
-            for token in [
-                "crash", "bug", "slow", "lag",
-                "feature", "request", "love", "thanks",
-                "billing", "charge", "login", "password",
-                "mode", "dark"
-            ]:
-                if token in lowered_query and token in (title + body):
-                    score += 2
-            if any(word in lowered_query for word in title.split()):
-                score += 1
-            if any(word in lowered_query for word in body.split()):
-                score += 0.5
-            if score > best_score:
-                best_score = score
-                best_entry = entry
-        return best_entry
-
-
-__all__ = ["FAQRetriever", "LLAMA_AVAILABLE"]
+        entry, position = self._keyword_lookup(snapshot, query, category)
+        self._remember(snapshot, query, category, entry, position)
+        self._observe("keyword", started)
+        return entry
+
+    def category_partitions(self) -> CategoryPartitions:
+        """Per-category indexes of the served snapshot, built on first use after each reload.
+
+        The NumPy backend slices its matrix. LlamaIndex keeps its vectors in
+        its own store, so its partitions are NumPy matrices of the document
+        embeddings the snapshot kept when it was built; the embedding model
+        is never called.
+        """
+        return self._category_partitions(self.snapshot)
+
+    def _category_partitions(self, snapshot: FAQSnapshot) -> CategoryPartitions:
+        version, partitions = self._partitions
+        if version == snapshot.version and partitions is not None:
+            return partitions
+        vector_index, row_positions = snapshot.vector_index, snapshot.row_positions
+        if vector_index is None and snapshot.llama_embeddings is not None and NUMPY_AVAILABLE:
+            try:
+                embeddings = snapshot.llama_embeddings
+                row_positions = [position for position, vector in enumerate(embeddings) if vector is not None]
+                vector_index = NumpyVectorIndex([embeddings[position] for position in row_positions])
+            except Exception as exc:
+                logger.warning("Could not partition LlamaIndex embeddings (%s); top-k uses keyword search.", exc)
+                vector_index, row_positions = None, None
+        partitions = CategoryPartitions(snapshot.entries, snapshot.keyword_index, vector_index, row_positions)
+        if snapshot is self.snapshot:
+            self._partitions = (snapshot.version, partitions)
+        return partitions
+
+    @trace
+    def retrieve_top_k(
+        self,
+        query: str,
+        k: int = 5,
+        category: Optional[str] = None,
+        rerank: bool = False,
+        rerank_weight: float = DEFAULT_RERANK_WEIGHT,
+    ) -> List[FAQCandidate]:
+        """Return up to ``k`` scored FAQ entries for ``query``, best first.
+
+        With a ``category`` only that category's entries and the global ones
+        are searched (see :class:`~category_index.CategoryPartitions`). Vector
+        backends score by cosine similarity, the keyword index by its
+        weighted matches. With ``rerank`` a shortlist of ``RERANK_SHORTLIST *
+        k`` candidates is reordered by :meth:`CategoryPartitions.rerank`
+        before the top ``k`` are kept. Results are not cached.
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        started = time.perf_counter_ns()
+        snapshot = self.snapshot
+        partitions = self._category_partitions(snapshot)
+        partition = partitions.get(category)
+        shortlist = k * RERANK_SHORTLIST if rerank else k
+        candidates: Optional[List[Tuple[int, float]]] = None
+        path = "keyword"
+        if self.backend != "keyword" and partition.vector_index is not None:
+            try:
+                EMBEDDING_CALLS.inc(purpose="query")
+                if self.backend == "llamaindex":
+                    query_embedding = self._query_embeddings(snapshot.embed_model, [query])[0]
+                else:
+                    query_embedding = embed_texts(snapshot.embed_model, [query])[0]
+                candidates = partition.vector_candidates(query_embedding, shortlist)
+                path = self.backend
+            except Exception as exc:
+                logger.warning("Vector top-k retrieval failed (%s). Falling back.", exc)
+                self._fell_back("error")
+        if candidates is None:
+            candidates = partition.keyword_index.top_positions(query, shortlist, category=category)
+        if rerank:
+            candidates = partitions.rerank(query, candidates, rerank_weight)
+        self._observe(path, started, "retrieve_top_k")
+        return [
+            FAQCandidate(entry=snapshot.entries[position], score=score, position=position)  # type: ignore[arg-type]
+            for position, score in candidates[:k]
+        ]
+
+    @trace
+    async def aretrieve(self, query: str, category: Optional[str] = None) -> Dict[str, str]:
+        """Async variant of :meth:`retrieve` that awaits the embedding round trip."""
+        started = time.perf_counter_ns()
+        snapshot = self.snapshot
+        cached = self._cached(snapshot, query, category)
+        if cached is not None:
+            self._observe("cache", started)
+            return cached
+
+        if self.backend == "llamaindex" and snapshot.llama_retriever is not None:
+            try:
+                EMBEDDING_CALLS.inc(purpose="query")
+                if self.query_embedder is not None:
+                    embedding = (await self.query_embedder.aembed([query]))[0]
+                    nodes = await snapshot.llama_retriever.aretrieve(QueryBundle(query_str=query, embedding=embedding))
+                else:
+                    nodes = await snapshot.llama_retriever.aretrieve(query)
+                if nodes:
+                    entry, position = self._llama_entry(snapshot, nodes[0])
+                    self._remember(snapshot, query, category, entry, position)
+                    self._observe("llamaindex", started)
+                    return entry
+                self._fell_back("no_result")
+            except Exception as exc:
+                logger.warning("LlamaIndex retrieval failed (%s). Falling back.", exc)
+                self._fell_back("error")
+        elif self.backend == "numpy" and snapshot.vector_index is not None:
+            try:
+                EMBEDDING_CALLS.inc(purpose="query")
+                if hasattr(snapshot.embed_model, "aget_text_embedding_batch"):
+                    query_matrix = await snapshot.embed_model.aget_text_embedding_batch([query])
+                else:
+                    query_matrix = embed_texts(snapshot.embed_model, [query])
+                rows, _ = snapshot.vector_index.search_batch(query_matrix, k=1)
+                position = self._rows_to_positions(snapshot, rows)[0]
+                entry = snapshot.entries[position]
+                self._remember(snapshot, query, category, entry, position)  # type: ignore[arg-type]
+                self._observe("numpy", started)
+                return entry  # type: ignore[return-value]
+            except Exception as exc:
+                logger.warning("NumPy retrieval failed (%s). Falling back.", exc)
+                self._fell_back("error")
+
+        # --- Keyword fallback (CPU-only, no I/O to await) ---
+        entry, position = self._keyword_lookup(snapshot, query, category)
+        self._remember(snapshot, query, category, entry, position)
+        self._observe("keyword", started)
+        return entry
+
+    @trace
+    def retrieve_batch(
+        self,
+        queries: Sequence[str],
+        categories: Optional[Sequence[Optional[str]]] = None,
+    ) -> List[Dict[str, str]]:
+        """Return the best FAQ entry for each query, in order.
+
+        Cached queries are answered directly. The remaining queries are
+        embedded with one batched call; the NumPy backend then scores them
+        with a single matrix-matrix product, while LlamaIndex receives the
+        precomputed query embeddings.
+        """
+        if categories is None:
+            categories = [None] * len(queries)
+        started = time.perf_counter_ns()
+        snapshot = self.snapshot
+        results: List[Optional[Dict[str, str]]] = [
+            self._cached(snapshot, query, category) for query, category in zip(queries, categories)
+        ]
+        pending = [idx for idx, result in enumerate(results) if result is None]
+        if len(pending) < len(queries):
+            self._observe("cache", started, "retrieve_batch", len(queries) - len(pending))
+
+        started = time.perf_counter_ns()
+        if self.backend == "llamaindex" and snapshot.llama_retriever is not None and pending:
+            try:
+                EMBEDDING_CALLS.inc(purpose="query")
+                embeddings = self._query_embeddings(snapshot.embed_model, [queries[idx] for idx in pending])
+            except Exception as exc:
+                logger.warning("Batched embedding failed (%s). Retrieving one by one.", exc)
+                embeddings = None
+            answered = 0
+            for offset, idx in enumerate(pending):
+                try:
+                    if embeddings is not None:
+                        bundle = QueryBundle(query_str=queries[idx], embedding=embeddings[offset])
+                        nodes = snapshot.llama_retriever.retrieve(bundle)
+                    else:
+                        EMBEDDING_CALLS.inc(purpose="query")
+                        nodes = snapshot.llama_retriever.retrieve(queries[idx])
+                    if nodes:
+                        results[idx], position = self._llama_entry(snapshot, nodes[0])
+                        self._remember(snapshot, queries[idx], categories[idx], results[idx], position)
+                        answered += 1
+                    else:
+                        self._fell_back("no_result")
+                except Exception as exc:
+                    logger.warning("LlamaIndex retrieval failed (%s). Falling back.", exc)
+                    self._fell_back("error")
+            if answered:
+                self._observe("llamaindex", started, "retrieve_batch", answered)
+        elif self.backend == "numpy" and snapshot.vector_index is not None and pending:
+            try:
+                positions = self._vector_positions(snapshot, [queries[idx] for idx in pending])
+                for idx, position in zip(pending, positions):
+                    results[idx] = snapshot.entries[position]
+                    self._remember(snapshot, queries[idx], categories[idx], results[idx], position)  # type: ignore[arg-type]
+                self._observe("numpy", started, "retrieve_batch", len(pending))
+            except Exception as exc:
+                logger.warning("NumPy retrieval failed (%s). Falling back.", exc)
+                self._fell_back("error", len(pending))
+
+        started = time.perf_counter_ns()
+        fallback = [idx for idx in pending if results[idx] is None]
+        for idx in fallback:
+            entry, position = self._keyword_lookup(snapshot, queries[idx], categories[idx])
+            self._remember(snapshot, queries[idx], categories[idx], entry, position)
+            results[idx] = entry
+        if fallback:
+            self._observe("keyword", started, "retrieve_batch", len(fallback))
+        return results  # type: ignore[return-value]
+
+
+__all__ = ["FAQRetriever", "FAQSnapshot", "FAQCandidate", "LLAMA_AVAILABLE", "BACKENDS", "faq_text"]
@@ -0,0 +1,141 @@
+"""Incremental readers for review and FAQ dumps.
+
+Records are yielded one at a time from JSON arrays or JSONL files, optionally
+gzip-compressed, so memory stays bounded by a single read chunk plus the
+record being decoded rather than the size of the whole dump.
+"""
+from __future__ import annotations
+
+import gzip
+import io
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, Sequence, TextIO, Union
+
+REVIEW_FIELDS = ("id", "text", "rating", "author")
+FAQ_FIELDS = ("id", "category", "title", "body")
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+CHUNK_SIZE = 1 << 16
+
+PathLike = Union[str, Path]
+
+
+def _open_text(path: Path) -> TextIO:
+    with path.open("rb") as probe:
+        magic = probe.read(2)
+    if magic == b"\x1f\x8b":
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+
+def _is_jsonl(path: Path) -> bool:
+    suffixes = path.suffixes
+    if suffixes and suffixes[-1] == ".gz":
+        suffixes = suffixes[:-1]
+    return bool(suffixes) and suffixes[-1] in JSONL_SUFFIXES
+
+
+def _iter_jsonl(handle: TextIO, source: Path) -> Iterator[Any]:
+    for line_number, line in enumerate(handle, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"{source}:{line_number}: invalid JSON ({exc.msg})") from exc
+
+
+def _iter_json_array(handle: TextIO, source: Path, chunk_size: int) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        chunk = handle.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_whitespace() -> None:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return
+
+    skip_whitespace()
+    if pos >= len(buffer) or buffer[pos] != "[":
+        raise ValueError(f"{source}: expected a JSON array of records")
+    pos += 1
+    expect_value = True
+    while True:
+        skip_whitespace()
+        if pos >= len(buffer):
+            raise ValueError(f"{source}: unexpected end of file inside JSON array")
+        char = buffer[pos]
+        if char == "]":
+            return
+        if char == ",":
+            if expect_value:
+                raise ValueError(f"{source}: unexpected ',' in JSON array")
+            pos += 1
+            expect_value = True
+            continue
+        if not expect_value:
+            raise ValueError(f"{source}: expected ',' or ']' in JSON array")
+        while True:
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as exc:
+                if fill():
+                    continue
+                raise ValueError(f"{source}: invalid JSON ({exc.msg})") from exc
+            # A value ending exactly at the buffer edge may be a truncated number.
+            if end == len(buffer) and not isinstance(record, (dict, list, str)) and fill():
+                continue
+            break
+        pos = end
+        expect_value = False
+        yield record
+
+
+def iter_records(path: PathLike, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """Yield JSON objects from a JSON array or JSONL file (``.gz`` allowed)."""
+    source = Path(path)
+    if not source.exists():
+        raise FileNotFoundError(f"Record file not found at {source}")
+    with _open_text(source) as handle:
+        records = _iter_jsonl(handle, source) if _is_jsonl(source) else _iter_json_array(handle, source, chunk_size)
+        for index, record in enumerate(records):
+            if not isinstance(record, dict):
+                raise ValueError(f"{source}: record {index} is not a JSON object")
+            yield record
+
+
+def _iter_validated(path: PathLike, required: Sequence[str], kind: str) -> Iterator[Dict[str, Any]]:
+    for index, record in enumerate(iter_records(path)):
+        missing = [field for field in required if record.get(field) in (None, "")]
+        if missing:
+            raise ValueError(f"{kind} record {index} in {path} is missing {', '.join(missing)}")
+        yield record
+
+
+def iter_reviews(path: PathLike) -> Iterator[Dict[str, Any]]:
+    """Yield review dicts, validating that ``id``, ``text``, ``rating`` and ``author`` are set."""
+    return _iter_validated(path, REVIEW_FIELDS, "Review")
+
+
+def iter_faq_entries(path: PathLike) -> Iterator[Dict[str, Any]]:
+    """Yield FAQ entries, validating that ``id``, ``category``, ``title`` and ``body`` are set."""
+    return _iter_validated(path, FAQ_FIELDS, "FAQ")
+
+
+__all__ = ["iter_records", "iter_reviews", "iter_faq_entries", "REVIEW_FIELDS", "FAQ_FIELDS"]
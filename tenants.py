@@ -0,0 +1,285 @@
+"""Per-app FAQ retrievers and pipelines, loaded lazily and evicted under a memory budget."""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from embedding_cache import EmbeddingCache
+from metrics import LatencyHistogram, counter, drop_stage_histogram, stage_histogram
+from pipeline import AiriaPipeline
+from retrieval import FAQRetriever, openai_embed_model
+from vector_index import NUMPY_AVAILABLE, np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FAQ_DIR = Path(__file__).resolve().parent / "data" / "faqs"
+DEFAULT_MEMORY_BUDGET_MB = 512
+# A served tenant is re-measured after a reload, or at most this often as its caches fill.
+REMEASURE_SECONDS = 30.0
+FAQ_SUFFIXES = (".json", ".jsonl", ".json.gz", ".jsonl.gz")
+# App ids name files under the FAQ directory, so they never contain separators or dots.
+APP_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+# Objects from these modules are walked attribute by attribute when sizing a tenant.
+_SIZED_MODULES = frozenset({
+    "category_index", "dedup", "keyword_index", "query_cache", "retrieval", "vector_index",
+})
+
+TENANT_LOADS = counter("tenant_loads", "Per-app FAQ retrievers loaded or evicted, by event.")
+
+
+def _deep_size(root: Any, shared: Set[int]) -> int:
+    """Approximate bytes held by ``root``, skipping objects whose id is in ``shared``.
+
+    Containers and objects of this repo's classes are followed; anything else
+    (LlamaIndex's vector store among them) counts only its shallow size.
+    NumPy arrays count their buffer once, even when viewed several times.
+    """
+    seen = set(shared)
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or obj is None:
+            continue
+        seen.add(id(obj))
+        if NUMPY_AVAILABLE and isinstance(obj, np.ndarray):
+            base = obj
+            while isinstance(base.base, np.ndarray):
+                base = base.base
+            if base is obj or id(base) not in seen:
+                seen.add(id(base))
+                total += base.nbytes
+            continue
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif type(obj).__module__ in _SIZED_MODULES:
+            stack.extend(getattr(obj, "__dict__", {}).values())
+            for name in getattr(type(obj), "__slots__", ()):
+                stack.append(getattr(obj, name, None))
+    return total
+
+
+@dataclass
+class Tenant:
+    """One app's retriever and pipeline with its estimated footprint.
+
+    ``bytes`` was measured at ``measured_at`` (monotonic) against FAQ
+    snapshot ``measured_version``.
+    """
+
+    app_id: str
+    retriever: FAQRetriever
+    pipeline: AiriaPipeline
+    bytes: int = 0
+    loaded_at: float = field(default_factory=time.time)
+    load_seconds: float = 0.0
+    measured_at: float = field(default_factory=time.monotonic)
+    measured_version: int = -1
+    latency: LatencyHistogram = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.latency = stage_histogram(f"respond.{self.app_id}")
+
+
+def _default_pipeline(retriever: FAQRetriever) -> AiriaPipeline:
+    return AiriaPipeline(enable_honeyhive=False, retriever=retriever)
+
+
+class TenantRegistry:
+    """FAQ retrievers keyed by app id, built on first use from ``<faq_dir>/<app_id>.json``.
+
+    Tenants are kept in least-recently-used order; once their estimated
+    bytes exceed ``memory_budget_bytes`` the coldest are evicted (a tenant
+    that alone exceeds the budget still serves). A tenant is re-measured
+    when it is next used after a reload, and every ``REMEASURE_SECONDS``
+    while in use, so lazily built partitions and filling caches count
+    towards the budget. All tenants share one
+    embedding model and one embedding cache, and the compiled keyword
+    tables are module-level already. With ``base_retriever`` (typically the
+    default pipeline's retriever, on the same backend) they reuse its model
+    and cache object, so saves to the ``<model>.emb`` file never drop each
+    other's vectors. Pipelines come from ``pipeline_factory``, typically
+    ``base.with_retriever``. Safe to share between threads; two requests
+    for the same unloaded app load it once.
+    """
+
+    def __init__(
+        self,
+        faq_dir: Optional[str] = None,
+        memory_budget_bytes: Optional[int] = None,
+        backend: Optional[str] = None,
+        embed_model: Optional[Any] = None,
+        pipeline_factory: Callable[[FAQRetriever], AiriaPipeline] = _default_pipeline,
+        base_retriever: Optional[Callable[[], FAQRetriever]] = None,
+    ) -> None:
+        self.faq_dir = Path(faq_dir or os.getenv("TENANT_FAQ_DIR") or DEFAULT_FAQ_DIR)
+        if memory_budget_bytes is None:
+            memory_budget_bytes = int(float(os.getenv("TENANT_MEMORY_BUDGET_MB", DEFAULT_MEMORY_BUDGET_MB)) * 2**20)
+        self.memory_budget_bytes = memory_budget_bytes
+        self.backend = backend or os.getenv("FAQ_RETRIEVER_BACKEND") or "llamaindex"
+        self.pipeline_factory = pipeline_factory
+        self._base_retriever = base_retriever
+        self._embed_model = embed_model
+        self._embed_model_ready = embed_model is not None
+        self._embedding_cache: Optional[EmbeddingCache] = None
+        self._tenants: "OrderedDict[str, Tenant]" = OrderedDict()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._shared_lock = threading.Lock()
+        self.evictions = 0
+
+    def faq_path(self, app_id: str) -> Path:
+        """The FAQ file for ``app_id``; ``ValueError`` for malformed ids, ``FileNotFoundError`` if absent."""
+        if not APP_ID_PATTERN.fullmatch(app_id):
+            raise ValueError(f"Invalid app id {app_id!r}")
+        for suffix in FAQ_SUFFIXES:
+            path = self.faq_dir / f"{app_id}{suffix}"
+            if path.exists():
+                return path
+        raise FileNotFoundError(f"No FAQ file for app {app_id!r} in {self.faq_dir}")
+
+    def cached(self, app_id: str) -> Optional[Tenant]:
+        """The tenant for ``app_id`` if it is loaded (marking it recently used), else ``None``."""
+        with self._lock:
+            tenant = self._tenants.get(app_id)
+            if tenant is None:
+                return None
+            self._tenants.move_to_end(app_id)
+            now = time.monotonic()
+            stale = (
+                tenant.measured_version != tenant.retriever.snapshot.version
+                or now - tenant.measured_at >= REMEASURE_SECONDS
+            )
+            if stale:
+                # Claimed under the lock, so concurrent requests measure it once.
+                tenant.measured_at = now
+                tenant.measured_version = tenant.retriever.snapshot.version
+        if stale:
+            # Walking a large index takes tens of milliseconds; keep it off the request path.
+            threading.Thread(target=self._remeasure, args=(tenant,), name="tenant-measure", daemon=True).start()
+        return tenant
+
+    def _measure(self, tenant: Tenant) -> int:
+        shared = {id(obj) for obj in (self._embed_model, self._embedding_cache) if obj is not None}
+        return _deep_size(tenant.retriever, shared) + _deep_size(tenant.pipeline.dedup, shared)
+
+    def _remeasure(self, tenant: Tenant) -> None:
+        size = self._measure(tenant)
+        with self._lock:
+            grew = size > tenant.bytes
+            tenant.bytes = size
+            if grew and self._tenants.get(tenant.app_id) is tenant:
+                self._evict(keep=tenant.app_id)
+
+    def get(self, app_id: str) -> Tenant:
+        """Return the tenant for ``app_id``, loading it (and evicting cold ones) if needed."""
+        tenant = self.cached(app_id)
+        if tenant is not None:
+            return tenant
+        with self._lock:
+            load_lock = self._load_locks.setdefault(app_id, threading.Lock())
+        # Building an index can take seconds; only requests for this app wait on it.
+        with load_lock:
+            tenant = self.cached(app_id)
+            if tenant is not None:
+                return tenant
+            try:
+                tenant = self._load(app_id)
+                with self._lock:
+                    self._tenants[app_id] = tenant
+                    self._evict(keep=app_id)
+            finally:
+                with self._lock:
+                    self._load_locks.pop(app_id, None)
+        return tenant
+
+    def _shared_embed_model(self) -> Optional[Any]:
+        with self._shared_lock:
+            if not self._embed_model_ready:
+                # One client for every tenant; built on first load so startup stays cheap.
+                base = self._base_retriever() if self._base_retriever is not None else None
+                if base is not None and base.backend == self.backend:
+                    self._embed_model = base.snapshot.embed_model
+                    self._embedding_cache = base.embedding_cache
+                else:
+                    self._embed_model = openai_embed_model() if self.backend == "llamaindex" else None
+                self._embed_model_ready = True
+        return self._embed_model
+
+    def _load(self, app_id: str) -> Tenant:
+        path = self.faq_path(app_id)
+        started = time.perf_counter()
+        retriever = FAQRetriever(
+            backend=self.backend,
+            faq_path=str(path),
+            embed_model=self._shared_embed_model(),
+            embedding_cache=self._embedding_cache,
+        )
+        if self._embedding_cache is None:
+            self._embedding_cache = retriever.embedding_cache
+        tenant = Tenant(app_id, retriever, self.pipeline_factory(retriever), measured_version=retriever.snapshot.version)
+        tenant.bytes = self._measure(tenant)
+        tenant.load_seconds = time.perf_counter() - started
+        TENANT_LOADS.inc(event="load")
+        logger.info(
+            "Loaded tenant %s: %s FAQ entries, ~%.1f MB, %.2fs",
+            app_id, len(retriever.snapshot.entries), tenant.bytes / 2**20, tenant.load_seconds,
+        )
+        return tenant
+
+    def _evict(self, keep: str) -> None:
+        total = sum(tenant.bytes for tenant in self._tenants.values())
+        for app_id in list(self._tenants):
+            if total <= self.memory_budget_bytes:
+                break
+            if app_id == keep:
+                continue
+            tenant = self._tenants.pop(app_id)
+            total -= tenant.bytes
+            self.evictions += 1
+            TENANT_LOADS.inc(event="evict")
+            # Per-app histograms would otherwise accumulate for every app ever served.
+            drop_stage_histogram(f"respond.{app_id}")
+            logger.info("Evicted tenant %s (~%.1f MB)", app_id, tenant.bytes / 2**20)
+
+    def tenants(self) -> List[Tenant]:
+        """Loaded tenants, least recently used first."""
+        with self._lock:
+            return list(self._tenants.values())
+
+    def stats(self) -> Dict[str, Any]:
+        tenants = self.tenants()
+        return {
+            "loaded": len(tenants),
+            "bytes": sum(tenant.bytes for tenant in tenants),
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "evictions": self.evictions,
+            "tenants": [
+                {
+                    "app_id": tenant.app_id,
+                    "bytes": tenant.bytes,
+                    "faq_entries": len(tenant.retriever.snapshot.entries) - tenant.retriever.snapshot.deleted,
+                    "backend": tenant.retriever.backend,
+                    "load_seconds": tenant.load_seconds,
+                    "requests": tenant.latency.count,
+                    "p50_seconds": tenant.latency.quantile(0.5),
+                    "p95_seconds": tenant.latency.quantile(0.95),
+                }
+                for tenant in tenants
+            ],
+        }
+
+
+__all__ = ["Tenant", "TenantRegistry", "APP_ID_PATTERN", "DEFAULT_FAQ_DIR", "REMEASURE_SECONDS"]
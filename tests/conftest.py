@@ -0,0 +1,5 @@
+"""Make the repository's top-level modules importable when pytest runs from anywhere."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,191 @@
+"""FastAPI endpoints, driven in-process through TestClient."""
+from __future__ import annotations
+
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+pytest.importorskip("dotenv")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import backend  # noqa: E402
+from benchmarks.synthetic import synthetic_faq_entries, synthetic_reviews  # noqa: E402
+from pipeline import AiriaPipeline  # noqa: E402
+from retrieval import FAQRetriever  # noqa: E402
+from tenants import TenantRegistry  # noqa: E402
+
+REVIEWS = [
+    dict(review, id=f"r{number}", date=f"2025-01-{number + 1:02d}", store="google_play")
+    for number, review in enumerate(synthetic_reviews(8))
+]
+
+
+def make_pipeline(retriever=None):
+    return AiriaPipeline(retriever=retriever or FAQRetriever(backend="keyword"))
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    pipeline = make_pipeline()
+    monkeypatch.setattr(backend, "_pipeline", pipeline)
+    return pipeline
+
+
+@pytest.fixture
+def client(pipeline):
+    # Not entered as a context manager, so the lifespan warm-up never runs.
+    return TestClient(backend.app)
+
+
+def request_body(review, **extra):
+    body = {key: review[key] for key in ("text", "author", "rating", "id", "date", "store")}
+    return {**body, **extra}
+
+
+def expected_payload(review):
+    """What /respond should answer, from a pipeline of its own."""
+    return json.loads(json.dumps(backend.result_payload(make_pipeline().run(review))))
+
+
+def test_respond_matches_the_pipeline(client):
+    for review in REVIEWS:
+        response = client.post("/respond", json=request_body(review))
+        assert response.status_code == 200
+        assert response.json() == expected_payload(review)
+
+
+def test_respond_keeps_the_legacy_placeholders(client, pipeline):
+    seen = []
+    arun = pipeline.arun
+
+    async def recording_arun(review):
+        seen.append(review)
+        return await arun(review)
+
+    pipeline.arun = recording_arun
+    response = client.post("/respond", json={"text": "It crashes", "author": "Sam", "rating": 1})
+    assert response.status_code == 200
+    assert seen == [{
+        "text": "It crashes", "author": "Sam", "rating": 1,
+        "id": "api_request", "date": "2025-09-19", "store": "api",
+    }]
+
+
+def test_respond_rejects_invalid_reviews(client):
+    assert client.post("/respond", json={"text": "missing author and rating"}).status_code == 422
+
+
+def test_respond_routes_app_ids(client, pipeline, monkeypatch, tmp_path):
+    entries = synthetic_faq_entries(30, seed=5)
+    (tmp_path / "alpha.json").write_text(json.dumps(entries), encoding="utf-8")
+    monkeypatch.setattr(backend, "tenant_registry", TenantRegistry(
+        faq_dir=str(tmp_path), backend="keyword", pipeline_factory=pipeline.with_retriever,
+    ))
+    review = REVIEWS[0]
+    response = client.post("/respond", json=request_body(review, app_id="alpha"))
+    assert response.status_code == 200
+    tenant = make_pipeline(FAQRetriever(entries, backend="keyword"))
+    assert response.json() == json.loads(json.dumps(backend.result_payload(tenant.run(review))))
+    assert client.post("/respond", json=request_body(review, app_id="beta")).status_code == 404
+    assert client.post("/respond", json=request_body(review, app_id="../alpha")).status_code == 422
+
+
+def ndjson(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(backend.NDJSON_MEDIA_TYPE)
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Review ids of every run_batch call the endpoint makes, in order."""
+    calls = []
+    run_in_threadpool = backend.run_in_threadpool
+
+    async def recording(func, *args, **kwargs):
+        if getattr(func, "__name__", "") == "run_batch":
+            calls.append([review["id"] for review in args[0]])
+        return await run_in_threadpool(func, *args, **kwargs)
+
+    monkeypatch.setattr(backend, "run_in_threadpool", recording)
+    return calls
+
+
+@pytest.mark.parametrize("encoding", ["json", "ndjson"])
+def test_batch_streams_one_line_per_review_in_order(client, monkeypatch, batches, encoding):
+    monkeypatch.setattr(backend, "BATCH_SIZE", 3)
+    if encoding == "json":
+        response = client.post("/respond/batch", json=[request_body(review) for review in REVIEWS])
+    else:
+        body = "\n".join(json.dumps(request_body(review)) for review in REVIEWS)
+        response = client.post("/respond/batch", content=body, headers={"content-type": backend.NDJSON_MEDIA_TYPE})
+    assert ndjson(response) == [{"id": review["id"], **expected_payload(review)} for review in REVIEWS]
+    assert batches == [["r0", "r1", "r2"], ["r3", "r4", "r5"], ["r6", "r7"]]
+
+
+def test_batch_passes_review_metadata_through(client, pipeline):
+    seen = []
+    run_batch = pipeline.run_batch
+
+    def recording_run_batch(reviews, batch_size):
+        seen.extend(reviews)
+        return run_batch(reviews, batch_size)
+
+    pipeline.run_batch = recording_run_batch
+    ndjson(client.post("/respond/batch", json=[request_body(review) for review in REVIEWS[:3]]))
+    assert [(review["id"], review["date"], review["store"]) for review in seen] == [
+        (review["id"], review["date"], review["store"]) for review in REVIEWS[:3]
+    ]
+
+
+def test_invalid_ndjson_lines_get_error_records_in_place(client):
+    lines = [
+        json.dumps(request_body(REVIEWS[0])),
+        "{not json",
+        "",
+        json.dumps({"text": "no author"}),
+        json.dumps(request_body(REVIEWS[1])),
+    ]
+    response = client.post(
+        "/respond/batch", content="\n".join(lines), headers={"content-type": backend.NDJSON_MEDIA_TYPE}
+    )
+    records = ndjson(response)
+    assert [record.get("id") for record in records] == ["r0", None, None, "r1"]
+    assert [record.get("line") for record in records] == [None, 2, 4, None]
+    assert all(record["error"] for record in records[1:3])
+    assert records[0] == {"id": "r0", **expected_payload(REVIEWS[0])}
+
+
+def test_invalid_json_batches_are_rejected(client):
+    assert client.post("/respond/batch", json={"text": "not a list"}).status_code == 422
+    assert client.post("/respond/batch", json=[{"text": "no author"}]).status_code == 422
+
+
+def test_batches_group_consecutive_reviews_of_one_app(client, pipeline, monkeypatch, batches, tmp_path):
+    entries = synthetic_faq_entries(30, seed=5)
+    (tmp_path / "alpha.json").write_text(json.dumps(entries), encoding="utf-8")
+    monkeypatch.setattr(backend, "tenant_registry", TenantRegistry(
+        faq_dir=str(tmp_path), backend="keyword", pipeline_factory=pipeline.with_retriever,
+    ))
+    apps = [None, "alpha", "alpha", None, "beta", "../alpha", None, None]
+    body = [
+        request_body(review, app_id=app_id) if app_id else request_body(review)
+        for review, app_id in zip(REVIEWS, apps)
+    ]
+    records = ndjson(client.post("/respond/batch", json=body))
+    assert [record["id"] for record in records] == [review["id"] for review in REVIEWS]
+    assert batches == [["r0"], ["r1", "r2"], ["r3"], ["r6", "r7"]]
+
+    tenant = make_pipeline(FAQRetriever(entries, backend="keyword"))
+    for record, review, app_id in zip(records, REVIEWS, apps):
+        if app_id is None:
+            assert record == {"id": review["id"], **expected_payload(review)}
+        elif app_id == "alpha":
+            assert record == {"id": review["id"], **json.loads(json.dumps(backend.result_payload(tenant.run(review))))}
+        else:
+            assert set(record) == {"id", "error"}
+    assert records[4]["error"] == "Unknown app 'beta'"
+    assert "Invalid app id" in records[5]["error"]
@@ -0,0 +1,112 @@
+"""CategoryPartitions and retrieve_top_k: partition isolation, the global set and reranking."""
+from __future__ import annotations
+
+import pytest
+
+from category_index import GLOBAL_CATEGORIES, CategoryPartitions
+from keyword_index import KeywordIndex
+from retrieval import FAQRetriever
+
+ENTRIES = [
+    {"id": "1", "category": "bug", "title": "App crashes on upload", "body": "Update to fix the crash."},
+    {"id": "2", "category": "billing", "title": "Charged twice", "body": "Refunds for a double charge on upload."},
+    {"id": "3", "category": "general", "title": "Contact support", "body": "Write to support about any crash or charge."},
+    {"id": "4", "category": "", "title": "Release notes", "body": "Every update is listed in the release notes."},
+    {"id": "5", "category": "bug", "title": "Login fails", "body": "Reset your password if login fails."},
+    {"id": "6", "category": "billing", "title": "Cancel subscription", "body": "Cancel any time from settings."},
+]
+
+
+def test_partitions_hold_their_category_and_the_global_entries():
+    partitions = CategoryPartitions(ENTRIES, KeywordIndex(ENTRIES))
+    assert partitions.get("bug").positions == [0, 2, 3, 4]
+    assert partitions.get("billing").positions == [1, 2, 3, 5]
+    assert set(partitions.partitions) == {"bug", "billing"}
+
+
+def test_partition_lookups_never_leave_the_partition():
+    partitions = CategoryPartitions(ENTRIES, KeywordIndex(ENTRIES))
+    # "charged twice" matches the billing entry best, but a bug lookup cannot see it.
+    bug = partitions.get("bug").keyword_index.top_positions("charged twice upload", 10, category="bug")
+    assert bug
+    assert {position for position, _ in bug} <= {0, 2, 3, 4}
+    billing = partitions.get("billing").keyword_index.top_positions("charged twice upload", 10)
+    assert billing[0][0] == 1
+
+
+@pytest.mark.parametrize("category", [None, "", "praise"])
+def test_no_or_unknown_category_searches_everything(category):
+    partitions = CategoryPartitions(ENTRIES, KeywordIndex(ENTRIES))
+    assert partitions.get(category) is partitions.all
+
+
+def test_global_categories_are_configurable():
+    assert GLOBAL_CATEGORIES == {"", "general"}
+    partitions = CategoryPartitions(ENTRIES, KeywordIndex(ENTRIES), global_categories=frozenset({"billing"}))
+    assert partitions.get("bug").positions == [0, 1, 4, 5]
+    assert partitions.get("general").positions == [1, 2, 5]
+
+
+def test_deleted_entries_are_left_out():
+    entries = list(ENTRIES)
+    entries[2] = None
+    partitions = CategoryPartitions(entries, KeywordIndex(entries))
+    assert partitions.get("bug").positions == [0, 3, 4]
+
+
+def test_rerank_blends_scores_with_word_overlap():
+    partitions = CategoryPartitions(ENTRIES, KeywordIndex(ENTRIES))
+    candidates = [(3, 1.0), (4, 0.9), (0, 0.5)]
+    query = "crash upload"
+    assert partitions.rerank(query, candidates, weight=0.0) == [(3, 1.0), (4, 0.9), (0, 0.5)]
+    # Entry 0 holds both query words, entry 3 neither.
+    reranked = partitions.rerank(query, candidates, weight=0.5)
+    assert [position for position, _ in reranked] == [0, 3, 4]
+    assert reranked[0][1] == pytest.approx(0.5 * 0.5 + 0.5)
+    assert [position for position, _ in partitions.rerank(query, candidates, weight=1.0)] == [0, 3, 4]
+
+
+def test_rerank_breaks_ties_by_position():
+    partitions = CategoryPartitions(ENTRIES, KeywordIndex(ENTRIES))
+    assert partitions.rerank("", [(5, 0.4), (1, 0.4), (3, 0.8)]) == [
+        (3, pytest.approx(0.7)), (1, pytest.approx(0.35)), (5, pytest.approx(0.35)),
+    ]
+
+
+@pytest.mark.parametrize("backend", ["keyword", "numpy"])
+@pytest.mark.parametrize("rerank", [False, True])
+def test_retrieve_top_k_stays_in_the_category(backend, rerank):
+    retriever = FAQRetriever(ENTRIES, backend=backend)
+    for query in ("charged twice", "crash", "login password", "release notes"):
+        candidates = retriever.retrieve_top_k(query, k=3, category="bug", rerank=rerank)
+        assert 0 < len(candidates) <= 3
+        assert {candidate.entry["category"] for candidate in candidates} <= {"bug"} | GLOBAL_CATEGORIES
+        assert [candidate.score for candidate in candidates] == sorted(
+            (candidate.score for candidate in candidates), reverse=True
+        )
+        assert all(candidate.entry is ENTRIES[candidate.position] for candidate in candidates)
+    assert retriever.retrieve_top_k("cancel", k=1, category="billing")[0].entry["id"] == "6"
+
+
+def test_llamaindex_partitions_reuse_the_snapshot_vectors():
+    core = pytest.importorskip("llama_index.core")
+
+    class CountingEmbedding(core.MockEmbedding):
+        texts: int = 0
+
+        def _get_text_embeddings(self, texts):
+            self.texts += len(texts)
+            return [[float(len(text) % 7), float(text.count("a")), 1.0] for text in texts]
+
+        def _get_query_embedding(self, query):
+            return [float(len(query) % 7), float(query.count("a")), 1.0]
+
+    embed_model = CountingEmbedding(embed_dim=3)
+    retriever = FAQRetriever(ENTRIES, backend="llamaindex", embed_model=embed_model, use_embedding_cache=False)
+    assert retriever.backend == "llamaindex"
+    for version in range(3):
+        embedded = embed_model.texts
+        candidates = retriever.retrieve_top_k("charged twice", k=4, category="bug")
+        assert embed_model.texts == embedded
+        assert {candidate.entry["category"] for candidate in candidates} <= {"bug"} | GLOBAL_CATEGORIES
+        retriever.reload([dict(entry, body=f"{entry['body']} v{version}") if entry["id"] == "5" else entry for entry in ENTRIES])
@@ -0,0 +1,128 @@
+"""ReviewDeduplicator: signature parity, exact and near-duplicate matching, and eviction."""
+from __future__ import annotations
+
+import pytest
+
+import dedup
+from benchmarks.synthetic import iter_review_shapes
+from dedup import DEFAULT_NUM_PERM, MIN_SIGNATURE_CHARS, SIGN_GROUP_CHARS, SIGNATURE_CHARS, ReviewDeduplicator
+
+REVIEW = (
+    "The app keeps crashing whenever I try to upload a photo from my gallery, "
+    "and support never answered my emails about it."
+)
+TWEAKS = [
+    REVIEW.replace("crashing", "crashng"),
+    REVIEW + " Please fix!!",
+    REVIEW.replace("photo", "picture"),
+    "Honestly, " + REVIEW,
+]
+
+
+def signature_texts():
+    texts = [review["text"] for review in iter_review_shapes(300)]
+    texts += [REVIEW, *TWEAKS, "x" * MIN_SIGNATURE_CHARS, "é🙂 ünïcode ✓ review text here", REVIEW * 10]
+    # Enough text to span several NumPy signing groups.
+    texts += [f"{REVIEW} number {number}" for number in range(SIGN_GROUP_CHARS // len(REVIEW) * 3)]
+    return texts
+
+
+def test_numpy_and_python_signatures_are_identical():
+    if not dedup.NUMPY_AVAILABLE:
+        pytest.skip("NumPy is not installed")
+    deduplicator = ReviewDeduplicator()
+    fingerprints = [deduplicator.fingerprint(text) for text in signature_texts()]
+    deduplicator.sign_many(fingerprints)
+    assert any(fingerprint.signature is None for fingerprint in fingerprints)
+    for fingerprint in fingerprints:
+        if len(fingerprint.text) >= MIN_SIGNATURE_CHARS:
+            assert fingerprint.signature == deduplicator._python_signature(fingerprint.text[:SIGNATURE_CHARS])
+        else:
+            assert fingerprint.signature is None
+
+
+def test_pure_python_signing_without_numpy(monkeypatch):
+    monkeypatch.setattr(dedup, "NUMPY_AVAILABLE", False)
+    deduplicator = ReviewDeduplicator()
+    short, long = deduplicator.fingerprint("too short"), deduplicator.fingerprint(REVIEW)
+    deduplicator.sign_many([short, long])
+    assert (short.signed, short.signature) == (True, None)
+    assert len(long.signature) == deduplicator.num_perm
+
+
+def test_exact_duplicates_match_after_normalization():
+    deduplicator = ReviewDeduplicator()
+    deduplicator.add(deduplicator.fingerprint("Great app!"), "first")
+    for variant in ("great app", "  GREAT   app!!! ", "...Great App"):
+        assert deduplicator.find(deduplicator.fingerprint(variant)) == "first"
+    assert deduplicator.exact_hits == 3
+    # Too short for a signature, so only exact matches count.
+    assert deduplicator.find(deduplicator.fingerprint("Great apps")) is None
+    assert deduplicator.near_hits == 0
+
+
+def agreement(deduplicator, first, second):
+    fingerprints = [deduplicator.fingerprint(first), deduplicator.fingerprint(second)]
+    deduplicator.sign_many(fingerprints)
+    signatures = [fingerprint.signature for fingerprint in fingerprints]
+    shared_band = set(deduplicator._band_keys(signatures[0])) & set(deduplicator._band_keys(signatures[1]))
+    return sum(a == b for a, b in zip(*signatures)), bool(shared_band)
+
+
+@pytest.mark.parametrize("tweak", TWEAKS)
+def test_tweaked_reviews_are_lsh_candidates_and_match(tweak):
+    deduplicator = ReviewDeduplicator()
+    deduplicator.add(deduplicator.fingerprint(REVIEW), "canonical")
+    agreed, shared_band = agreement(deduplicator, REVIEW, tweak)
+    assert shared_band
+    assert agreed >= deduplicator.threshold * deduplicator.num_perm
+    assert deduplicator.find(deduplicator.fingerprint(tweak)) == "canonical"
+    assert (deduplicator.exact_hits, deduplicator.near_hits) == (0, 1)
+
+
+def test_near_duplicates_match_exactly_at_the_threshold():
+    tweak = TWEAKS[1]
+    agreed, shared_band = agreement(ReviewDeduplicator(), REVIEW, tweak)
+    assert shared_band and agreed < DEFAULT_NUM_PERM
+    for threshold, expected in ((agreed / DEFAULT_NUM_PERM, "canonical"), ((agreed + 1) / DEFAULT_NUM_PERM, None)):
+        deduplicator = ReviewDeduplicator(threshold=threshold)
+        deduplicator.add(deduplicator.fingerprint(REVIEW), "canonical")
+        assert deduplicator.find(deduplicator.fingerprint(tweak)) == expected
+
+
+def test_unrelated_reviews_do_not_match():
+    deduplicator = ReviewDeduplicator()
+    deduplicator.add(deduplicator.fingerprint(REVIEW), "canonical")
+    for text in ("I love the new dark mode, the colors are great and easy on the eyes.",
+                 "Billing charged me twice this month and I want a refund right now."):
+        assert deduplicator.find(deduplicator.fingerprint(text)) is None
+
+
+def test_eviction_keeps_the_most_recently_matched():
+    deduplicator = ReviewDeduplicator(max_entries=3)
+    texts = [f"{REVIEW} Review number {number} with its own ending." for number in range(5)]
+    fingerprints = [deduplicator.fingerprint(text) for text in texts]
+    for number in range(3):
+        deduplicator.add(fingerprints[number], number)
+    assert deduplicator.find(fingerprints[0]) == 0  # 0 is now the most recently matched
+    deduplicator.add(fingerprints[3], 3)
+    deduplicator.add(fingerprints[4], 4)
+    assert len(deduplicator) == 3
+    assert set(deduplicator._entries) == {fingerprints[number].key for number in (0, 3, 4)}
+    # Band buckets only point at entries still held.
+    assert set(deduplicator._buckets.values()) <= set(deduplicator._entries)
+    for number in range(20):
+        deduplicator.add(deduplicator.fingerprint(f"another long review about sync number {number}"), None)
+        assert len(deduplicator) <= 3
+        assert set(deduplicator._buckets.values()) <= set(deduplicator._entries)
+
+
+def test_sync_forgets_everything_when_the_version_changes():
+    deduplicator = ReviewDeduplicator()
+    deduplicator.sync(1)
+    deduplicator.add(deduplicator.fingerprint(REVIEW), "canonical")
+    deduplicator.sync(1)
+    assert len(deduplicator) == 1
+    deduplicator.sync(2)
+    assert len(deduplicator) == 0
+    assert deduplicator.find(deduplicator.fingerprint(REVIEW)) is None
@@ -0,0 +1,108 @@
+"""EmbeddingCache persistence, invalid files and pruning through FAQRetriever."""
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.retriever_startup import CountingEmbedder
+from benchmarks.synthetic import synthetic_faq_entries
+from embedding_cache import EmbeddingCache
+from retrieval import FAQRetriever
+
+TEXTS = ["crash on upload", "dark mode", "refund please", "crash on upload"]
+
+
+def embed_batch(calls):
+    def embed(texts):
+        calls.append(list(texts))
+        # Exact in float32, so vectors read back compare equal.
+        return [[len(text) / 4, text.count(" ") / 2, 0.25] for text in texts]
+
+    return embed
+
+
+def test_round_trip(tmp_path):
+    calls = []
+    cache = EmbeddingCache("model/a", str(tmp_path))
+    vectors = cache.embed(TEXTS, embed_batch(calls))
+    assert calls == [TEXTS[:3]]
+    cache.save()
+
+    reloaded = EmbeddingCache("model/a", str(tmp_path))
+    assert len(reloaded) == 3
+    assert reloaded.embed(TEXTS, embed_batch(calls)) == vectors
+    assert len(calls) == 1
+    assert (reloaded.hits, reloaded.misses) == (4, 0)
+
+
+def test_another_model_sharing_the_file_name_starts_empty(tmp_path):
+    cache = EmbeddingCache("model/a", str(tmp_path))
+    cache.embed(TEXTS, embed_batch([]))
+    cache.save()
+    other = EmbeddingCache("model_a", str(tmp_path))
+    assert other.path == cache.path
+    assert len(other) == 0
+
+
+@pytest.mark.parametrize(
+    "damage",
+    [
+        lambda data: data[: len(data) - 5],
+        lambda data: data[: data.index(b"\n") // 2],
+        lambda data: b"\x00\xffnot json\n" + data,
+        lambda data: b"",
+    ],
+    ids=["truncated-vectors", "truncated-header", "corrupt-header", "empty"],
+)
+def test_damaged_file_is_ignored_and_rewritten(tmp_path, damage):
+    cache = EmbeddingCache("model", str(tmp_path))
+    vectors = cache.embed(TEXTS, embed_batch([]))
+    cache.save()
+    cache.path.write_bytes(damage(cache.path.read_bytes()))
+
+    calls = []
+    damaged = EmbeddingCache("model", str(tmp_path))
+    assert len(damaged) == 0
+    assert damaged.embed(TEXTS, embed_batch(calls)) == vectors
+    assert calls == [TEXTS[:3]]
+    damaged.save()
+    assert len(EmbeddingCache("model", str(tmp_path))) == 3
+
+
+def test_prune_keeps_what_live_owners_use(tmp_path):
+    class Owner:
+        pass
+
+    first, second = Owner(), Owner()
+    cache = EmbeddingCache("model", str(tmp_path))
+    cache.embed(TEXTS, embed_batch([]))
+    cache.prune(TEXTS[:2], owner=first)
+    assert len(cache) == 2
+    cache.prune(TEXTS[1:2], owner=second)
+    assert len(cache) == 2
+    del first
+    cache.prune(TEXTS[1:2], owner=second)
+    assert len(cache) == 1
+    cache.prune([])
+    assert len(cache) == 0
+
+
+def test_retriever_rebuild_drops_removed_entries_from_the_file(tmp_path):
+    entries = synthetic_faq_entries(40)
+    FAQRetriever(entries, embed_model=CountingEmbedder(16, 0), embedding_cache_dir=str(tmp_path), backend="numpy")
+    embedder = CountingEmbedder(16, 0)
+    retriever = FAQRetriever(
+        entries[:30], embed_model=embedder, embedding_cache_dir=str(tmp_path), backend="numpy"
+    )
+    assert embedder.texts == 0
+    assert len(EmbeddingCache(retriever.embedding_cache.model_name, str(tmp_path))) == 30
+
+
+def test_retrievers_sharing_a_cache_keep_each_others_vectors(tmp_path):
+    entries = synthetic_faq_entries(40)
+    cache = EmbeddingCache("CountingEmbedder:counting", str(tmp_path))
+    kept = FAQRetriever(
+        entries[:20], embed_model=CountingEmbedder(16, 0), embedding_cache=cache, backend="numpy"
+    )
+    FAQRetriever(entries[20:], embed_model=CountingEmbedder(16, 0), embedding_cache=cache, backend="numpy")
+    assert kept.embedding_cache is cache
+    assert len(EmbeddingCache(cache.model_name, str(tmp_path))) == 40
@@ -0,0 +1,206 @@
+"""OpenAI embeddings client and coalescer, against the local stub server."""
+from __future__ import annotations
+
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+from benchmarks.stub_embedding_server import StubEmbeddingServer, stub_vector
+from embedding_client import EMBEDDING_REQUESTS, CoalescingEmbedder, EmbeddingRequestError, OpenAIEmbeddingClient
+
+DIM = 8
+
+
+@pytest.fixture(scope="module")
+def stub():
+    server = StubEmbeddingServer(("127.0.0.1", 0), dim=DIM, latency=0.01).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def server(stub):
+    # Shutting a server down waits out its poll interval, so tests share one and reset its counts.
+    stub.requests = stub.texts = 0
+    yield stub
+    stub._failures.clear()
+
+
+def make_client(server, **kwargs):
+    kwargs.setdefault("backoff", 0.001)
+    return OpenAIEmbeddingClient(api_key="test", api_base=server.base_url, **kwargs)
+
+
+def vectors(texts):
+    return [stub_vector(text, DIM) for text in texts]
+
+
+def test_client_embeds_in_order(server):
+    client = make_client(server)
+    try:
+        assert client.embed(["crash", "dark mode", "refund"]) == vectors(["crash", "dark mode", "refund"])
+        # Newlines are replaced as LlamaIndex's OpenAIEmbedding does.
+        assert client.embed(["line one\nline two"]) == vectors(["line one line two"])
+    finally:
+        client.close()
+    assert server.requests == 2
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503])
+def test_retryable_statuses_are_retried(server, status):
+    server.fail_next(status, count=2)
+    retries = EMBEDDING_REQUESTS.value(outcome="retry")
+    client = make_client(server)
+    try:
+        assert client.embed(["crash"]) == vectors(["crash"])
+    finally:
+        client.close()
+    assert server.requests == 3
+    assert EMBEDDING_REQUESTS.value(outcome="retry") - retries == 2
+
+
+def test_retry_after_is_honoured(server):
+    server.fail_next(429, retry_after="0.2")
+    client = make_client(server)
+    started = time.monotonic()
+    try:
+        assert client.embed(["crash"]) == vectors(["crash"])
+    finally:
+        client.close()
+    assert time.monotonic() - started >= 0.2
+
+
+def test_backoff_grows_exponentially(server, monkeypatch):
+    delays = []
+    caller = threading.get_ident()
+    sleep = time.sleep
+
+    def record_sleep(seconds):
+        # The stub server shares the time module; only the client's waits are recorded.
+        if threading.get_ident() == caller:
+            delays.append(seconds)
+        else:
+            sleep(seconds)
+
+    monkeypatch.setattr("embedding_client.time.sleep", record_sleep)
+    monkeypatch.setattr("embedding_client.random.random", lambda: 0.5)
+    server.fail_next(503, count=3)
+    client = make_client(server, backoff=0.1, retries=3)
+    try:
+        client.embed(["crash"])
+    finally:
+        client.close()
+    assert delays == pytest.approx([0.1, 0.2, 0.4])
+
+
+def test_exhausted_retries_raise(server):
+    server.fail_next(500, count=3)
+    client = make_client(server, retries=2)
+    try:
+        with pytest.raises(EmbeddingRequestError, match="after 3 attempts"):
+            client.embed(["crash"])
+    finally:
+        client.close()
+    assert server.requests == 3
+
+
+def test_client_errors_are_not_retried(server):
+    server.fail_next(400)
+    client = make_client(server)
+    try:
+        with pytest.raises(EmbeddingRequestError, match="HTTP 400"):
+            client.embed(["crash"])
+    finally:
+        client.close()
+    assert server.requests == 1
+
+
+def test_connection_errors_are_retried():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    client = OpenAIEmbeddingClient(api_key="test", api_base=f"http://127.0.0.1:{port}/v1", retries=1, backoff=0.001)
+    with pytest.raises(EmbeddingRequestError, match="after 2 attempts"):
+        client.embed(["crash"])
+
+
+def test_concurrent_callers_get_their_own_vectors_in_order(server):
+    embedder = CoalescingEmbedder(make_client(server), max_batch_size=16, max_wait=0.02, max_concurrency=2)
+    callers = 24
+    start = threading.Barrier(callers)
+    results = {}
+
+    def call(number):
+        texts = [f"review {number}", f"shared {number % 3}", f"review {number} again"]
+        start.wait()
+        results[number] = (texts, embedder.embed(texts))
+
+    threads = [threading.Thread(target=call, args=(number,)) for number in range(callers)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+    finally:
+        embedder.close()
+    assert len(results) == callers
+    for texts, got in results.values():
+        assert got == vectors(texts)
+    # Coalesced into far fewer requests than callers, each within the batch limit.
+    assert server.requests < callers
+    assert embedder.stats()["texts"] == callers * 3
+    assert server.texts == callers * 3 - embedder.deduplicated
+
+
+def test_async_callers_are_coalesced(server):
+    embedder = CoalescingEmbedder(make_client(server), max_wait=0.02)
+
+    async def main():
+        return await asyncio.gather(*(embedder.aembed([f"query {number}"]) for number in range(10)))
+
+    try:
+        got = asyncio.run(main())
+    finally:
+        embedder.close()
+    assert got == [vectors([f"query {number}"]) for number in range(10)]
+    assert server.requests < 10
+
+
+def test_duplicates_are_sent_once(server):
+    embedder = CoalescingEmbedder(make_client(server), max_wait=0.02)
+    try:
+        texts = ["crash", "refund", "crash", "crash", "refund"]
+        assert embedder.embed(texts) == vectors(texts)
+    finally:
+        embedder.close()
+    assert (server.requests, server.texts) == (1, 2)
+    assert embedder.deduplicated == 3
+
+
+def test_failures_reach_every_waiter(server):
+    server.fail_next(500)
+    embedder = CoalescingEmbedder(make_client(server, retries=0), max_wait=0.05)
+    try:
+        # Two callers share one failing request.
+        futures = embedder.submit(["a", "b", "a"]) + embedder.submit(["c", "d"])
+        for future in futures:
+            with pytest.raises(EmbeddingRequestError, match="HTTP 500"):
+                future.result(10)
+        # The coalescer keeps serving once the API recovers.
+        assert embedder.embed(["a"]) == vectors(["a"])
+    finally:
+        embedder.close()
+    assert server.requests == 2
+
+
+def test_close_sends_what_is_queued(server):
+    embedder = CoalescingEmbedder(make_client(server), max_wait=10)
+    futures = embedder.submit(["crash", "refund"])
+    embedder.close()
+    assert [future.result(1) for future in futures] == vectors(["crash", "refund"])
+    with pytest.raises(RuntimeError):
+        embedder.submit(["late"])
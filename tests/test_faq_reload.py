@@ -0,0 +1,189 @@
+"""FAQ hot reload: incremental updates must answer exactly like a freshly built retriever."""
+from __future__ import annotations
+
+import json
+import random
+import time
+import zlib
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import iter_review_shapes, synthetic_faq_entries
+from retrieval import FAQRetriever
+
+QUERIES = [review["text"] for review in iter_review_shapes(60)] + ["dark mode", "refund", ""]
+
+
+class SeededEmbedder:
+    """A random vector per text, seeded by its CRC32; blank text embeds to zeros, so every entry ties.
+
+    Unlike the hashing embedder, whose IDF weights only change on full
+    builds, a text's vector never depends on the rest of the FAQ base.
+    """
+
+    model_name = "seeded"
+
+    def embed(self, texts):
+        return [
+            np.random.default_rng(zlib.crc32(text.encode("utf-8"))).standard_normal(32) if text.strip() else np.zeros(32)
+            for text in texts
+        ]
+
+
+def make_retriever(entries, backend, **kwargs):
+    embed_model = SeededEmbedder() if backend == "numpy" else None
+    return FAQRetriever(entries, backend=backend, embed_model=embed_model, use_embedding_cache=False, **kwargs)
+
+
+def random_edit(rng, entries, serial):
+    """A new FAQ list with a few entries edited, removed and added."""
+    edited = [dict(entry) for entry in entries]
+    for entry in rng.sample(edited, min(3, len(edited))):
+        entry["body"] = f"{entry['body']} {rng.choice(['crash', 'refund', 'login', 'sync', 'dark mode'])}"
+        if rng.random() < 0.3:
+            entry["category"] = rng.choice(["bug", "billing", "praise", "general"])
+    for _ in range(rng.randint(0, 3)):
+        if len(edited) > 5:
+            edited.pop(rng.randrange(len(edited)))
+    for number in range(rng.randint(0, 4)):
+        title = " ".join(rng.sample(["Upload", "fails", "billing", "password", "export", "widget", "lag"], 3))
+        edited.insert(rng.randrange(len(edited) + 1), {
+            "id": f"new-{serial}-{number}", "category": rng.choice(["bug", "billing", "feature request"]),
+            "title": title, "body": f"{title} answer {serial}",
+        })
+    return edited
+
+
+def assert_matches_fresh(retriever, backend):
+    fresh = make_retriever(list(retriever.faq_entries), backend)
+    for query in QUERIES:
+        for category in (None, "bug"):
+            assert retriever.retrieve(query, category) == fresh.retrieve(query, category)
+            got = retriever.retrieve_top_k(query, 5, category)
+            want = fresh.retrieve_top_k(query, 5, category)
+            assert [candidate.entry for candidate in got] == [candidate.entry for candidate in want]
+            assert [candidate.score for candidate in got] == pytest.approx([candidate.score for candidate in want])
+    assert retriever.retrieve_batch(QUERIES) == fresh.retrieve_batch(QUERIES)
+
+
+@pytest.mark.parametrize("backend", ["keyword", "numpy"])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_random_edit_sequences_match_a_fresh_build(backend, seed):
+    rng = random.Random(seed)
+    entries = synthetic_faq_entries(60, seed=seed)
+    retriever = make_retriever(entries, backend)
+    assert retriever.backend == backend
+    kinds = set()
+    for serial in range(12):
+        # Warm the query cache so a stale answer would show up after the reload.
+        retriever.retrieve_batch(QUERIES[:20])
+        entries = random_edit(rng, entries, serial)
+        if serial % 3 == 2:
+            current = {entry["id"]: entry for entry in retriever.faq_entries}
+            wanted = {entry["id"]: entry for entry in entries}
+            upserts = [entry for entry_id, entry in wanted.items() if current.get(entry_id) != entry]
+            stats = retriever.update(upserts, [entry_id for entry_id in current if entry_id not in wanted])
+        else:
+            stats = retriever.reload(entries)
+        kinds.add(stats["full_rebuild"])
+        assert stats["version"] == retriever.snapshot.version
+        assert sorted(retriever.faq_entries, key=lambda entry: entry["id"]) == sorted(
+            entries, key=lambda entry: entry["id"]
+        )
+        assert_matches_fresh(retriever, backend)
+    assert False in kinds
+
+
+@pytest.mark.parametrize("backend", ["keyword", "numpy"])
+def test_a_held_snapshot_is_unaffected_by_a_reload(backend):
+    entries = synthetic_faq_entries(40)
+    retriever = make_retriever(entries, backend)
+    held = retriever.snapshot
+    before_entries = list(held.entries)
+    before = [retriever._keyword_lookup(held, query, None) for query in QUERIES]
+    if backend == "numpy":
+        matrix = held.vector_index.matrix.copy()
+        vector_before = retriever._vector_positions(held, QUERIES)
+
+    edited = [dict(entry, body="completely different text") for entry in entries[:20]] + entries[25:]
+    retriever.reload(edited)
+    assert retriever.snapshot is not held
+    assert held.entries == before_entries
+    assert [retriever._keyword_lookup(held, query, None) for query in QUERIES] == before
+    if backend == "numpy":
+        assert (held.vector_index.matrix == matrix).all()
+        assert retriever._vector_positions(held, QUERIES) == vector_before
+
+
+def test_cached_answers_are_invalidated_by_reload():
+    entries = [
+        {"id": "1", "category": "bug", "title": "App crashes on upload", "body": "Update the app."},
+        {"id": "2", "category": "billing", "title": "Charged twice", "body": "We refund double charges."},
+        {"id": "3", "category": "bug", "title": "Dark mode", "body": "Dark mode is in settings."},
+    ]
+    retriever = make_retriever(entries, "keyword")
+    assert retriever.retrieve("charged twice") is entries[1]
+    assert retriever.retrieve("charged twice") is entries[1]
+    assert retriever.query_cache.hits == 1
+    generation = retriever.query_cache.generation
+
+    edited = dict(entries[1], body="Refunds arrive within five days.")
+    retriever.reload([entries[0], edited, entries[2]])
+    assert retriever.query_cache.generation > generation
+    assert len(retriever.query_cache) == 0
+    assert retriever.retrieve("charged twice") is edited
+
+    retriever.reload([entries[0], entries[2]])
+    assert retriever.retrieve("charged twice") is not edited
+    retriever.update([dict(edited, id="4")])
+    assert retriever.retrieve("charged twice")["id"] == "4"
+
+
+def test_check_for_updates_reloads_only_changed_content(tmp_path):
+    path = tmp_path / "faq.json"
+    entries = synthetic_faq_entries(20)
+    path.write_text(json.dumps(entries), encoding="utf-8")
+    retriever = FAQRetriever(backend="keyword", faq_path=str(path))
+    assert retriever.check_for_updates() is None
+
+    # Rewriting the same bytes changes the mtime but not the digest.
+    path.write_text(json.dumps(entries), encoding="utf-8")
+    assert retriever.check_for_updates() is None
+    assert retriever.snapshot.version == 0
+
+    entries[3] = dict(entries[3], body="edited body")
+    path.write_text(json.dumps(entries), encoding="utf-8")
+    stats = retriever.check_for_updates()
+    assert (stats["updated"], stats["added"], stats["removed"], stats["full_rebuild"]) == (1, 0, 0, False)
+    assert retriever.faq_entries[3]["body"] == "edited body"
+
+
+def test_watcher_picks_up_edits_and_survives_bad_files(tmp_path):
+    path = tmp_path / "faq.json"
+    entries = synthetic_faq_entries(20)
+    path.write_text(json.dumps(entries), encoding="utf-8")
+    retriever = FAQRetriever(backend="keyword", faq_path=str(path))
+    retriever.start_watching(interval=0.01)
+    try:
+        path.write_text("[{not json", encoding="utf-8")
+        time.sleep(0.1)
+        assert retriever.snapshot.version == 0
+        path.write_text(json.dumps(entries[:10]), encoding="utf-8")
+        deadline = time.monotonic() + 5
+        while retriever.snapshot.version == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert retriever.faq_entries == entries[:10]
+    finally:
+        retriever.stop_watching()
+
+
+def test_watching_needs_a_file():
+    with pytest.raises(ValueError):
+        FAQRetriever(synthetic_faq_entries(5), backend="keyword").start_watching()
+
+
+def test_empty_reload_is_refused():
+    retriever = make_retriever(synthetic_faq_entries(5), "keyword")
+    with pytest.raises(ValueError):
+        retriever.reload([])
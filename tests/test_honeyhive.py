@@ -0,0 +1,323 @@
+"""HoneyHive evaluation and tracing: batch scoring parity, the ScoringWorker and span export."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import types
+import uuid
+from pathlib import Path
+
+import pytest
+
+import honeyhive
+from benchmarks.synthetic import synthetic_reviews
+from honeyhive import (
+    METRIC_NAMES, HoneyHiveEvaluator, ScoringWorker, SpanExporter, configure_tracing, span_exporter, trace,
+)
+from metrics import stage_histogram
+from pipeline import AiriaPipeline
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CRASH_ENTRY = {"id": "1", "category": "bug", "title": "App crash on upload", "body": "Update to fix the crash."}
+
+
+def scoring_triples():
+    """Pipeline output plus hand-written rows reaching every scoring branch."""
+    pipeline = AiriaPipeline(enable_honeyhive=False)
+    triples = [
+        (result.review["text"], result.response, result.faq_entry)
+        for result in pipeline.run_batch(synthetic_reviews(200))
+    ]
+    words = "word " * 30
+    triples += [
+        ("", "", None),
+        ("It crashes on upload", "Sorry about the crash!", CRASH_ENTRY),
+        ("It crashes on upload", "Thanks for writing.", {"body": "Nothing relevant."}),
+        ("crash and lag and billing", f"We apologize. {words}", dict(CRASH_ENTRY, title="")),
+        ("love it", "word " * 151, CRASH_ENTRY),
+        ("slow login", "word " * 101, None),
+        ("CRASH", "Crash fixed!", CRASH_ENTRY),
+    ]
+    return triples
+
+
+@pytest.mark.parametrize("numpy_available", [True, False], ids=["numpy", "pure-python"])
+def test_score_batch_matches_score_field_by_field(monkeypatch, numpy_available):
+    monkeypatch.setattr(honeyhive, "NUMPY_AVAILABLE", numpy_available)
+    evaluator = HoneyHiveEvaluator()
+    triples = scoring_triples()
+    batch = evaluator.score_batch(*zip(*triples))
+    assert len(batch) == len(triples)
+    if not numpy_available:
+        assert all(isinstance(getattr(batch, name), list) for name in METRIC_NAMES)
+    expected = [evaluator.score(*triple) for triple in triples]
+    for row, (got, want) in enumerate(zip(batch.scores(), expected)):
+        for name in (*METRIC_NAMES, "notes"):
+            assert getattr(got, name) == getattr(want, name), (row, name, triples[row])
+    assert evaluator.score_many(*zip(*triples)) == expected
+
+
+def test_scoring_worker_drains_in_batches_and_calls_back():
+    evaluator = HoneyHiveEvaluator()
+    triples = scoring_triples()[:50]
+    batches = []
+    score_many = evaluator.score_many
+
+    def counting_score_many(*columns):
+        batches.append(len(columns[0]))
+        return score_many(*columns)
+
+    evaluator.score_many = counting_score_many
+    worker = ScoringWorker(evaluator, batch_size=8, flush_interval=0.01)
+    try:
+        scores = [None] * len(triples)
+        for row, triple in enumerate(triples):
+            assert worker.submit(*triple, callback=lambda score, row=row: scores.__setitem__(row, score))
+        worker.flush()
+        assert worker.pending == 0
+        assert worker.scored == len(triples)
+        assert scores == [evaluator.score(*triple) for triple in triples]
+        assert sum(batches) == len(triples)
+        assert max(batches) <= 8
+    finally:
+        worker.shutdown()
+
+
+def test_a_full_scoring_queue_drops_instead_of_blocking():
+    evaluator = HoneyHiveEvaluator()
+    release = threading.Event()
+    score_many = evaluator.score_many
+
+    def blocked_score_many(*columns):
+        release.wait(5)
+        return score_many(*columns)
+
+    evaluator.score_many = blocked_score_many
+    worker = ScoringWorker(evaluator, batch_size=1, flush_interval=0.01, max_queue=2)
+    try:
+        dropped_before = honeyhive.EVALUATIONS_DROPPED.value()
+        accepted = [worker.submit("crash", "Sorry!", None, callback=lambda score: None) for _ in range(10)]
+        # At most one review is being scored and two wait in the queue.
+        assert 2 <= sum(accepted) <= 3
+        assert worker.dropped == accepted.count(False)
+        assert honeyhive.EVALUATIONS_DROPPED.value() - dropped_before == worker.dropped
+    finally:
+        release.set()
+        worker.flush()
+        worker.shutdown()
+    assert worker.scored == sum(accepted)
+
+
+def test_failing_batches_are_counted_and_the_worker_keeps_going():
+    evaluator = HoneyHiveEvaluator()
+    worker = ScoringWorker(evaluator, batch_size=4, flush_interval=0.01)
+    scores = []
+    try:
+        worker.submit("crash", "Sorry!", None, callback=lambda score: 1 / 0)
+        worker.flush()
+        assert worker.failed_batches == 1
+        worker.submit("crash", "Sorry!", None, callback=scores.append)
+        worker.flush()
+        assert scores == [evaluator.score("crash", "Sorry!", None)]
+    finally:
+        worker.shutdown()
+
+
+def test_background_scores_are_attached_and_logged(caplog):
+    pipeline = AiriaPipeline(background_scoring=True)
+    review = synthetic_reviews(1)[0]
+    try:
+        with caplog.at_level(logging.INFO, logger="pipeline"):
+            result = pipeline.run(review)
+            pipeline.scoring_worker.flush()
+    finally:
+        pipeline.scoring_worker.shutdown()
+    assert result.honeyhive_score == pipeline.honeyhive.score(review["text"], result.response, result.faq_entry)
+    assert any(
+        record.name == "pipeline" and str(review["id"]) in record.getMessage() for record in caplog.records
+    )
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    """Export every span of this test into a list, restoring the tracing setup afterwards."""
+    monkeypatch.setattr(honeyhive, "_sample_rate", honeyhive._sample_rate)
+    monkeypatch.setattr(honeyhive, "_exporter", None)
+    exported = []
+    exporter = SpanExporter(exported.extend, flush_interval=0.01)
+    configure_tracing(sample_rate=1.0, exporter=exporter)
+    yield exported
+    exporter.shutdown()
+
+
+@trace(name="test_child")
+def traced_child(fail=False):
+    if fail:
+        raise ValueError("boom")
+    return "child"
+
+
+@trace(name="test_root")
+def traced_root(fail=False):
+    return traced_child(fail)
+
+
+def test_nested_spans_share_a_trace(spans):
+    assert traced_root() == "child"
+    span_exporter().flush()
+    child, root = spans
+    assert (child["name"], root["name"]) == ("test_child", "test_root")
+    assert child["trace_id"] == root["trace_id"]
+    assert child["parent_id"] == root["span_id"]
+    assert root["parent_id"] is None
+    assert root["start_time_ms"] <= child["start_time_ms"]
+    assert child["error"] is None
+
+
+def test_errors_are_recorded_on_their_spans(spans):
+    with pytest.raises(ValueError):
+        traced_root(fail=True)
+    span_exporter().flush()
+    assert [span["error"] for span in spans] == ["ValueError('boom')"] * 2
+
+
+def test_sampling_decides_per_trace(spans, monkeypatch):
+    configure_tracing(sample_rate=0.0)
+    for _ in range(5):
+        traced_root()
+    span_exporter().flush()
+    assert spans == []
+
+    configure_tracing(sample_rate=0.5)
+    draws = iter([0.4, 0.6, 0.1])
+    monkeypatch.setattr(honeyhive, "random", types.SimpleNamespace(random=lambda: next(draws)))
+    for _ in range(3):
+        traced_root()
+    span_exporter().flush()
+    # Sampled roots export their children too; unsampled traces export nothing.
+    assert [span["name"] for span in spans] == ["test_child", "test_root"] * 2
+    assert len({span["trace_id"] for span in spans}) == 2
+
+
+def test_timing_is_recorded_whether_or_not_a_trace_is_sampled(spans):
+    configure_tracing(sample_rate=0.0)
+    histogram = stage_histogram("test_root")
+    before = histogram.count
+    traced_root()
+    assert histogram.count == before + 1
+
+
+def test_a_full_export_queue_drops_instead_of_blocking():
+    release = threading.Event()
+    delivered = []
+
+    def blocked_sink(batch):
+        release.wait(5)
+        delivered.extend(batch)
+
+    exporter = SpanExporter(blocked_sink, batch_size=1, flush_interval=0.01, max_queue=2)
+    try:
+        started = time.monotonic()
+        for number in range(10):
+            exporter.submit({"number": number})
+        assert time.monotonic() - started < 1
+        # At most one span is with the sink and two wait in the queue.
+        assert 7 <= exporter.dropped <= 8
+    finally:
+        release.set()
+        exporter.flush()
+        exporter.shutdown()
+    assert exporter.exported == len(delivered) == 10 - exporter.dropped
+
+
+def test_flush_waits_for_the_sink_and_failures_are_counted():
+    batches = []
+
+    def sink(batch):
+        if not batches:
+            batches.append(None)
+            raise RuntimeError("HoneyHive is down")
+        time.sleep(0.05)
+        batches.append(list(batch))
+
+    exporter = SpanExporter(sink, batch_size=4, flush_interval=0.5)
+    try:
+        exporter.submit({"number": 0})
+        exporter.flush()
+        assert exporter.failed_batches == 1
+        for number in range(1, 10):
+            exporter.submit({"number": number})
+        exporter.flush()
+        assert [span["number"] for batch in batches[1:] for span in batch] == list(range(1, 10))
+        assert all(len(batch) <= 4 for batch in batches[1:])
+        assert exporter.exported == 9
+    finally:
+        exporter.shutdown()
+
+
+def test_the_export_thread_starts_with_the_first_span():
+    exporter = SpanExporter(lambda batch: None)
+    assert exporter._thread is None
+    exporter.flush()
+    exporter.shutdown()
+    exporter.submit({"number": 0})
+    assert exporter._thread.is_alive()
+    exporter.shutdown()
+    assert not exporter._thread.is_alive()
+
+
+def test_importing_with_an_api_key_starts_no_thread():
+    code = (
+        "import threading, honeyhive\n"
+        "assert honeyhive.span_exporter() is not None\n"
+        "assert 'honeyhive-exporter' not in [thread.name for thread in threading.enumerate()]\n"
+    )
+    env = dict(os.environ, HONEYHIVE_API_KEY="test-key", HONEYHIVE_EXPORT="1")
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True)
+
+
+def test_sink_posts_honeyhive_events(spans, monkeypatch):
+    traced_root()
+    span_exporter().flush()
+    posted = []
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+    def post(url, **kwargs):
+        posted.append((url, kwargs))
+        return Response()
+
+    monkeypatch.setitem(sys.modules, "requests", types.SimpleNamespace(post=post))
+    monkeypatch.setattr(honeyhive, "api_key", "test-key")
+    honeyhive.honeyhive_sink(spans)
+
+    (url, kwargs), = posted
+    assert url == f"{honeyhive.HONEYHIVE_API_URL}/events/batch"
+    assert kwargs["headers"] == {"Authorization": "Bearer test-key"}
+    assert kwargs["timeout"] > 0
+    child, root = kwargs["json"]["events"]
+    for event, span in ((child, spans[0]), (root, spans[1])):
+        assert set(event) == {
+            "project", "source", "event_type", "event_name", "event_id", "session_id", "parent_id",
+            "start_time", "end_time", "duration", "error", "config", "inputs", "outputs",
+        }
+        assert event["project"] == honeyhive.HONEYHIVE_PROJECT
+        assert event["event_name"] == span["name"]
+        assert event["event_type"] in {"model", "tool", "chain"}
+        for key in ("event_id", "session_id", "parent_id"):
+            assert str(uuid.UUID(event[key])) == event[key]
+        assert event["end_time"] == pytest.approx(event["start_time"] + event["duration"])
+        assert event["duration"] == span["duration_ms"]
+        json.dumps(event)
+    assert child["session_id"] == root["session_id"] == str(uuid.UUID(spans[1]["trace_id"]))
+    assert child["parent_id"] == root["event_id"]
+    # Top-level spans hang off the session.
+    assert root["parent_id"] == root["session_id"]
@@ -0,0 +1,200 @@
+"""Job queue backends: admission, claiming, completion, failure and SQLite recovery."""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from benchmarks.synthetic import synthetic_reviews
+from job_queue import JOB_REVIEWS, JobQueue, JobWorkers, MemoryJobQueue, QueueFull, SQLiteJobQueue
+from pipeline import AiriaPipeline
+
+REVIEWS = synthetic_reviews(12)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_queue(request, tmp_path):
+    queues = []
+
+    def make(max_pending=100):
+        if request.param == "memory":
+            queue = MemoryJobQueue(max_pending)
+        else:
+            queue = SQLiteJobQueue(str(tmp_path / "jobs.sqlite3"), max_pending)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close()
+
+
+def _result(review):
+    return {"echo": review["id"]}
+
+
+def test_incomplete_backends_cannot_be_instantiated():
+    class Partial(JobQueue):
+        def submit(self, reviews, app_id=None):
+            return ""
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_submit_claim_complete(make_queue):
+    queue = make_queue()
+    job_id = queue.submit(REVIEWS[:5])
+    assert queue.pending == 5
+    assert queue.get(job_id)["status"] == "queued"
+
+    app_id, items = queue.claim(3)
+    assert app_id is None
+    assert [(job, position) for job, position, _ in items] == [(job_id, 0), (job_id, 1), (job_id, 2)]
+    assert [review for _, _, review in items] == REVIEWS[:3]
+    assert queue.get(job_id)["status"] == "running"
+
+    queue.complete(items, [_result(review) for _, _, review in items])
+    job = queue.get(job_id)
+    assert (job["status"], job["completed"], queue.pending) == ("running", 3, 2)
+    assert job["results"] == [_result(review) for review in REVIEWS[:3]] + [None, None]
+
+    _, items = queue.claim(10)
+    assert len(items) == 2
+    queue.complete(items, [_result(review) for _, _, review in items])
+    job = queue.get(job_id)
+    assert (job["status"], queue.pending) == ("done", 0)
+    assert job["results"] == [_result(review) for review in REVIEWS[:5]]
+    assert job["finished_at"] is not None
+
+
+def test_claims_are_fifo_and_one_app_at_a_time(make_queue):
+    queue = make_queue()
+    first = queue.submit(REVIEWS[:2], app_id="a")
+    second = queue.submit(REVIEWS[2:4], app_id="b")
+    third = queue.submit(REVIEWS[4:5], app_id="a")
+    claims = [queue.claim(10) for _ in range(4)]
+    assert [(app_id, [job for job, _, _ in items]) for app_id, items in claims] == [
+        ("a", [first, first]),
+        ("b", [second, second]),
+        ("a", [third]),
+        (None, []),
+    ]
+
+
+def test_full_queue_rejects_with_retry_after(make_queue):
+    queue = make_queue(max_pending=5)
+    queue.submit(REVIEWS[:4])
+    with pytest.raises(QueueFull) as rejected:
+        queue.submit(REVIEWS[:2])
+    assert rejected.value.retry_after >= 1
+    assert queue.pending == 4
+    queue.submit(REVIEWS[:1])
+    assert queue.pending == 5
+
+
+def test_invalid_job_sizes(make_queue):
+    queue = make_queue(max_pending=5)
+    with pytest.raises(ValueError):
+        queue.submit([])
+    with pytest.raises(ValueError):
+        queue.submit(REVIEWS[:6])
+
+
+def test_failed_job_frees_its_reviews_and_is_skipped(make_queue):
+    queue = make_queue()
+    failed = queue.submit(REVIEWS[:4])
+    kept = queue.submit(REVIEWS[4:6])
+    _, items = queue.claim(2)
+    queue.fail(items, "boom")
+    job = queue.get(failed)
+    assert (job["status"], job["error"], queue.pending) == ("failed", "boom", 2)
+    # Completing late results of the failed job changes nothing.
+    queue.complete(items, [_result(review) for _, _, review in items])
+    assert queue.pending == 2
+    _, items = queue.claim(10)
+    assert {job for job, _, _ in items} == {kept}
+    queue.complete(items, [_result(review) for _, _, review in items])
+    assert queue.pending == 0
+    assert queue.get(kept)["status"] == "done"
+
+
+def test_completing_after_fail_counts_only_live_reviews(make_queue):
+    queue = make_queue()
+    failed = queue.submit(REVIEWS[:3], app_id="a")
+    kept = queue.submit(REVIEWS[3:5], app_id="a")
+    _, items = queue.claim(5)
+    queue.fail(items[:1], "boom")
+    done_before = JOB_REVIEWS.value(outcome="done")
+    queue.complete(items, [_result(review) for _, _, review in items])
+    assert JOB_REVIEWS.value(outcome="done") - done_before == 2
+    assert queue.get(failed)["completed"] == 0
+    assert queue.get(failed)["results"] == [None, None, None]
+    job = queue.get(kept)
+    assert (job["status"], job["completed"], queue.pending) == ("done", 2, 0)
+    assert queue.drain_rate() > 0
+
+
+def test_claim_waits_for_a_submit(make_queue):
+    queue = make_queue()
+    started = time.monotonic()
+    assert queue.claim(5, timeout=0.05) == (None, [])
+    assert time.monotonic() - started >= 0.04
+
+
+def test_unknown_job(make_queue):
+    assert make_queue().get("missing") is None
+
+
+def test_sqlite_requeues_claimed_reviews_on_open(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    queue = SQLiteJobQueue(path)
+    job_id = queue.submit(REVIEWS[:5], app_id="app")
+    _, done = queue.claim(2)
+    queue.complete(done, [_result(review) for _, _, review in done])
+    _, in_flight = queue.claim(2)
+    queue.close()  # The process stops with two reviews claimed but unfinished.
+
+    reopened = SQLiteJobQueue(path)
+    try:
+        assert reopened.pending == 3
+        job = reopened.get(job_id)
+        assert (job["status"], job["completed"]) == ("queued", 2)
+        assert job["results"][:2] == [_result(review) for review in REVIEWS[:2]]
+        app_id, items = reopened.claim(10)
+        assert app_id == "app"
+        assert [position for _, position, _ in items] == [2, 3, 4]
+        assert [review for _, _, review in items] == REVIEWS[2:5]
+        reopened.complete(items, [_result(review) for _, _, review in items])
+        job = reopened.get(job_id)
+        assert (job["status"], reopened.pending) == ("done", 0)
+        assert job["results"] == [_result(review) for review in REVIEWS[:5]]
+    finally:
+        reopened.close()
+
+
+def test_workers_drain_jobs_through_the_pipeline(make_queue):
+    queue = make_queue()
+    pipeline = AiriaPipeline(enable_honeyhive=False)
+    routes = []
+
+    def route(app_id):
+        routes.append(app_id)
+        if app_id == "broken":
+            raise RuntimeError("no FAQ for broken")
+        return pipeline
+
+    job_id = queue.submit(REVIEWS, app_id=None)
+    broken = queue.submit(REVIEWS[:3], app_id="broken")
+    workers = JobWorkers(queue, route, workers=2, batch_size=4, poll_interval=0.01).start()
+    try:
+        deadline = time.monotonic() + 10
+        while queue.pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        workers.stop()
+    expected = [result.to_dict() for result in pipeline.run_batch(REVIEWS)]
+    assert queue.get(job_id)["results"] == expected
+    assert queue.get(job_id)["status"] == "done"
+    job = queue.get(broken)
+    assert (job["status"], job["error"]) == ("failed", "no FAQ for broken")
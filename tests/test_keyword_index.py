@@ -0,0 +1,61 @@
+"""KeywordIndex must pick exactly the entry the original linear scan picked."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmarks.keyword_retrieval import linear_scan
+from benchmarks.synthetic import CATEGORIES, iter_review_shapes, synthetic_faq_entries
+from keyword_index import KeywordIndex
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def _queries():
+    reviews = json.loads((DATA_DIR / "scraped_reviews.json").read_text(encoding="utf-8"))
+    texts = [review["text"] for review in reviews] + [review["text"] for review in iter_review_shapes(120)]
+    return texts + ["", "!!!", "DARK MODE please"]
+
+
+@pytest.mark.parametrize("category", [None, *CATEGORIES, "unknown"])
+def test_matches_linear_scan_on_synthetic_base(category):
+    entries = synthetic_faq_entries(200)
+    index = KeywordIndex(entries)
+    for query in _queries():
+        assert index.best(query, category) is linear_scan(entries, query, category)
+
+
+def test_matches_linear_scan_on_shipped_faq():
+    entries = json.loads((DATA_DIR / "faq.json").read_text(encoding="utf-8"))
+    index = KeywordIndex(entries)
+    for query in _queries():
+        for category in (None, "bug", "billing", "feature request"):
+            assert index.best(query, category) is linear_scan(entries, query, category)
+
+
+def test_nothing_scoring_returns_first_entry():
+    entries = synthetic_faq_entries(20)
+    assert KeywordIndex(entries).best("") is entries[0]
+
+
+def test_with_changes_matches_a_rebuilt_index():
+    entries = synthetic_faq_entries(150)
+    index = KeywordIndex(entries)
+    changed = list(entries)
+    removed = {3: entries[3], 10: entries[10], 0: entries[0]}
+    changed[3] = dict(entries[3], title="Dark mode billing crash", body="Login password reset.")
+    changed[10] = None
+    changed[0] = None
+    added = {3: changed[3], len(changed): {"id": "new", "category": "bug", "title": "Lag", "body": "Slow sync"}}
+    changed.append(added[len(changed)])
+    updated = index.with_changes(changed, removed, added)
+    rebuilt = KeywordIndex(changed)
+    for query in _queries():
+        for category in (None, "bug"):
+            assert updated.best_position(query, category) == rebuilt.best_position(query, category)
+            assert updated.top_positions(query, 5, category) == rebuilt.top_positions(query, 5, category)
+    # The original index is left untouched for in-flight lookups.
+    for query in _queries()[:50]:
+        assert index.best(query) is linear_scan(entries, query, None)
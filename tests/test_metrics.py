@@ -0,0 +1,153 @@
+"""Prometheus text exposition: families, histogram series and escaping."""
+from __future__ import annotations
+
+import re
+
+import pytest
+
+import metrics
+from metrics import LatencyHistogram, counter, register_collector, render_prometheus, stage_histogram
+
+PREFIX = metrics.METRIC_PREFIX
+NAME = r"[a-zA-Z_:][a-zA-Z0-9_:]*"
+LABEL_VALUE = r'"(?:[^"\\\n]|\\\\|\\"|\\n)*"'
+SAMPLE = re.compile(
+    rf"^(?P<name>{NAME})(?:\{{(?P<labels>[a-zA-Z_][a-zA-Z0-9_]*={LABEL_VALUE}"
+    rf"(?:,[a-zA-Z_][a-zA-Z0-9_]*={LABEL_VALUE})*)\}})? (?P<value>\S+)$"
+)
+LABEL = re.compile(rf"([a-zA-Z_][a-zA-Z0-9_]*)=({LABEL_VALUE})")
+UNESCAPE = {"\\\\": "\\", '\\"': '"', "\\n": "\n"}
+
+
+def unescape(text):
+    return re.sub(r'\\[\\"n]', lambda match: UNESCAPE[match.group()], text)
+
+
+def parse(text):
+    """Parse and validate an exposition; returns {family: {"type", "help", "samples"}}."""
+    assert text.endswith("\n")
+    families = {}
+    current = None
+    for line in text.splitlines():
+        assert line, "blank lines are not expected"
+        if line.startswith("# HELP "):
+            name, _, help_text = line[len("# HELP "):].partition(" ")
+            assert re.fullmatch(NAME, name)
+            assert name not in families, f"{name} declared twice"
+            assert "\n" not in help_text
+            families[name] = {"help": unescape(help_text), "type": None, "samples": []}
+            current = name
+            continue
+        if line.startswith("# TYPE "):
+            name, _, kind = line[len("# TYPE "):].partition(" ")
+            assert name == current and families[name]["type"] is None and not families[name]["samples"]
+            assert kind in {"counter", "gauge", "histogram", "summary", "untyped"}
+            families[name]["type"] = kind
+            continue
+        assert not line.startswith("#")
+        match = SAMPLE.match(line)
+        assert match, line
+        name = match["name"]
+        # Samples belong to the family declared last, and families are not interleaved.
+        family = families[current]
+        suffixes = ("_bucket", "_sum", "_count") if family["type"] == "histogram" else ("",)
+        assert any(name == current + suffix for suffix in suffixes), (current, line)
+        labels = {key: unescape(value[1:-1]) for key, value in LABEL.findall(match["labels"] or "")}
+        value = match["value"]
+        assert value in {"NaN", "+Inf", "-Inf"} or re.fullmatch(r"-?\d+(\.\d+)?(e[+-]?\d+)?", value), line
+        family["samples"].append((name, labels, float(value.replace("Inf", "inf"))))
+    return families
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Fresh, empty metric registries for one test."""
+    monkeypatch.setattr(metrics, "_STAGE_HISTOGRAMS", {})
+    monkeypatch.setattr(metrics, "_COUNTERS", {})
+    monkeypatch.setattr(metrics, "_COLLECTORS", [])
+
+
+def test_histogram_series(registry):
+    histogram = stage_histogram("retrieve")
+    for seconds in (0.000001, 0.003, 0.003, 0.2, 30.0):
+        histogram.observe(seconds)
+    stage_histogram("empty")
+    family = parse(render_prometheus())[f"{PREFIX}_stage_latency_seconds"]
+    assert family["type"] == "histogram"
+    assert family["help"]
+    for stage, count in (("retrieve", 5), ("empty", 0)):
+        samples = [(name, labels, value) for name, labels, value in family["samples"] if labels["stage"] == stage]
+        buckets = [(labels["le"], value) for name, labels, value in samples if name.endswith("_bucket")]
+        bounds = [float(le.replace("Inf", "inf")) for le, _ in buckets]
+        assert bounds == sorted(bounds) and buckets[-1][0] == "+Inf"
+        assert len(bounds) == len(metrics.DEFAULT_BUCKETS) + 1
+        cumulative = [value for _, value in buckets]
+        assert cumulative == sorted(cumulative)
+        totals = {name.rsplit("_", 1)[1]: value for name, labels, value in samples if not name.endswith("_bucket")}
+        assert totals["count"] == cumulative[-1] == count
+        assert set(totals) == {"sum", "count"}
+    retrieve = {labels["le"]: value for name, labels, value in family["samples"]
+                if name.endswith("_bucket") and labels["stage"] == "retrieve"}
+    assert (retrieve["1e-05"], retrieve["0.005"], retrieve["0.25"], retrieve["10"], retrieve["+Inf"]) == (1, 3, 4, 4, 5)
+    total = sum(value for name, labels, value in family["samples"] if name.endswith("_sum") and labels["stage"] == "retrieve")
+    assert total == pytest.approx(30.206001)
+
+
+def test_counters_and_gauges(registry):
+    requests = counter("embedding_requests", "HTTP requests by outcome.")
+    requests.inc(outcome="ok")
+    requests.inc(2, outcome="retry")
+    counter("unused", "Declared but never incremented.")
+    register_collector(lambda: [("queue_depth", "Queued items.", {}, 3), ("ratio", "A ratio.", {"cache": "a"}, 0.25)])
+    register_collector(lambda: [("ratio", "A ratio.", {"cache": "b"}, float("nan"))])
+    families = parse(render_prometheus())
+    family = families[f"{PREFIX}_embedding_requests_total"]
+    assert family["type"] == "counter"
+    assert sorted((labels["outcome"], value) for _, labels, value in family["samples"]) == [("ok", 1), ("retry", 2)]
+    assert families[f"{PREFIX}_unused_total"]["samples"] == []
+    assert families[f"{PREFIX}_queue_depth"]["type"] == "gauge"
+    ratio = families[f"{PREFIX}_ratio"]["samples"]
+    assert [labels["cache"] for _, labels, _ in ratio] == ["a", "b"]
+    assert ratio[0][2] == 0.25 and ratio[1][2] != ratio[1][2]
+
+
+def test_label_values_and_help_text_are_escaped(registry):
+    tricky = 'app "beta"\\path\nnext line'
+    counter("tricky", 'Help with a backslash \\ and\na newline.').inc(app_id=tricky)
+    register_collector(lambda: [("tenant_bytes", "Bytes.", {"app_id": tricky}, 10)])
+    stage_histogram(f"tenant:{tricky}").observe(0.001)
+    text = render_prometheus()
+    families = parse(text)
+    assert families[f"{PREFIX}_tricky_total"]["help"] == 'Help with a backslash \\ and\na newline.'
+    assert families[f"{PREFIX}_tricky_total"]["samples"] == [(f"{PREFIX}_tricky_total", {"app_id": tricky}, 1)]
+    assert families[f"{PREFIX}_tenant_bytes"]["samples"][0][1] == {"app_id": tricky}
+    stages = {labels["stage"] for _, labels, _ in families[f"{PREFIX}_stage_latency_seconds"]["samples"]}
+    assert stages == {f"tenant:{tricky}"}
+    assert 'app_id="app \\"beta\\"\\\\path\\nnext line"' in text
+
+
+@pytest.mark.parametrize(
+    "value, rendered",
+    [(3, "3"), (3.0, "3"), (0.25, "0.25"), (1e-07, "1e-07"), (float("inf"), "+Inf"), (float("-inf"), "-Inf"),
+     (float("nan"), "NaN")],
+)
+def test_numbers(value, rendered):
+    assert metrics._number(value) == rendered
+
+
+def test_histogram_quantiles_use_bucket_bounds():
+    histogram = LatencyHistogram("quantiles", buckets=(0.1, 1.0))
+    assert histogram.quantile(0.5) is None
+    for seconds in (0.05, 0.05, 0.5, 5.0):
+        histogram.observe(seconds)
+    assert (histogram.quantile(0.5), histogram.quantile(0.75), histogram.quantile(1.0)) == (0.1, 1.0, float("inf"))
+
+
+def test_the_official_parser_accepts_the_output(registry):
+    parser = pytest.importorskip("prometheus_client.parser")
+    stage_histogram("retrieve").observe(0.01)
+    counter("tricky", "Help \\ text\nhere.").inc(app_id='a "b"\\c\nd')
+    register_collector(lambda: [("ratio", "A ratio.", {}, float("nan"))])
+    families = {family.name: family for family in parser.text_string_to_metric_families(render_prometheus())}
+    assert families[f"{PREFIX}_stage_latency_seconds"].type == "histogram"
+    assert families[f"{PREFIX}_tricky"].samples[0].labels == {"app_id": 'a "b"\\c\nd'}
@@ -0,0 +1,145 @@
+"""run_batch and iter_results must return exactly what run returns review by review."""
+from __future__ import annotations
+
+import asyncio
+import json
+import zlib
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+from benchmarks.synthetic import iter_review_shapes
+from pipeline import AiriaPipeline
+from retrieval import FAQRetriever
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+@pytest.fixture(scope="module")
+def reviews():
+    scraped = json.loads((DATA_DIR / "scraped_reviews.json").read_text(encoding="utf-8"))
+    shapes = list(iter_review_shapes(150))
+    # Repeats exercise the query cache and dedup on the second half.
+    return scraped + shapes + shapes[:40]
+
+
+@pytest.mark.parametrize("backend", ["keyword", "numpy"])
+@pytest.mark.parametrize("enable_honeyhive", [True, False])
+def test_run_batch_matches_run(reviews, backend, enable_honeyhive, monkeypatch):
+    monkeypatch.setenv("FAQ_RETRIEVER_BACKEND", backend)
+    expected = list(map(asdict, map(AiriaPipeline(enable_honeyhive=enable_honeyhive).run, reviews)))
+    for batch_size in (1, 7, 64):
+        pipeline = AiriaPipeline(enable_honeyhive=enable_honeyhive)
+        assert list(map(asdict, pipeline.run_batch(reviews, batch_size))) == expected
+
+
+def arun_all(pipeline, reviews):
+    async def run():
+        return [await pipeline.arun(review) for review in reviews]
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("backend", ["keyword", "numpy"])
+@pytest.mark.parametrize("dedup", [False, True])
+def test_arun_matches_run(reviews, backend, dedup, monkeypatch):
+    monkeypatch.setenv("FAQ_RETRIEVER_BACKEND", backend)
+    expected = list(map(asdict, map(AiriaPipeline(dedup=dedup).run, reviews)))
+    assert list(map(asdict, arun_all(AiriaPipeline(dedup=dedup), reviews))) == expected
+
+
+def test_dedup_repeats_match_their_first_occurrence(reviews):
+    # Near-duplicate matches are approximate by design; exact repeats must agree.
+    for results in (
+        AiriaPipeline(dedup=True).run_batch(reviews, 16),
+        list(map(AiriaPipeline(dedup=True).run, reviews)),
+    ):
+        first = {}
+        for result in results:
+            key = result.review["id"]
+            if key in first:
+                assert asdict(result) == first[key]
+            else:
+                first[key] = asdict(result)
+
+
+def test_iter_results_is_lazy_and_ordered(reviews):
+    pipeline = AiriaPipeline(enable_honeyhive=False)
+    consumed = []
+
+    def source():
+        for review in reviews:
+            consumed.append(review)
+            yield review
+
+    results = pipeline.iter_results(source(), batch_size=10)
+    first = next(results)
+    assert first.review is reviews[0]
+    assert len(consumed) == 10
+    rest = list(results)
+    assert [result.review for result in [first, *rest]] == reviews
+
+
+def test_stage_seconds_are_per_call(reviews):
+    pipeline = AiriaPipeline(enable_honeyhive=False)
+    pipeline.run_batch(reviews[:20])
+    own = {}
+    pipeline.run_batch(reviews[20:40], stage_seconds=own)
+    assert set(own) == {"classify", "retrieve", "generate", "score"}
+    assert all(own[stage] <= pipeline.stage_seconds[stage] for stage in own)
+
+
+def test_batch_size_must_be_positive(reviews):
+    with pytest.raises(ValueError):
+        AiriaPipeline(enable_honeyhive=False).run_batch(reviews, batch_size=0)
+
+
+def _word_vector(text, dim=64):
+    vector = [0.0] * dim
+    for word in text.lower().split():
+        vector[zlib.crc32(word.encode("utf-8")) % dim] += 1.0
+    return vector
+
+
+class SplitEmbedder:
+    """Embeds queries as the negated document vector, so using the wrong path picks other entries."""
+
+    def get_text_embedding_batch(self, texts):
+        return [_word_vector(text) for text in texts]
+
+    def get_query_embedding(self, query):
+        return [-value for value in _word_vector(query)]
+
+
+def test_batched_llama_queries_use_query_embeddings():
+    retriever = FAQRetriever(backend="keyword")
+    queries = ["app crashes on login", "dark mode please"]
+    expected = [SplitEmbedder().get_query_embedding(query) for query in queries]
+    assert retriever._query_embeddings(SplitEmbedder(), queries) == expected
+
+
+def test_run_batch_matches_run_on_llamaindex(reviews):
+    core = pytest.importorskip("llama_index.core")
+
+    class SplitEmbedding(core.MockEmbedding):
+        def _get_text_embedding(self, text):
+            return _word_vector(text, self.embed_dim)
+
+        def _get_text_embeddings(self, texts):
+            return [_word_vector(text, self.embed_dim) for text in texts]
+
+        def _get_query_embedding(self, query):
+            return [-value for value in _word_vector(query, self.embed_dim)]
+
+        async def _aget_query_embedding(self, query):
+            return self._get_query_embedding(query)
+
+    def pipeline():
+        retriever = FAQRetriever(backend="llamaindex", embed_model=SplitEmbedding(embed_dim=64), use_embedding_cache=False)
+        assert retriever.backend == "llamaindex"
+        return AiriaPipeline(enable_honeyhive=False, retriever=retriever)
+
+    expected = list(map(asdict, map(pipeline().run, reviews)))
+    assert list(map(asdict, pipeline().run_batch(reviews, 16))) == expected
+    assert list(map(asdict, arun_all(pipeline(), reviews))) == expected
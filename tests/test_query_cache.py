@@ -0,0 +1,114 @@
+"""QueryCache: TTL, LRU order, generations and category keys, alone and behind FAQRetriever."""
+from __future__ import annotations
+
+import pytest
+
+from query_cache import QueryCache, normalize_query
+from retrieval import FAQRetriever
+
+ENTRIES = [
+    {"id": "1", "category": "bug", "title": "App crashes on upload", "body": "Update to fix the crash."},
+    {"id": "2", "category": "billing", "title": "Charged twice", "body": "Refunds for a double charge."},
+    {"id": "3", "category": "general", "title": "Contact support", "body": "Write to support any time."},
+]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_queries_are_normalized():
+    assert normalize_query("  App   CRASHES\n on upload ") == "app crashes on upload"
+    cache = QueryCache()
+    cache.put("App crashes", None, 4)
+    assert cache.get("app   crashes") == 4
+
+
+def test_entries_expire_after_the_ttl():
+    clock = Clock()
+    cache = QueryCache(ttl_seconds=10, clock=clock)
+    cache.put("crash", None, 1)
+    clock.now += 9.99
+    assert cache.get("crash") == 1
+    clock.now += 0.01
+    assert cache.get("crash") is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses, cache.expirations) == (1, 1, 1)
+
+
+def test_no_ttl_never_expires():
+    clock = Clock()
+    cache = QueryCache(ttl_seconds=None, clock=clock)
+    cache.put("crash", None, 1)
+    clock.now += 1e9
+    assert cache.get("crash") == 1
+
+
+def test_least_recently_used_keys_are_evicted_first():
+    cache = QueryCache(max_size=3)
+    for position, query in enumerate(["a", "b", "c"]):
+        cache.put(query, None, position)
+    assert cache.get("a") == 0  # "b" is now the least recently used
+    cache.put("d", None, 3)
+    assert cache.get("b") is None
+    assert [cache.get(query) for query in ("a", "c", "d")] == [0, 2, 3]
+    cache.put("c", None, 9)  # Overwriting refreshes too, so "a" goes next.
+    cache.put("e", None, 4)
+    assert cache.get("a") is None
+    assert cache.get("c") == 9
+    assert (len(cache), cache.evictions) == (3, 2)
+
+
+def test_keys_differing_only_by_category_are_separate():
+    cache = QueryCache()
+    cache.put("refund", None, 0)
+    cache.put("refund", "billing", 1)
+    cache.put("refund", "bug", 2)
+    assert [cache.get("refund", category) for category in (None, "billing", "bug", "praise")] == [0, 1, 2, None]
+
+
+def test_a_generation_bump_drops_and_fences_off_old_results():
+    cache = QueryCache()
+    cache.put("crash", None, 1, generation=0)
+    cache.invalidate(generation=1)
+    assert len(cache) == 0
+    assert cache.generation == 1
+    # A lookup that started before the bump can neither store nor read.
+    cache.put("crash", None, 1, generation=0)
+    assert len(cache) == 0
+    cache.put("crash", None, 2, generation=1)
+    assert cache.get("crash", generation=0) is None
+    assert cache.get("crash", generation=1) == 2
+    assert cache.get("crash") == 2
+    assert cache.invalidations == 1
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        QueryCache(max_size=0)
+
+
+def test_retriever_caches_per_category_and_bumps_the_generation_on_reload():
+    retriever = FAQRetriever(ENTRIES, backend="keyword")
+    cache = retriever.query_cache
+    assert retriever.retrieve("charged twice crash") is retriever.retrieve("charged twice crash")
+    assert cache.hits == 1
+    retriever.retrieve("charged twice crash", category="bug")
+    assert cache.hits == 1
+    assert len(cache) == 2
+
+    generation = cache.generation
+    retriever.reload([ENTRIES[0], dict(ENTRIES[1], body="Refunds arrive in five days."), ENTRIES[2]])
+    assert cache.generation == retriever.snapshot.version > generation
+    assert len(cache) == 0
+    assert retriever.retrieve("charged twice")["body"] == "Refunds arrive in five days."
+
+
+def test_retriever_without_a_cache():
+    retriever = FAQRetriever(ENTRIES, backend="keyword", query_cache_size=0)
+    assert retriever.query_cache is None
+    assert retriever.retrieve("charged twice")["id"] == "2"
@@ -0,0 +1,148 @@
+"""TemplateEngine: the template syntax, lookup fallback and the bundled templates."""
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.synthetic import iter_review_shapes
+from response_templates import TemplateEngine
+
+FAQ = {"id": "faq_1", "category": "bug", "title": "Crash on upload", "body": "Update to 2.1."}
+REVIEW = {"author": "Ana", "rating": 4, "text": "It crashes", "store": "google"}
+
+
+def engine(*templates, partials=None, default_locale="en"):
+    specs = [{"category": "*", "locale": default_locale, "store": "*", "text": "catch-all"}]
+    specs += [dict(zip(("category", "locale", "store", "text"), spec)) for spec in templates]
+    return TemplateEngine.from_dict({"default_locale": default_locale, "partials": partials or {}, "templates": specs})
+
+
+def render(text, review=REVIEW, partials=None):
+    return engine(("bug", "en", "*", text), partials=partials).render(review, "bug", FAQ)
+
+
+def test_fields():
+    text = "{author}|{rating}|{review_text}|{store}|{faq_title}|{faq_answer}"
+    assert render(text) == "Ana|4|It crashes|google|Crash on upload|Update to 2.1."
+
+
+def test_missing_author_defaults_to_there():
+    assert render("Hi {author}", review={"author": ""}) == "Hi there"
+
+
+def test_sections_render_only_for_truthy_fields():
+    text = "Thanks{#rating} for {rating} stars{/rating}!"
+    assert render(text) == "Thanks for 4 stars!"
+    assert render(text, review=dict(REVIEW, rating=None)) == "Thanks!"
+    assert render(text, review=dict(REVIEW, rating=0)) == "Thanks!"
+
+
+def test_nested_sections_and_partials():
+    partials = {"sign": "{#store}via {store}{/store}", "outer": "[{>sign}]"}
+    assert render("{#author}{>outer} {#rating}{rating}{/rating}{/author}", partials=partials) == "[via google] 4"
+
+
+def test_literal_braces_and_code_are_not_evaluated():
+    text = "{{author}} {author} \"\"\" {__import__('os')} \\n ' {{"
+    assert render(text) == "{author} Ana \"\"\" {__import__('os')} \\n ' {"
+
+
+def test_field_values_are_not_reinterpreted():
+    review = dict(REVIEW, text="{author} {{x}} \"\"\"")
+    assert render("{review_text}", review=review) == "{author} {{x}} \"\"\""
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("{nope}", "unknown field 'nope'"),
+        ("{#rating}open", "section 'rating' is never closed"),
+        ("{/rating}", "unexpected"),
+        ("{#rating}{/author}", "unexpected"),
+        ("{>missing}", "unknown partial 'missing'"),
+    ],
+)
+def test_invalid_templates(text, message):
+    with pytest.raises(ValueError, match=message):
+        engine(("bug", "en", "*", text))
+
+
+def test_recursive_partials_are_rejected():
+    with pytest.raises(ValueError, match="nested too deeply"):
+        engine(("bug", "en", "*", "{>loop}"), partials={"loop": "{>loop}"})
+
+
+def test_catch_all_is_required():
+    with pytest.raises(ValueError, match="catch-all"):
+        TemplateEngine.from_dict({"templates": [{"category": "bug", "text": "x"}]})
+
+
+def test_duplicate_keys_are_rejected():
+    with pytest.raises(ValueError, match="duplicate"):
+        engine(("bug", "en", "*", "a"), ("bug", "en", "*", "b"))
+
+
+def test_lookup_fallback_order():
+    templates = engine(
+        ("bug", "en", "*", "bug/en/*"),
+        ("bug", "en", "apple", "bug/en/apple"),
+        ("*", "en", "apple", "*/en/apple"),
+        ("bug", "es", "*", "bug/es/*"),
+        ("*", "es", "*", "*/es/*"),
+    )
+
+    def pick(category, locale=None, store=None):
+        review = {key: value for key, value in (("locale", locale), ("store", store)) if value}
+        return templates.render(review, category, FAQ)
+
+    assert pick("bug", "en", "apple") == "bug/en/apple"
+    assert pick("bug", "en", "google") == "bug/en/*"
+    assert pick("praise", "en", "apple") == "*/en/apple"
+    assert pick("praise", "en", "google") == "catch-all"
+    assert pick("bug", "es", "apple") == "bug/es/*"
+    assert pick("praise", "es") == "*/es/*"
+    # An unknown locale falls back to the default locale.
+    assert pick("bug", "fr", "apple") == "bug/en/apple"
+    assert pick("praise") == "catch-all"
+
+
+def test_render_batch_matches_render():
+    templates = TemplateEngine.from_file()
+    reviews = list(iter_review_shapes(50))
+    categories = ["bug", "praise", "complaint", "feature request", "other"] * 10
+    faq_entries = [FAQ] * 50
+    expected = [templates.render(review, category, FAQ) for review, category in zip(reviews, categories)]
+    assert templates.render_batch(reviews, categories, faq_entries) == expected
+
+
+def _legacy_response(review, category, faq_entry):
+    """The hard-coded response the bundled templates replaced."""
+    author = review.get("author") or "there"
+    rating = review.get("rating")
+    base_intro = {
+        "bug": "I'm sorry you're running into trouble",
+        "feature request": "Thank you for the thoughtful idea",
+        "praise": "We're thrilled you're enjoying the app",
+        "complaint": "Thanks for sharing your experience",
+    }.get(category, "Thanks for reaching out")
+    rating_snippet = f" and for leaving a {rating}-star rating" if rating else ""
+    category_line = {
+        "bug": "Our engineers are actively looking into issues like the one you described.",
+        "feature request": "I've shared your request with the product team so it can influence the roadmap.",
+        "praise": "Feedback like yours keeps us motivated to keep building.",
+        "complaint": "We're keeping a close eye on similar reports so we can improve right away.",
+    }.get(category, "We're on it.")
+    return (
+        f"Hi {author}, {base_intro}{rating_snippet}. "
+        f"I read your note (\"{review.get('text', '')}\") and want you to know we're listening. "
+        f"{faq_entry.get('body', '')} {category_line}"
+        " If you have more details to share, just reply to this review or contact support and we'll jump in."
+        " Thanks again for helping us build a better app!"
+    ).strip()
+
+
+@pytest.mark.parametrize("category", ["bug", "feature request", "praise", "complaint", "general"])
+def test_bundled_templates_match_the_legacy_responses(category):
+    templates = TemplateEngine.from_file()
+    reviews = list(iter_review_shapes(40)) + [{"text": "no author or rating"}, dict(REVIEW, author=None, rating=0)]
+    for review in reviews:
+        assert templates.render(review, category, FAQ) == _legacy_response(review, category, FAQ)
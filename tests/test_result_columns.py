@@ -0,0 +1,75 @@
+"""ResultColumns: lossless round trips, shared interned values and JSONL/Arrow output."""
+from __future__ import annotations
+
+import copy
+import io
+import json
+
+import pytest
+
+from benchmarks.synthetic import iter_review_shapes, synthetic_reviews
+from pipeline import AiriaPipeline
+from result_columns import ResultColumns, StringTable
+
+
+@pytest.fixture(scope="module")
+def results():
+    reviews = synthetic_reviews(150) + list(iter_review_shapes(50))
+    scored = AiriaPipeline(enable_honeyhive=True).run_batch(reviews)
+    unscored = AiriaPipeline(enable_honeyhive=False).run_batch(reviews[:30])
+    return scored + unscored
+
+
+def test_round_trip_is_lossless(results):
+    columns = ResultColumns.from_results(results)
+    assert len(columns) == len(results)
+    assert columns.to_results() == results
+    assert columns[-1] == results[-1]
+    assert any(result.honeyhive_score is None for result in columns)
+
+
+def test_interned_values_are_shared(results):
+    back = ResultColumns.from_results(results).to_results()
+    for field in ("category", "faq_entry"):
+        distinct = {json.dumps(getattr(result, field), sort_keys=True) for result in results}
+        assert len({id(getattr(result, field)) for result in back}) == len(distinct)
+    notes = [result.honeyhive_score.notes for result in back if result.honeyhive_score is not None]
+    assert len({id(note) for note in notes}) == 1
+    # Entries are the first pipeline's own dicts, not copies.
+    scored = len(results) - 30
+    assert all(got.faq_entry is want.faq_entry for got, want in zip(back[:scored], results[:scored]))
+
+
+def test_equal_faq_entries_are_stored_once(results):
+    copies = [copy.deepcopy(result) for result in results[:20]]
+    columns = ResultColumns.from_results(results[:20] + copies)
+    assert len(columns.faq_entries) == len({id(result.faq_entry) for result in results[:20]})
+    assert columns.to_results() == results[:20] + copies
+
+
+def test_write_jsonl_matches_to_dict(results):
+    output = io.StringIO()
+    assert ResultColumns.from_results(results).write_jsonl(output) == len(results)
+    assert [json.loads(line) for line in output.getvalue().splitlines()] == [
+        json.loads(json.dumps(result.to_dict())) for result in results
+    ]
+
+
+def test_string_table_round_trip():
+    texts = ["", "plain", "ünïcödé ✓", "🙂 emoji", "line\nbreak", ""]
+    table = StringTable()
+    for text in texts:
+        table.append(text)
+    assert len(table) == len(texts)
+    assert [table[row] for row in range(len(table))] == texts
+    assert table.nbytes >= sum(len(text.encode("utf-8")) for text in texts)
+
+
+def test_arrow_table(results):
+    pytest.importorskip("pyarrow")
+    table = ResultColumns.from_results(results).to_arrow()
+    assert table.num_rows == len(results)
+    assert table.column("response").to_pylist() == [result.response for result in results]
+    assert table.column("helpfulness").to_pylist() == [
+        result.honeyhive_score.helpfulness if result.honeyhive_score is not None else None for result in results
+    ]
@@ -0,0 +1,86 @@
+"""ResultStore round-trips and the pipeline reusing stored results."""
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.synthetic import synthetic_reviews
+from pipeline import AiriaPipeline, ReviewResult
+from result_store import ResultStore, review_key
+
+REVIEWS = synthetic_reviews(30)
+
+
+@pytest.fixture
+def store(tmp_path):
+    result_store = ResultStore(str(tmp_path / "results.sqlite3"))
+    yield result_store
+    result_store.close()
+
+
+@pytest.fixture(scope="module")
+def results():
+    return [result.to_dict() for result in AiriaPipeline().run_batch(REVIEWS)]
+
+
+def test_round_trip(store, results):
+    assert store.put_many(results, "faq1", "v1") == len(results)
+    keys = [review_key(result["review"]) for result in results]
+    found = store.get_many(keys, "faq1", "v1")
+    assert [found[key] for key in keys] == results
+    assert [ReviewResult.from_dict(found[key]).to_dict() for key in keys] == results
+    assert (store.hits, store.misses) == (len(results), 0)
+
+
+def test_versions_and_stores_key_separately(store, results):
+    store.put_many(results[:5], "faq1", "v1")
+    keys = [review_key(result["review"]) for result in results[:5]]
+    assert store.get_many(keys, "faq2", "v1") == {}
+    assert store.get_many(keys, "faq1", "v2") == {}
+    other_store = [(store_name + "-other", review_id) for store_name, review_id in keys]
+    assert store.get_many(other_store, "faq1", "v1") == {}
+    assert store.misses == 15
+
+
+def test_rewrite_replaces_and_reviews_without_id_are_skipped(store, results):
+    store.put_many(results[:3], "faq1", "v1")
+    changed = dict(results[0], response="edited")
+    no_id = dict(results[1], review=dict(results[1]["review"], id=""))
+    assert store.put_many([changed, no_id], "faq1", "v1") == 1
+    assert len(store) == 3
+    assert store.get_many([review_key(changed["review"])], "faq1", "v1")[review_key(changed["review"])] == changed
+
+
+def test_lookups_beyond_the_parameter_chunk(store):
+    many = [{"review": {"id": str(number), "store": "apple", "date": "2025-01-01"}, "n": number} for number in range(1200)]
+    store.put_many(many, "faq1", "v1")
+    keys = [review_key(result["review"]) for result in many] + [("apple", "missing")]
+    found = store.get_many(keys, "faq1", "v1")
+    assert len(found) == 1200
+    assert found[("apple", "777")]["n"] == 777
+
+
+def test_query_by_date_range(store):
+    dated = [
+        {"review": {"id": str(number), "store": "google", "date": f"2025-01-{number:02d}"}}
+        for number in (3, 1, 2, 5)
+    ]
+    store.put_many(dated, "faq1", "v1")
+    assert [result["review"]["date"] for result in store.query()] == [
+        "2025-01-01", "2025-01-02", "2025-01-03", "2025-01-05",
+    ]
+    assert [result["review"]["id"] for result in store.query(since="2025-01-02", until="2025-01-03")] == ["2", "3"]
+    assert list(store.query(store="apple")) == []
+
+
+def test_pipeline_reuses_stored_results(store, results):
+    first = AiriaPipeline(result_store=store)
+    assert [result.to_dict() for result in first.run_batch(REVIEWS, 8)] == results
+    assert first.stored_results == 0
+
+    rerun = AiriaPipeline(result_store=store)
+    edited = [dict(review) for review in REVIEWS]
+    edited[4]["text"] = "The billing page charged me twice."
+    expected = [result.to_dict() for result in AiriaPipeline().run_batch(edited)]
+    assert [result.to_dict() for result in rerun.run_batch(edited, 8)] == expected
+    # Every review but the edited one came from the store.
+    assert rerun.stored_results == len(REVIEWS) - 1
@@ -0,0 +1,107 @@
+"""streaming_loader: format detection, gzip, chunk boundaries and validation errors."""
+from __future__ import annotations
+
+import gzip
+import json
+
+import pytest
+
+from benchmarks.synthetic import iter_review_shapes
+from streaming_loader import iter_faq_entries, iter_records, iter_reviews
+
+REVIEWS = list(iter_review_shapes(200))
+
+
+def _write(path, text, compress=False):
+    data = text.encode("utf-8")
+    path.write_bytes(gzip.compress(data) if compress else data)
+    return path
+
+
+def _as_array(records):
+    return json.dumps(records, ensure_ascii=False, indent=1)
+
+
+def _as_lines(records):
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+
+@pytest.mark.parametrize(
+    "name, render, compress",
+    [
+        ("reviews.json", _as_array, False),
+        ("reviews.jsonl", _as_lines, False),
+        ("reviews.ndjson", _as_lines, False),
+        ("reviews.json.gz", _as_array, True),
+        ("reviews.jsonl.gz", _as_lines, True),
+        # Gzip is detected from the magic bytes, not the suffix.
+        ("reviews.json", _as_array, True),
+    ],
+)
+def test_formats_round_trip(tmp_path, name, render, compress):
+    path = _write(tmp_path / name, render(REVIEWS), compress)
+    assert list(iter_reviews(path)) == REVIEWS
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+def test_small_chunks_split_values_anywhere(tmp_path, chunk_size):
+    records = [{"n": 12345678901234567890, "f": -1.5e-7, "s": "a,]\\"}, {"b": [True, None]}, {}]
+    path = _write(tmp_path / "records.json", json.dumps(records))
+    assert list(iter_records(path, chunk_size=chunk_size)) == records
+
+
+def test_blank_lines_in_jsonl_are_skipped(tmp_path):
+    path = _write(tmp_path / "reviews.jsonl", "\n" + _as_lines(REVIEWS[:3]).replace("\n", "\n\n"))
+    assert list(iter_reviews(path)) == REVIEWS[:3]
+
+
+def test_empty_array(tmp_path):
+    assert list(iter_records(_write(tmp_path / "empty.json", " [ ] "))) == []
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        list(iter_records(tmp_path / "absent.json"))
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ('{"id": "1"}', "expected a JSON array"),
+        ("[1, 2]", "record 0 is not a JSON object"),
+        ('[{"a": 1},, {"b": 2}]', "unexpected ','"),
+        ('[{"a": 1} {"b": 2}]', "expected ',' or ']'"),
+        ('[{"a": 1},', "unexpected end of file"),
+        ('[{"a": tru}]', "invalid JSON"),
+    ],
+)
+def test_malformed_arrays(tmp_path, text, message):
+    with pytest.raises(ValueError, match=message):
+        list(iter_records(_write(tmp_path / "bad.json", text)))
+
+
+def test_malformed_jsonl_reports_the_line(tmp_path):
+    path = _write(tmp_path / "bad.jsonl", '{"a": 1}\n{"a": \n')
+    with pytest.raises(ValueError, match=r"bad\.jsonl:2: invalid JSON"):
+        list(iter_records(path))
+
+
+def test_records_before_an_error_are_yielded(tmp_path):
+    path = _write(tmp_path / "bad.jsonl", '{"a": 1}\nnot json\n')
+    records = iter_records(path)
+    assert next(records) == {"a": 1}
+    with pytest.raises(ValueError):
+        next(records)
+
+
+def test_reviews_missing_fields_are_rejected(tmp_path):
+    review = dict(REVIEWS[0], text="")
+    path = _write(tmp_path / "reviews.json", json.dumps([REVIEWS[1], review]))
+    with pytest.raises(ValueError, match="Review record 1 .* is missing text"):
+        list(iter_reviews(path))
+
+
+def test_faq_entries_missing_fields_are_rejected(tmp_path):
+    path = _write(tmp_path / "faq.jsonl", json.dumps({"id": "faq_1", "title": "Crash"}) + "\n")
+    with pytest.raises(ValueError, match="FAQ record 0 .* is missing category, body"):
+        list(iter_faq_entries(path))
@@ -0,0 +1,106 @@
+"""TenantRegistry: LRU eviction by measured size, single loads, app id validation and shared caches."""
+from __future__ import annotations
+
+import json
+import threading
+
+import pytest
+
+from benchmarks.retriever_startup import CountingEmbedder
+from benchmarks.synthetic import synthetic_faq_entries
+from embedding_cache import EmbeddingCache
+from retrieval import FAQRetriever
+from tenants import TenantRegistry
+
+APPS = ("alpha", "beta", "gamma")
+
+
+@pytest.fixture
+def faq_dir(tmp_path):
+    directory = tmp_path / "faqs"
+    directory.mkdir()
+    for seed, app_id in enumerate(APPS):
+        entries = synthetic_faq_entries(60, seed=seed)
+        (directory / f"{app_id}.json").write_text(json.dumps(entries), encoding="utf-8")
+    (tmp_path / "secret.json").write_text(json.dumps(synthetic_faq_entries(5)), encoding="utf-8")
+    return directory
+
+
+def registry(faq_dir, budget=2**40, **kwargs):
+    return TenantRegistry(faq_dir=str(faq_dir), memory_budget_bytes=budget, backend="keyword", **kwargs)
+
+
+def test_least_recently_used_tenants_are_evicted_past_the_budget(faq_dir):
+    sizes = [registry(faq_dir).get(app_id).bytes for app_id in APPS]
+    assert all(size > 0 for size in sizes)
+    tenants = registry(faq_dir, budget=sizes[0] + sizes[1] + sizes[2] // 2)
+    alpha = tenants.get("alpha")
+    tenants.get("beta")
+    assert tenants.get("alpha") is alpha  # alpha is now the most recently used
+    tenants.get("gamma")
+    assert [tenant.app_id for tenant in tenants.tenants()] == ["alpha", "gamma"]
+    assert tenants.evictions == 1
+    assert tenants.stats()["bytes"] == sizes[0] + sizes[2]
+    assert tenants.get("beta") is not None
+    assert tenants.cached("alpha") is None
+
+
+def test_a_tenant_over_the_budget_alone_still_serves(faq_dir):
+    tenants = registry(faq_dir, budget=1)
+    tenants.get("alpha")
+    assert [tenant.app_id for tenant in tenants.tenants()] == ["alpha"]
+    tenants.get("beta")
+    assert [tenant.app_id for tenant in tenants.tenants()] == ["beta"]
+
+
+def test_concurrent_first_requests_load_once(faq_dir, monkeypatch):
+    tenants = registry(faq_dir)
+    loads = []
+    load = tenants._load
+
+    def slow_load(app_id):
+        loads.append(app_id)
+        started.wait(5)
+        return load(app_id)
+
+    monkeypatch.setattr(tenants, "_load", slow_load)
+    started = threading.Event()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(tenants.get("alpha"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    started.set()
+    for thread in threads:
+        thread.join(10)
+    assert loads == ["alpha"]
+    assert len(results) == 8
+    assert all(tenant is results[0] for tenant in results)
+
+
+@pytest.mark.parametrize(
+    "app_id",
+    ["", "../secret", "faqs/../../secret", "/etc/passwd", ".hidden", "alpha.json", "al pha", "a" * 65, "alpha\n"],
+)
+def test_invalid_app_ids_are_rejected(faq_dir, app_id):
+    with pytest.raises(ValueError, match="Invalid app id"):
+        registry(faq_dir).get(app_id)
+
+
+def test_unknown_app(faq_dir):
+    with pytest.raises(FileNotFoundError):
+        registry(faq_dir).get("delta")
+
+
+def test_tenants_share_the_base_retrievers_embedding_cache(faq_dir, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    embedder = CountingEmbedder(16, 0)
+    base = FAQRetriever(
+        synthetic_faq_entries(30, seed=9), embed_model=embedder, embedding_cache_dir=cache_dir, backend="numpy"
+    )
+    tenants = TenantRegistry(faq_dir=str(faq_dir), backend="numpy", base_retriever=lambda: base)
+    alpha = tenants.get("alpha")
+    beta = tenants.get("beta")
+    assert alpha.retriever.embedding_cache is base.embedding_cache
+    assert beta.retriever.snapshot.embed_model is embedder
+    # Every retriever saved to the one file and none dropped the others' vectors.
+    assert len(EmbeddingCache(base.embedding_cache.model_name, cache_dir)) == 150
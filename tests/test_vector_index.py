@@ -0,0 +1,152 @@
+"""NumpyVectorIndex and HashingEmbedder: brute-force parity, stable embeddings and incremental rows."""
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from benchmarks.synthetic import synthetic_faq_entries  # noqa: E402
+from vector_index import HashingEmbedder, NumpyVectorIndex, _RowStore, embed_texts  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+TEXTS = [f"{entry['title']} {entry['body']}" for entry in synthetic_faq_entries(80)]
+
+
+def brute_force(rows, query):
+    """Cosine similarity of ``query`` with every row, in plain Python floats."""
+    def norm(vector):
+        return math.sqrt(sum(value * value for value in vector)) or 1.0
+
+    query_norm = norm(query)
+    return [sum(a * b for a, b in zip(row, query)) / (norm(row) * query_norm) for row in rows]
+
+
+def test_top_1_matches_brute_force_cosine():
+    rng = np.random.default_rng(3)
+    rows = rng.standard_normal((60, 16)).tolist()
+    rows[40] = rows[7]  # An exact tie goes to the earlier row.
+    index = NumpyVectorIndex(rows)
+    queries = rng.standard_normal((200, 16)).tolist() + [rows[7], rows[12]]
+    positions, scores = index.search_batch(queries, k=1)
+    for query, position, score in zip(queries, positions[:, 0], scores[:, 0]):
+        similarities = brute_force(rows, query)
+        best = max(similarities)
+        assert similarities[position] == pytest.approx(best, abs=1e-5)
+        assert score == pytest.approx(best, abs=1e-5)
+        # Only float32 rounding may pick a different row, and only among near-ties.
+        assert position == similarities.index(best) or best - sorted(similarities)[-2] < 1e-5
+    assert index.search(rows[7])[0][0] == 7
+
+
+def test_top_k_is_sorted_and_matches_brute_force():
+    embedder = HashingEmbedder(dim=256).fit(TEXTS)
+    index = NumpyVectorIndex(embedder.embed(TEXTS))
+    for query in ("app crashes on upload", "refund for a double charge", "dark mode"):
+        vector = embedder.embed([query])[0]
+        positions, scores = index.search(vector, k=5)
+        similarities = brute_force(index.matrix.tolist(), vector.tolist())
+        assert list(scores) == sorted(scores, reverse=True)
+        assert list(scores) == pytest.approx(sorted(similarities, reverse=True)[:5], abs=1e-5)
+        assert [similarities[position] for position in positions] == pytest.approx(list(scores), abs=1e-5)
+
+
+def test_zero_queries_tie_everything_to_the_first_row():
+    index = NumpyVectorIndex(np.eye(4))
+    positions, scores = index.search(np.zeros(4), k=4)
+    assert list(positions) == [0, 1, 2, 3]
+    assert list(scores) == [0.0] * 4
+
+
+def test_k_is_capped_at_the_row_count():
+    positions, _ = NumpyVectorIndex(np.eye(3)).search(np.ones(3), k=10)
+    assert sorted(positions) == [0, 1, 2]
+
+
+def embedding_digest():
+    embedder = HashingEmbedder(dim=128).fit(TEXTS)
+    return hashlib.sha256(embedder.embed(TEXTS).tobytes()).hexdigest()
+
+
+def test_embeddings_are_identical_across_processes():
+    code = "from tests.test_vector_index import embedding_digest; print(embedding_digest())"
+    digests = set()
+    for seed in ("1", "2"):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, env=env, check=True, capture_output=True, text=True
+        )
+        digests.add(output.stdout.strip())
+    assert digests == {embedding_digest()}
+
+
+def test_embedding_model_name_describes_the_embedder():
+    assert HashingEmbedder(dim=64, ngram_range=(2, 4)).model_name == "hashing-char2-4-64"
+
+
+def test_row_store_grows_without_touching_older_views():
+    store = _RowStore(np.zeros((2, 3), dtype=np.float32))
+    view = store.data[:store.used]
+    assert store.append(np.ones((1, 3), dtype=np.float32)) == 2
+    assert store.data.shape[0] >= 16 and store.used == 3
+    grown = store.data
+    assert store.append(np.full((2, 3), 2, dtype=np.float32)) == 3
+    assert store.data is grown  # Spare capacity is used before reallocating.
+    assert store.data[:store.used].tolist() == [[0] * 3] * 2 + [[1] * 3] + [[2] * 3] * 2
+    assert view.tolist() == [[0] * 3] * 2
+
+
+def test_with_changes_masks_removed_rows_and_keeps_the_old_index():
+    rows = np.eye(6, dtype=np.float32)
+    index = NumpyVectorIndex(rows)
+    updated, new_rows = index.with_changes([2, 4], [[0, 0, 1, 0, 0, 0], [0, 0, 0, 0, 0, 1]])
+    assert new_rows == [6, 7]
+    assert len(updated) == 8
+    # Row 2 is removed, so its replacement (row 6) answers; row 5's duplicate loses the tie.
+    assert updated.search(rows[2])[0][0] == 6
+    assert updated.search(rows[5])[0][0] == 5
+    positions, scores = updated.search(rows[4], k=8)
+    assert scores[0] < 1
+    assert set(positions[np.isinf(scores)].tolist()) == {2, 4}
+    assert index.search(rows[2])[0][0] == 2
+    assert len(index) == 6
+
+    # Both branches append to their own rows.
+    first, _ = updated.with_changes([], [[1, 1, 0, 0, 0, 0]])
+    second, _ = updated.with_changes([], [[0, 0, 0, 1, 1, 0]])
+    assert first.matrix[8].tolist() != second.matrix[8].tolist()
+    assert first.search([1, 1, 0, 0, 0, 0])[0][0] == 8
+    assert second.search([0, 0, 0, 1, 1, 0])[0][0] == 8
+
+
+def test_order_breaks_ties_after_appends():
+    rows = np.eye(3, dtype=np.float32)
+    index = NumpyVectorIndex(rows)
+    # The appended row duplicates row 1 but sits before it in entry order.
+    updated, _ = index.with_changes([], [rows[1]], order=[0, 2, 3, 1])
+    assert updated.search(rows[1])[0][0] == 3
+    assert list(updated.search(rows[1], k=2)[0]) == [3, 1]
+    assert list(updated.search(np.zeros(3), k=4)[0]) == [0, 3, 1, 2]
+    with pytest.raises(ValueError):
+        index.with_changes([], [rows[1]], order=[0, 1])
+
+
+def test_embed_texts_accepts_both_embedder_apis():
+    class LlamaStyle:
+        def get_text_embedding_batch(self, texts):
+            return [[float(len(text)), 1.0] for text in texts]
+
+    class Plain:
+        def embed(self, texts):
+            return [[float(len(text)), 1.0] for text in texts]
+
+    for embedder in (LlamaStyle(), Plain()):
+        matrix = embed_texts(embedder, ("ab", "abc"))
+        assert matrix.dtype == np.float32
+        assert matrix.tolist() == [[2.0, 1.0], [3.0, 1.0]]
@@ -0,0 +1,210 @@
+"""Dependency-light vector retrieval over a contiguous NumPy matrix."""
+from __future__ import annotations
+
+import logging
+import zlib
+from typing import Any, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError as exc:
+    np = None  # type: ignore
+    NUMPY_AVAILABLE = False
+    logger.warning("NumPy not available: %s", exc)
+
+DEFAULT_DIM = 1024
+DEFAULT_NGRAM_RANGE = (3, 5)
+
+
+class HashingEmbedder:
+    """Offline embedder built from hashed character n-grams with TF-IDF weights.
+
+    N-grams are hashed with CRC32 (stable across processes, unlike ``hash``)
+    into ``dim`` buckets. Counts are dampened with ``1 + log(tf)``, multiplied
+    by inverse document frequencies learned in :meth:`fit`, and every vector
+    is L2-normalised so a dot product is a cosine similarity.
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM, ngram_range: Tuple[int, int] = DEFAULT_NGRAM_RANGE) -> None:
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("HashingEmbedder requires numpy")
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.idf = np.ones(dim, dtype=np.float32)
+
+    @property
+    def model_name(self) -> str:
+        low, high = self.ngram_range
+        return f"hashing-char{low}-{high}-{self.dim}"
+
+    def _buckets(self, text: str) -> List[int]:
+        padded = f" {' '.join(text.lower().split())} "
+        low, high = self.ngram_range
+        buckets = []
+        for size in range(low, high + 1):
+            for start in range(len(padded) - size + 1):
+                buckets.append(zlib.crc32(padded[start:start + size].encode("utf-8")) % self.dim)
+        return buckets
+
+    def fit(self, texts: Sequence[str]) -> "HashingEmbedder":
+        """Learn smoothed IDF weights from the corpus that will be searched."""
+        document_frequency = np.zeros(self.dim, dtype=np.float64)
+        for text in texts:
+            document_frequency[np.unique(np.asarray(self._buckets(text), dtype=np.int64))] += 1
+        count = len(texts)
+        self.idf = (np.log((1 + count) / (1 + document_frequency)) + 1).astype(np.float32)
+        return self
+
+    def embed(self, texts: Sequence[str]) -> "np.ndarray":
+        """Return a ``(len(texts), dim)`` float32 matrix of unit vectors."""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            buckets = self._buckets(text)
+            if not buckets:
+                continue
+            counts = np.bincount(np.asarray(buckets, dtype=np.int64), minlength=self.dim).astype(np.float32)
+            nonzero = counts > 0
+            counts[nonzero] = 1 + np.log(counts[nonzero])
+            matrix[row] = counts
+        matrix *= self.idf
+        return _normalize_rows(matrix)
+
+
+def _normalize_rows(matrix: "np.ndarray") -> "np.ndarray":
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class _RowStore:
+    """Append-only float32 rows shared by successive versions of an index.
+
+    Rows past ``used`` are spare capacity; growing reallocates, so views
+    held by older index versions keep pointing at the old array.
+    """
+
+    def __init__(self, rows: "np.ndarray") -> None:
+        self.data = rows
+        self.used = rows.shape[0]
+
+    def append(self, rows: "np.ndarray") -> int:
+        start = self.used
+        needed = start + rows.shape[0]
+        if needed > self.data.shape[0]:
+            grown = np.empty((max(needed, 2 * self.data.shape[0], 16), self.data.shape[1]), dtype=np.float32)
+            grown[:start] = self.data[:start]
+            self.data = grown
+        self.data[start:needed] = rows
+        self.used = needed
+        return start
+
+
+class NumpyVectorIndex:
+    """Exact cosine search over pre-normalised FAQ embeddings.
+
+    Embeddings live in one C-contiguous float32 matrix, so a single query is
+    one matrix-vector product and a batch is one matrix-matrix product. Ties
+    resolve to the lowest row, i.e. the earliest FAQ entry.
+
+    :meth:`with_changes` returns an updated index that appends rows into
+    shared spare capacity and masks removed rows, leaving this one intact.
+    Appended rows are out of entry order, so its ``order`` (the FAQ position
+    of every row) takes over from the row number in breaking ties.
+    """
+
+    def __init__(self, embeddings: Any) -> None:
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("NumpyVectorIndex requires numpy")
+        matrix = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32))
+        if matrix.ndim != 2:
+            raise ValueError("embeddings must be a 2-D matrix")
+        self._store = _RowStore(_normalize_rows(matrix))
+        self.matrix = self._store.data
+        self._live: Optional["np.ndarray"] = None
+        self._dead: Optional["np.ndarray"] = None
+        self._order: Optional["np.ndarray"] = None
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def with_changes(
+        self,
+        removed_rows: Sequence[int],
+        added_embeddings: Any,
+        order: Optional[Sequence[int]] = None,
+    ) -> Tuple["NumpyVectorIndex", List[int]]:
+        """Return ``(index, new_rows)`` with ``removed_rows`` masked and ``added_embeddings`` appended.
+
+        ``order`` gives every row of the new index a tie-breaking rank; by
+        default ties go to the lowest row.
+        """
+        size = self.matrix.shape[0]
+        store = self._store
+        if store.used != size:
+            # Another version already appended past our rows; branch off a private copy.
+            store = _RowStore(self.matrix.copy())
+        added = np.asarray(added_embeddings, dtype=np.float32).reshape(-1, self.matrix.shape[1])
+        start = store.append(_normalize_rows(added)) if len(added) else size
+
+        index = object.__new__(NumpyVectorIndex)
+        index._store = store
+        index.matrix = store.data[:store.used]
+        live = np.ones(index.matrix.shape[0], dtype=bool)
+        if self._live is not None:
+            live[:size] = self._live
+        live[list(removed_rows)] = False
+        index._live = live
+        index._dead = None if live.all() else np.flatnonzero(~live)
+        index._order = None
+        if order is not None:
+            ranks = np.asarray(order, dtype=np.int64)
+            if ranks.shape != (index.matrix.shape[0],):
+                raise ValueError("order needs one rank per row")
+            if (np.diff(ranks) <= 0).any():
+                index._order = ranks
+        return index, list(range(start, start + len(added)))
+
+    def search(self, query_embedding: Any, k: int = 1) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Return the positions and scores of the ``k`` nearest rows."""
+        positions, scores = self.search_batch(np.asarray(query_embedding, dtype=np.float32)[None, :], k)
+        return positions[0], scores[0]
+
+    def search_batch(self, query_embeddings: Any, k: int = 1) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Return ``(m, k)`` positions and scores for ``m`` query embeddings."""
+        queries = _normalize_rows(np.asarray(query_embeddings, dtype=np.float32))
+        similarities = queries @ self.matrix.T
+        if self._dead is not None:
+            similarities[:, self._dead] = -np.inf
+        k = min(k, similarities.shape[1])
+        if self._order is not None:
+            if k == 1:
+                best = similarities.max(axis=1, keepdims=True)
+                ranks = np.where(similarities == best, self._order, np.iinfo(np.int64).max)
+                positions = np.argmin(ranks, axis=1)[:, None]
+            else:
+                positions = np.lexsort((np.broadcast_to(self._order, similarities.shape), -similarities))[:, :k]
+        elif k == 1:
+            positions = np.argmax(similarities, axis=1)[:, None]
+        else:
+            # Stable sort on negated scores keeps the earliest row first on ties.
+            positions = np.argsort(-similarities, axis=1, kind="stable")[:, :k]
+        scores = np.take_along_axis(similarities, positions, axis=1)
+        return positions, scores
+
+
+def embed_texts(embedder: Any, texts: Sequence[str]) -> "np.ndarray":
+    """Embed ``texts`` with any embedder exposing ``embed`` or LlamaIndex's batch API."""
+    if hasattr(embedder, "embed"):
+        return np.asarray(embedder.embed(list(texts)), dtype=np.float32)
+    return np.asarray(embedder.get_text_embedding_batch(list(texts)), dtype=np.float32)
+
+
+__all__ = [
+    "HashingEmbedder",
+    "NumpyVectorIndex",
+    "NUMPY_AVAILABLE",
+    "embed_texts",
+]